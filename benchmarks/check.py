@@ -0,0 +1,66 @@
+"""Compare validating a document against a model with `check`, which doesn't
+create instances, against loading it with `load`:
+
+    PYTHONPATH=src python benchmarks/check.py [records]
+"""
+
+import sys
+import timeit
+from typing import List, Optional, Union
+
+from lxml import etree
+
+from xml_dataclasses import check, load, text, xml_dataclass
+
+
+@xml_dataclass
+class Value:
+    __ns__ = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Item:
+    __ns__ = None
+    id: str
+    kind: Optional[str] = None
+    value: Optional[Value] = None
+
+
+@xml_dataclass
+class Other:
+    __ns__ = None
+    id: str
+
+
+@xml_dataclass
+class Items:
+    __ns__ = None
+    item: List[Union[Other, Item]]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    el = etree.fromstring(
+        b"<items>"
+        + b"".join(
+            b'<item id="%d" kind="a"><value>value %d</value></item>' % (i, i)
+            for i in range(count)
+        )
+        + b"</items>"
+    )
+
+    def load_items():
+        return load(Items, el, "items")
+
+    def check_items():
+        return check(Items, el, "items")
+
+    print(f"{count} records")
+    for func in (load_items, check_items):
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{func.__name__:>12}: {elapsed:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare resuming a streaming load half way through a large file, by seeking
+to a checkpoint with `iterload_checkpoints`, against restarting `iterload` and
+skipping the records that were already processed:
+
+    PYTHONPATH=src python benchmarks/checkpoints.py [records]
+"""
+
+import sys
+import timeit
+from io import BytesIO
+from itertools import islice
+from typing import Optional
+
+from xml_dataclasses import iterload, iterload_checkpoints, text, xml_dataclass
+
+
+@xml_dataclass
+class Value:
+    __ns__ = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Item:
+    __ns__ = None
+    id: str
+    kind: Optional[str] = None
+    value: Optional[Value] = None
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    doc = (
+        b"<items>"
+        + b"".join(
+            b'<item id="%d" kind="a"><value>value %d</value></item>' % (i, i)
+            for i in range(count)
+        )
+        + b"</items>"
+    )
+    half = count // 2
+    _, checkpoint = next(
+        islice(iterload_checkpoints(Item, BytesIO(doc), "item"), half - 1, None)
+    )
+
+    def full():
+        return list(iterload(Item, BytesIO(doc), "item"))
+
+    def full_checkpoints():
+        return [item for item, _ in iterload_checkpoints(Item, BytesIO(doc), "item")]
+
+    def restart():
+        return list(islice(iterload(Item, BytesIO(doc), "item"), half, None))
+
+    def resume():
+        items = iterload_checkpoints(Item, BytesIO(doc), "item", checkpoint=checkpoint)
+        return [item for item, _ in items]
+
+    assert full() == full_checkpoints()
+    assert restart() == resume()
+    print(f"{count} records, resuming after {half}")
+    for func in (full, full_checkpoints, restart, resume):
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{func.__name__:>16}: {elapsed:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Compare copying a loaded package document (the model from the functional
+tests) with `copy.deepcopy` against `clone`:
+
+    PYTHONPATH=src python benchmarks/clone.py [copies]
+"""
+
+import sys
+import timeit
+from copy import deepcopy
+from pathlib import Path
+
+from lxml import etree
+
+from xml_dataclasses import clone, load
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from functional.package_test import BASE, Package3  # isort:skip
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    parser = etree.XMLParser(remove_blank_text=True)
+    el = etree.parse(str(BASE / "package.xml"), parser).getroot()
+    package = load(Package3, el, "package")
+
+    def deepcopy_package():
+        return deepcopy(package)
+
+    def clone_package():
+        return clone(package)
+
+    assert deepcopy_package() == clone_package() == package
+    print(f"{count} copies")
+    for func in (deepcopy_package, clone_package):
+        elapsed = min(timeit.repeat(func, number=count, repeat=3))
+        print(f"{func.__name__:>16}: {elapsed:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare converting loaded instances to JSON via `dataclasses.asdict`, via
+`to_dict`, and directly via `dumps_json`:
+
+    PYTHONPATH=src python benchmarks/convert.py [records]
+"""
+
+import json
+import sys
+import timeit
+from dataclasses import asdict
+from typing import List, Optional, Union
+
+from lxml import etree
+
+from xml_dataclasses import dumps_json, load, text, to_dict, xml_dataclass
+
+
+@xml_dataclass
+class Value:
+    __ns__ = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Item:
+    __ns__ = None
+    id: str
+    kind: Optional[str] = None
+    value: Optional[Value] = None
+
+
+@xml_dataclass
+class Other:
+    __ns__ = None
+    id: str
+
+
+@xml_dataclass
+class Items:
+    __ns__ = None
+    item: List[Union[Other, Item]]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    el = etree.fromstring(
+        b"<items>"
+        + b"".join(
+            b'<item id="%d" kind="a"><value>value %d</value></item>' % (i, i)
+            for i in range(count)
+        )
+        + b"</items>"
+    )
+    items = load(Items, el, "items")
+
+    def asdict_dumps():
+        return json.dumps(asdict(items))
+
+    def to_dict_dumps():
+        return json.dumps(to_dict(items))
+
+    def dumps_json_items():
+        return dumps_json(items)
+
+    assert asdict_dumps() == to_dict_dumps() == dumps_json_items()
+    print(f"{count} records")
+    for func in (asdict_dumps, to_dict_dumps, dumps_json_items):
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{func.__name__:>16}: {elapsed:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare loading a stream of concatenated documents (one per line) with
+`iterload_documents`, against splitting the stream by hand and loading each
+document, and against streaming the same records from one document with
+`iterload`:
+
+    PYTHONPATH=src python benchmarks/documents.py [documents]
+"""
+
+import sys
+import timeit
+from io import BytesIO
+from typing import Optional
+
+from lxml import etree
+
+from xml_dataclasses import iterload, iterload_documents, load, text, xml_dataclass
+
+
+@xml_dataclass
+class Value:
+    __ns__ = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Message:
+    __ns__ = None
+    id: str
+    kind: Optional[str] = None
+    value: Optional[Value] = None
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    messages = [
+        b'<message id="%d" kind="a"><value>value %d</value></message>' % (i, i)
+        for i in range(count)
+    ]
+    documents = b"\n".join(messages) + b"\n"
+    single = b"<messages>" + b"".join(messages) + b"</messages>"
+
+    def split_by_hand():
+        parser = etree.XMLParser()
+        return [
+            load(Message, etree.fromstring(line, parser), "message")
+            for line in documents.splitlines()
+        ]
+
+    def documents_stream():
+        return list(iterload_documents(Message, BytesIO(documents), "message"))
+
+    def single_stream():
+        return list(iterload(Message, BytesIO(single), "message"))
+
+    assert split_by_hand() == documents_stream() == single_stream()
+    print(f"{count} documents")
+    for func in (split_by_hand, documents_stream, single_stream):
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{func.__name__:>16}: {elapsed:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
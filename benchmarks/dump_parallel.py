@@ -0,0 +1,57 @@
+"""Compare serializing a document with a large list of children with `dumps`,
+against `dump_parallel` with its own process pool (workers are initialized
+with the instance), and with a given process pool (chunks are pickled):
+
+    PYTHONPATH=src python benchmarks/dump_parallel.py [records] [chunk size]
+"""
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import List, Optional
+
+from xml_dataclasses import dump_parallel, dumps, text, xml_dataclass
+
+NS = "https://tobywf.com"
+NSMAP = {None: NS}
+
+
+@xml_dataclass
+class Item:
+    __ns__ = NS
+    id: str
+    kind: Optional[str] = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Items:
+    __ns__ = NS
+    item: List[Item]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    items = Items([Item(str(i), "a" if i % 2 else None, f"v{i}") for i in range(count)])
+
+    start = time.perf_counter()
+    data = dumps(items, "items", NSMAP, hoist_namespaces=True)
+    elapsed = time.perf_counter() - start
+    print(f"{count} records, {len(data) / 2**20:.1f} MiB")
+    print(f"{'dumps':>13}: {elapsed:7.3f}s")
+
+    for label, executor in (("initialized", None), ("pickled", ProcessPoolExecutor())):
+        buf = BytesIO()
+        start = time.perf_counter()
+        dump_parallel(items, buf, "items", NSMAP, chunk_size, executor)
+        elapsed = time.perf_counter() - start
+        print(f"{label:>13}: {elapsed:7.3f}s")
+        assert buf.getvalue() == data
+        if executor:
+            executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare serializing by building a tree with `dump` and then calling
+`tostring`, against streaming the output with `dumps` and `dump_to`, with
+and without hoisting namespace declarations:
+
+    PYTHONPATH=src python benchmarks/dumps.py [records]
+"""
+
+import sys
+import timeit
+from io import BytesIO
+from typing import List, Optional
+
+from lxml import etree
+
+from xml_dataclasses import dump, dump_to, dumps, text, xml_dataclass
+
+NS = "https://tobywf.com"
+NSMAP = {None: NS}
+
+
+@xml_dataclass
+class Item:
+    __ns__ = NS
+    id: str
+    kind: Optional[str] = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Items:
+    __ns__ = NS
+    item: List[Item]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = Items([Item(str(i), "a" if i % 2 else None, f"v{i}") for i in range(count)])
+    buf = BytesIO()
+
+    def dump_tostring():
+        return etree.tostring(dump(items, "items", NSMAP), encoding="utf-8")
+
+    def dump_hoisted_tostring():
+        el = dump(items, "items", NSMAP, hoist_namespaces=True)
+        return etree.tostring(el, encoding="utf-8")
+
+    def streamed():
+        return dumps(items, "items", NSMAP)
+
+    def streamed_reused():
+        buf.seek(0)
+        buf.truncate()
+        dump_to(items, buf, "items", NSMAP)
+
+    def streamed_hoisted():
+        return dumps(items, "items", NSMAP, hoist_namespaces=True)
+
+    size = len(streamed()) / 2**20
+    print(f"{count} records, {size:.1f} MiB")
+    for func in (
+        dump_tostring,
+        dump_hoisted_tostring,
+        streamed,
+        streamed_reused,
+        streamed_hoisted,
+    ):
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{func.__name__:>21}: {elapsed:7.3f}s {size / elapsed:7.1f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Compare loading a large file by reading it into memory first, by letting
+lxml parse the path, by streaming it through `load_file`, and by
+memory-mapping it.
+
+Each method runs in a fresh process, so the peak resident set size of that
+process can be reported as well:
+
+    PYTHONPATH=src python benchmarks/load_file.py [records]
+"""
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from lxml import etree
+
+from xml_dataclasses import load, load_file, text, xml_dataclass
+
+
+@xml_dataclass
+class Item:
+    __ns__ = None
+    id: str
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Items:
+    __ns__ = None
+    item: List[Item]
+
+
+def read_then_parse(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    return load(Items, etree.fromstring(data), "items")
+
+
+def path_parse(path):
+    return load(Items, etree.parse(path).getroot(), "items")
+
+
+def stream_parse(path):
+    return load_file(Items, path, "items")
+
+
+def mmap_parse(path):
+    return load_file(Items, path, "items", use_mmap=True)
+
+
+METHODS = {
+    f.__name__: f for f in (read_then_parse, path_parse, stream_parse, mmap_parse)
+}
+
+
+def generate(path, count):
+    with open(path, "wb") as f:
+        f.write(b"<items>")
+        for i in range(count):
+            f.write(b'<item id="%d">value %d</item>' % (i, i))
+        f.write(b"</items>")
+
+
+def run(method, path):
+    start = time.perf_counter()
+    items = METHODS[method](path)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{method:>16}: {elapsed:7.3f}s {rss:8.1f} MiB ({len(items.item)} items)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "items.xml")
+        generate(path, count)
+        size = os.path.getsize(path) / 2**20
+        print(f"{count} records, {size:.1f} MiB")
+        for method in METHODS:
+            subprocess.run(
+                [sys.executable, __file__, "--run", method, path], check=True
+            )
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--run"]:
+        run(sys.argv[2], sys.argv[3])
+    else:
+        main()
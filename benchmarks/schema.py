@@ -0,0 +1,73 @@
+"""Compare loading a large document with `load`, against validating it with
+the generated schema while parsing, and loading it with `Options(trusted=True)`:
+
+    PYTHONPATH=src python benchmarks/schema.py [items]
+"""
+
+import sys
+import timeit
+from typing import List, Optional
+
+from lxml import etree
+
+from xml_dataclasses import Options, get_schema, load, text, xml_dataclass
+
+NS = "https://tobywf.com"
+
+
+@xml_dataclass
+class Value:
+    __ns__ = NS
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Item:
+    __ns__ = NS
+    id: str
+    kind: Optional[str] = None
+    value: Optional[Value] = None
+    note: Optional[Value] = None
+
+
+@xml_dataclass
+class Items:
+    __ns__ = NS
+    item: List[Item]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    doc = (
+        b'<items xmlns="https://tobywf.com">'
+        + b"".join(
+            b'<item id="%d" kind="a"><value>value %d</value></item>' % (i, i)
+            for i in range(count)
+        )
+        + b"</items>"
+    )
+    trusted = Options(trusted=True)
+    schema = get_schema(Items, "items")
+
+    def parse_load():
+        return load(Items, etree.fromstring(doc), "items")
+
+    def validate_trusted():
+        parser = etree.XMLParser(schema=schema)
+        return load(Items, etree.fromstring(doc, parser), "items", trusted)
+
+    def parse():
+        return etree.fromstring(doc)
+
+    def validate():
+        return etree.fromstring(doc, etree.XMLParser(schema=schema))
+
+    assert parse_load() == validate_trusted()
+    print(f"{count} items")
+    for func in (parse_load, validate_trusted, parse, validate):
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{func.__name__:>16}: {elapsed:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Compare restoring a loaded document from XML (parse and `load`), from a
+pickle, and from a snapshot:
+
+    PYTHONPATH=src python benchmarks/snapshot.py [records]
+"""
+
+import pickle
+import sys
+import timeit
+from typing import List, Optional
+
+from lxml import etree
+
+from xml_dataclasses import (
+    dump,
+    dump_snapshot,
+    load,
+    load_snapshot,
+    text,
+    xml_dataclass,
+)
+
+NS = "https://tobywf.com"
+NSMAP = {None: NS}
+
+
+@xml_dataclass
+class Item:
+    __ns__ = NS
+    id: str
+    kind: Optional[str] = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Items:
+    __ns__ = NS
+    item: List[Item]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    items = Items(
+        [Item(str(i), "a" if i % 2 else None, f"v{i % 100}") for i in range(count)]
+    )
+    xml = etree.tostring(dump(items, "items", NSMAP))
+    items = load(Items, etree.fromstring(xml), "items")
+    pickled = pickle.dumps(items, pickle.HIGHEST_PROTOCOL)
+    snapshot = dump_snapshot(items)
+
+    def parse_load():
+        return load(Items, etree.fromstring(xml), "items")
+
+    def unpickle():
+        return pickle.loads(pickled)
+
+    def restore():
+        return load_snapshot(Items, snapshot)
+
+    print(f"{count} records")
+    for func, data in ((parse_load, xml), (unpickle, pickled), (restore, snapshot)):
+        assert func() == items
+        elapsed = min(timeit.repeat(func, number=1, repeat=3))
+        print(f"{func.__name__:>10}: {elapsed:7.3f}s {len(data) / 2**20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ from xml_dataclasses import (
     NsMap,
     XmlDataclass,
     dump,
+    dumps,
     ignored,
     load,
     rename,
@@ -73,3 +74,6 @@ def test_functional_container_no_whitespace(remove_blank_text):  # type: ignore
     el = dump(container, "container", nsmap)
     roundtrip = lmxl_dump(el)
     assert original == roundtrip
+    # streamed serialization is equivalent, apart from empty elements
+    streamed = etree.fromstring(dumps(container, "container", nsmap))
+    assert etree.tostring(streamed, method="c14n") == etree.tostring(el, method="c14n")
@@ -4,7 +4,7 @@ from typing import List, Mapping, Optional, Union
 
 from lxml import etree
 
-from xml_dataclasses import dump, load, rename, text, xml_dataclass
+from xml_dataclasses import dump, dumps, index_by, load, rename, text, xml_dataclass
 
 from .utils import lmxl_dump
 
@@ -68,7 +68,7 @@ class Item3:
 @xml_dataclass
 class Manifest3:
     __ns__ = NsMap.opf.value
-    item: List[Item3]
+    item: List[Item3] = index_by("id")
 
 
 @xml_dataclass
@@ -81,7 +81,7 @@ class ItemRef3:
 @xml_dataclass
 class Spine3:
     __ns__ = NsMap.opf.value
-    itemref: List[ItemRef3]
+    itemref: List[ItemRef3] = index_by("idref")
     toc: Optional[str] = None
 
 
@@ -103,6 +103,13 @@ def test_functional_package():
     el = etree.parse(str(BASE / "package.xml"), parser).getroot()
     original = lmxl_dump(el)
     package = load(Package3, el, "package")
+    for itemref in package.spine.itemref:
+        item = package.manifest.item_by_id(itemref.idref)
+        assert item is not None
+        assert package.spine.itemref_by_idref(item.id) is itemref
     el = dump(package, "package", NsMap.to_dict(NsMap.opf.value))
     roundtrip = lmxl_dump(el)
     assert original == roundtrip
+    # streamed serialization is the same
+    streamed = dumps(package, "package", NsMap.to_dict(NsMap.opf.value))
+    assert streamed == etree.tostring(el)
@@ -3,15 +3,30 @@ import logging
 logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 from .options import Options  # isort:skip
-from .modifiers import rename, text, ignored  # isort:skip
+from .modifiers import rename, text, ignored, index_by  # isort:skip
 from .resolve_types import (  # isort:skip
     is_xml_dataclass,
     xml_dataclass,
     NsMap,
     XmlDataclass,
 )
-from .serde import dump, load  # isort:skip
-
+from .serde import check, dump, dump_into, dump_to, dumps, load, load_any  # isort:skip
+from .tracking import tracked  # isort:skip
+from .files import dump_file, load_file, load_file_any  # isort:skip
+from .stream import (  # isort:skip
+    dump_documents,
+    iterload,
+    iterload_any,
+    iterload_documents,
+    iterload_windows,
+)
+from .record_index import build_index, load_at  # isort:skip
+from .parallel import dump_parallel, load_parallel  # isort:skip
+from .snapshot import dump_snapshot, load_snapshot  # isort:skip
+from .convert import dump_json, dumps_json, from_dict, to_dict  # isort:skip
+from .clone import clone  # isort:skip
+from .checkpoint import iterload_checkpoints  # isort:skip
+from .schema import generate_schema, get_schema, validate  # isort:skip
 
 # __all__ is required for mypy to pick up the imports
 # for errors, use `from xml_dataclasses.errors import ...`
@@ -19,10 +34,40 @@ __all__ = [
     "rename",
     "text",
     "dump",
+    "dumps",
+    "dump_to",
+    "dump_into",
     "load",
+    "load_any",
+    "check",
     "is_xml_dataclass",
     "xml_dataclass",
     "NsMap",
     "XmlDataclass",
     "ignored",
+    "index_by",
+    "tracked",
+    "iterload",
+    "iterload_any",
+    "iterload_windows",
+    "iterload_documents",
+    "dump_documents",
+    "build_index",
+    "load_at",
+    "load_file",
+    "load_file_any",
+    "dump_file",
+    "dump_parallel",
+    "load_parallel",
+    "dump_snapshot",
+    "load_snapshot",
+    "to_dict",
+    "from_dict",
+    "dump_json",
+    "dumps_json",
+    "clone",
+    "iterload_checkpoints",
+    "generate_schema",
+    "get_schema",
+    "validate",
 ]
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from typing import IO, Any, Iterator, List, Optional, Tuple, Type
+
+from lxml import etree  # type: ignore[import]
+
+from .files import open_source
+from .lxml_utils import format_ns
+from .options import Options
+from .resolve_types import XmlDataclassInstance, is_xml_dataclass
+from .scanner import END, START, find_document, find_root, iter_tokens
+from .serde import load
+
+_READ_SIZE = 2**20
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    # see `scanner.Root`. records are children of the root element, so the
+    # root is the only open element between records
+    context: bytes
+    root: bytes
+    # the offset after the last record, in the uncompressed document
+    offset: int
+
+    def write(self, path: Any) -> None:
+        data = json.dumps(
+            {
+                "context": self.context.decode("latin-1"),
+                "root": self.root.decode("latin-1"),
+                "offset": self.offset,
+            }
+        ).encode("utf-8")
+        # replaced atomically, so a crash never leaves a partial checkpoint
+        tmp_path = f"{os.fspath(path)}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def read(cls: Type["Checkpoint"], path: Any) -> "Checkpoint":
+        with open(path, "rb") as f:
+            data = json.loads(f.read().decode("utf-8"))
+        return cls(
+            data["context"].encode("latin-1"),
+            data["root"].encode("latin-1"),
+            data["offset"],
+        )
+
+
+def _find_root(f: IO[bytes]) -> Tuple[Any, bytes]:
+    buf = b""
+    while True:
+        chunk = f.read(_READ_SIZE)
+        buf += chunk
+        try:
+            return find_root(buf), buf
+        except ValueError:
+            # the start tag of the root element may not be complete yet
+            if not chunk:
+                raise
+
+
+def _iter_batches(  # pylint: disable=too-many-locals,too-many-branches
+    f: IO[bytes], buf: bytes, pos: int, offset: int, qname: bytes
+) -> Iterator[Tuple[bytes, List[int]]]:
+    # yields the complete records in the buffer, and the offset after each
+    # one. `offset` is the offset of the buffer in the document
+    depth = 0
+    start = scanned = pos
+    while True:
+        chunk = f.read(_READ_SIZE)
+        buf += chunk
+        first = start if depth else scanned
+        ends = []
+        closed = False
+        while not closed:
+            found = find_document(buf, scanned) if depth == 0 else None
+            if found is not None:
+                start, scanned = found
+                ends.append(offset + scanned)
+                continue
+
+            for m in iter_tokens(buf, scanned):
+                kind = m.lastgroup
+                scanned = m.end()
+                if kind == START:
+                    if depth == 0:
+                        start = m.start()
+                    if not m.group("empty"):
+                        depth += 1
+                        continue
+                elif kind == END:
+                    # the end tag of the root element
+                    closed = depth == 0
+                    if closed:
+                        break
+                    depth -= 1
+                else:
+                    continue
+                if depth == 0:
+                    ends.append(offset + scanned)
+                    break
+            else:
+                # the rest of the buffer is incomplete
+                break
+
+        if ends:
+            yield buf[first : ends[-1] - offset], ends
+        if closed:
+            return
+        if not chunk:
+            name = qname.decode("utf-8", "replace")
+            raise ValueError(f"Root element '{name}' not closed")
+        # an incomplete record is kept, until its end tag is read
+        keep = start if depth else scanned
+        buf = buf[keep:]
+        offset += keep
+        start -= keep
+        scanned -= keep
+
+
+def iterload_checkpoints(  # pylint: disable=too-many-arguments,too-many-locals
+    cls: Type[XmlDataclassInstance],
+    source: Any,
+    name: str,
+    options: Optional[Options] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    parser: Any = None,
+) -> Iterator[Tuple[XmlDataclassInstance, Checkpoint]]:
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+
+    tag = format_ns(name, cls.__ns__)
+    with open_source(source) as f:
+        if checkpoint is None:
+            root, buf = _find_root(f)
+            if root.is_empty:
+                return
+            context, qname, pos, offset = root.context, root.qname, root.end, 0
+        else:
+            # compressed sources are decompressed up to the offset
+            f.seek(checkpoint.offset)
+            context, qname = checkpoint.context, checkpoint.root
+            buf, pos, offset = b"", 0, checkpoint.offset
+
+        end_tag = b"</" + qname + b">"
+        for fragment, ends in _iter_batches(f, buf, pos, offset, qname):
+            # re-establish the namespace context of the records, which are
+            # parsed together. every record is one child element
+            doc = b"".join((context, fragment, end_tag))
+            children = etree.fromstring(doc, parser).iterchildren(etree.Element)
+            for el, end in zip(children, ends):
+                if el.tag == tag:
+                    instance = load(cls, el, options=options)
+                    yield instance, Checkpoint(context, qname, end)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from dataclasses import fields
+from typing import Any, Callable, Dict, List, Tuple, Type, cast
+
+from .resolve_types import (
+    XmlDataclass,
+    XmlDataclassInstance,
+    is_frozen,
+    is_xml_dataclass,
+)
+from .tracking import is_tracked
+
+Cloner = Callable[[Any, bool], Any]
+ChildCloners = Dict[Type[XmlDataclass], Tuple[Cloner, bool]]
+
+
+def _ignored_names(cls: Type[Any]) -> List[str]:
+    return [f.name for f in fields(cls) if not f.init]
+
+
+def is_immutable(cls: Type[XmlDataclass]) -> bool:
+    # instances of frozen classes without lists or ignored fields, and whose
+    # children are immutable too, can never change after they are created.
+    # tuples of children are allowed, since they can't be changed either
+    try:
+        return cast(bool, cls.__dict__["__xml_immutable__"])
+    except KeyError:
+        pass
+
+    immutable = (
+        is_frozen(cls)
+        and not _ignored_names(cls)
+        and all(
+            (child.is_tuple or not child.is_list)
+            and all(is_immutable(tp) for tp in child.base_types)
+            for child in cls.__children__
+        )
+    )
+    setattr(cls, "__xml_immutable__", immutable)
+    return immutable
+
+
+def _get_cloner(cls: Type[XmlDataclass]) -> Cloner:
+    try:
+        return cast(Cloner, cls.__dict__["__xml_cloner__"])
+    except KeyError:
+        pass
+
+    # tracked instances must link their children, which the constructor does
+    use_init = is_tracked(cls) and not is_frozen(cls)
+    ignored = _ignored_names(cls)
+    # attribute and text values are strings, which are shared
+    names = [attr.dt_name for attr in cls.__attributes__]
+    if cls.__text_field__:
+        names.append(cls.__text_field__.dt_name)
+    # filled in after the cloner is cached
+    children: List[Tuple[str, bool, bool, ChildCloners]] = []
+
+    def clone_child(types: ChildCloners, value: Any, share: bool) -> Any:
+        try:
+            clone_value, immutable = types[type(value)]
+        except KeyError:
+            msg = f"Class '{type(value)!r}' is not a valid child type {tuple(types)!r}"
+            raise ValueError(msg) from None
+        if share and immutable:
+            return value
+        return clone_value(value, share)
+
+    def clone_instance(instance: Any, share: bool) -> Any:
+        values = {name: getattr(instance, name) for name in names}
+        for name, is_list, is_tuple, types in children:
+            value = getattr(instance, name)
+            if value is None:
+                values[name] = None
+            elif is_list:
+                items = [clone_child(types, item, share) for item in value]
+                values[name] = tuple(items) if is_tuple else items
+            else:
+                values[name] = clone_child(types, value, share)
+
+        if use_init:
+            new = cls(**values)
+        else:
+            new = object.__new__(cls)
+            new.__dict__.update(values)
+        # namespace maps are never modified, so they are shared
+        state = new.__dict__
+        state["__nsmap__"] = instance.__nsmap__
+        for name in ignored:
+            try:
+                state[name] = deepcopy(instance.__dict__[name])
+            except KeyError:
+                pass
+        return new
+
+    setattr(cls, "__xml_cloner__", clone_instance)
+    for child in cls.__children__:
+        types = {tp: (_get_cloner(tp), is_immutable(tp)) for tp in child.base_types}
+        children.append((child.dt_name, child.is_list, child.is_tuple, types))
+    return clone_instance
+
+
+def clone(
+    instance: XmlDataclassInstance, share_frozen: bool = False
+) -> XmlDataclassInstance:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    return cast(XmlDataclassInstance, _get_cloner(cls)(instance, share_frozen))
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+from io import StringIO
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Any, Callable, Dict, List, Tuple, Type, cast
+
+from .resolve_types import XmlDataclass, XmlDataclassInstance, is_xml_dataclass
+from .serde import create_instance
+
+ToDict = Callable[[Any], Dict[str, Any]]
+FromDict = Callable[[Any], Any]
+WriteJson = Callable[[Any, Callable[[str], Any], Callable[[str], str]], None]
+
+
+def _child_type_error(types: Dict[Type[XmlDataclass], Any], value: Any) -> ValueError:
+    msg = f"Class '{type(value)!r}' is not a valid child type {tuple(types)!r}"
+    return ValueError(msg)
+
+
+def _get_to_dict(cls: Type[XmlDataclass]) -> ToDict:
+    try:
+        return cast(ToDict, cls.__dict__["__xml_to_dict__"])
+    except KeyError:
+        pass
+
+    # attribute and text values are strings, which are shared
+    names = [attr.dt_name for attr in cls.__attributes__]
+    if cls.__text_field__:
+        names.append(cls.__text_field__.dt_name)
+    # filled in after the converter is cached
+    children: List[Tuple[str, bool, Dict[Type[XmlDataclass], ToDict]]] = []
+
+    def convert(types: Dict[Type[XmlDataclass], ToDict], value: Any) -> Any:
+        try:
+            convert_child = types[type(value)]
+        except KeyError:
+            raise _child_type_error(types, value) from None
+        return convert_child(value)
+
+    def convert_instance(instance: Any) -> Dict[str, Any]:
+        data = {name: getattr(instance, name) for name in names}
+        for name, is_list, types in children:
+            value = getattr(instance, name)
+            if value is None:
+                data[name] = None
+            elif is_list:
+                data[name] = [convert(types, item) for item in value]
+            else:
+                data[name] = convert(types, value)
+        return data
+
+    setattr(cls, "__xml_to_dict__", convert_instance)
+    for child in cls.__children__:
+        types = {tp: _get_to_dict(tp) for tp in child.base_types}
+        children.append((child.dt_name, child.is_list, types))
+    return convert_instance
+
+
+def to_dict(instance: XmlDataclass) -> Dict[str, Any]:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    return _get_to_dict(cls)(instance)
+
+
+def _get_from_dict(  # pylint: disable=too-many-locals,too-many-statements
+    cls: Type[XmlDataclass],
+) -> FromDict:
+    try:
+        return cast(FromDict, cls.__dict__["__xml_from_dict__"])
+    except KeyError:
+        pass
+
+    fields = [(attr.dt_name, attr.is_required) for attr in cls.__attributes__]
+    if cls.__text_field__:
+        text = cls.__text_field__
+        fields.append((text.dt_name, text.is_required))
+    known = {name for name, _ in fields}
+    known.update(child.dt_name for child in cls.__children__)
+    children: List[Tuple[str, bool, bool, bool, List[FromDict]]] = []
+
+    def convert(name: str, types: List[FromDict], value: Any) -> Any:
+        if len(types) == 1:
+            return types[0](value)
+        errors = []
+        # try to find one matching type, like union child elements
+        for convert_child in types:
+            try:
+                return convert_child(value)
+            except ValueError as e:
+                errors.append(e)
+        raise ValueError(
+            f"Invalid value found for '{name}' in '{cls.__qualname__}':\n"
+            + "\n".join(str(e) for e in errors)
+        )
+
+    def convert_data(data: Any) -> Any:  # pylint: disable=too-many-branches
+        if not isinstance(data, dict):
+            raise ValueError(f"Value '{data!r}' for '{cls.__qualname__}' is not a dict")
+        unknown = data.keys() - known
+        if unknown:
+            readable = ", ".join(f"'{v}'" for v in unknown)
+            raise ValueError(
+                f"Found undeclared fields for '{cls.__qualname__}': {readable}"
+            )
+
+        values: Dict[str, Any] = {}
+        for name, is_required in fields:
+            try:
+                value = data[name]
+            except KeyError:
+                if is_required:
+                    raise ValueError(
+                        f"Required field '{name}' not found for '{cls.__qualname__}'"
+                    ) from None
+                # the default of the field is used
+                continue
+            if value is not None and not isinstance(value, str):
+                raise ValueError(f"Value '{value!r}' is not a string")
+            values[name] = value
+
+        for name, is_required, is_list, is_tuple, types in children:
+            try:
+                value = data[name]
+            except KeyError:
+                if is_required:
+                    raise ValueError(
+                        f"Required field '{name}' not found for '{cls.__qualname__}'"
+                    ) from None
+                continue
+            if value is None:
+                values[name] = None
+            elif is_list:
+                if not isinstance(value, list):
+                    raise ValueError(f"Value '{value!r}' for '{name}' is not a list")
+                items = [convert(name, types, item) for item in value]
+                values[name] = tuple(items) if is_tuple else items
+            else:
+                values[name] = convert(name, types, value)
+
+        return create_instance(cls, values, None)
+
+    setattr(cls, "__xml_from_dict__", convert_data)
+    for child in cls.__children__:
+        types = [_get_from_dict(tp) for tp in child.base_types]
+        children.append(
+            (child.dt_name, child.is_required, child.is_list, child.is_tuple, types)
+        )
+    return convert_data
+
+
+def from_dict(cls: Type[XmlDataclassInstance], data: Any) -> XmlDataclassInstance:
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    return cast(XmlDataclassInstance, _get_from_dict(cls)(data))
+
+
+def _get_write_json(cls: Type[XmlDataclass]) -> WriteJson:
+    try:
+        return cast(WriteJson, cls.__dict__["__xml_write_json__"])
+    except KeyError:
+        pass
+
+    # the keys are encoded once, with the same separators as `json.dumps`
+    names = [attr.dt_name for attr in cls.__attributes__]
+    if cls.__text_field__:
+        names.append(cls.__text_field__.dt_name)
+    keys = names + [child.dt_name for child in cls.__children__]
+    prefixes = [
+        ("{" if i == 0 else ", ") + encode_basestring_ascii(key) + ": "
+        for i, key in enumerate(keys)
+    ]
+    strings = list(zip(prefixes, names))
+    children: List[Tuple[str, str, bool, Dict[Type[XmlDataclass], WriteJson]]] = []
+    end = "}" if keys else "{}"
+
+    def write_child(
+        types: Dict[Type[XmlDataclass], WriteJson],
+        value: Any,
+        write: Callable[[str], Any],
+        encode: Callable[[str], str],
+    ) -> None:
+        try:
+            write_value = types[type(value)]
+        except KeyError:
+            raise _child_type_error(types, value) from None
+        write_value(value, write, encode)
+
+    def write_json(
+        instance: Any, write: Callable[[str], Any], encode: Callable[[str], str]
+    ) -> None:
+        for prefix, name in strings:
+            write(prefix)
+            value = getattr(instance, name)
+            if value is None:
+                write("null")
+            elif isinstance(value, str):
+                write(encode(value))
+            else:
+                raise ValueError(f"Value '{value!r}' is not a string")
+        for prefix, name, is_list, types in children:
+            write(prefix)
+            value = getattr(instance, name)
+            if value is None:
+                write("null")
+            elif is_list:
+                write("[")
+                for i, item in enumerate(value):
+                    if i:
+                        write(", ")
+                    write_child(types, item, write, encode)
+                write("]")
+            else:
+                write_child(types, value, write, encode)
+        write(end)
+
+    setattr(cls, "__xml_write_json__", write_json)
+    for prefix, child in zip(prefixes[len(names) :], cls.__children__):
+        types = {tp: _get_write_json(tp) for tp in child.base_types}
+        children.append((prefix, child.dt_name, child.is_list, types))
+    return write_json
+
+
+def dump_json(instance: XmlDataclass, stream: Any, ensure_ascii: bool = True) -> None:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    encode = encode_basestring_ascii if ensure_ascii else encode_basestring
+    _get_write_json(cls)(instance, stream.write, encode)
+
+
+def dumps_json(instance: XmlDataclass, ensure_ascii: bool = True) -> str:
+    buf = StringIO()
+    dump_json(instance, buf, ensure_ascii)
+    return buf.getvalue()
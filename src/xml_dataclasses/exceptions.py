@@ -1,3 +1,6 @@
+from typing import Any, List, Optional, Tuple
+
+
 class XmlDataclassError(Exception):
     pass
 
@@ -28,5 +31,138 @@ class XmlDataclassDuplicateFieldError(XmlDataclassModelError):
     pass
 
 
+class XmlDataclassDuplicateRootError(XmlDataclassModelError):
+    pass
+
+
 class XmlTypeError(XmlDataclassModelError):
     pass
+
+
+class XmlResourceLimitError(XmlDataclassError):
+    # not a `ValueError`, so loading is aborted even when trying the types of
+    # a union, or collecting errors
+    pass
+
+
+class _LazyMessageError(XmlDataclassError, ValueError):
+    # the message is only formatted when needed, since many errors are
+    # discarded (e.g. when trying the types of a union). it is also used as
+    # `args`, which aren't passed to `__init__`
+
+    @property  # type: ignore[override]
+    def args(self) -> Tuple[Any, ...]:
+        return super().args or (str(self),)
+
+    @args.setter
+    def args(self, value: Tuple[Any, ...]) -> None:
+        # pylint: disable-next=unnecessary-dunder-call
+        BaseException.args.__set__(self, value)  # type: ignore[attr-defined]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self)!r})"
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # elements can't be pickled, e.g. to be sent from a worker process
+        return (ValueError, (str(self),))
+
+
+class XmlLoadError(_LazyMessageError):
+    MESSAGE = "Invalid element '{tag}'"
+
+    def __init__(self, el: Any, field: Optional[str] = None, **values: Any) -> None:
+        super().__init__()
+        self.el = el
+        self.field = field
+        self.values = values
+
+    @property
+    def tag(self) -> str:
+        return str(self.el.tag)
+
+    @property
+    def path(self) -> str:
+        return str(self.el.getroottree().getelementpath(self.el))
+
+    def __str__(self) -> str:
+        return self.MESSAGE.format(tag=self.tag, field=self.field, **self.values)
+
+
+class XmlNameError(XmlLoadError):
+    MESSAGE = "Found element '{name}', expected '{field}' ('{tag}')"
+
+
+class XmlNamespaceError(XmlLoadError):
+    MESSAGE = "Found namespace '{namespace}', expected '{expected}' ('{tag}')"
+
+
+class XmlRequiredAttributeError(XmlLoadError):
+    MESSAGE = "Required attribute '{field}' not found on '{tag}'"
+
+
+class XmlUndeclaredAttributesError(XmlLoadError):
+    MESSAGE = "Found undeclared attributes on '{tag}': {readable}"
+
+    def __str__(self) -> str:
+        readable = ", ".join(f"'{v}'" for v in self.values["names"])
+        return self.MESSAGE.format(tag=self.tag, readable=readable)
+
+
+class XmlCommentsError(XmlLoadError):
+    MESSAGE = "Element '{tag}' contains comments"
+
+
+class XmlProcessingInstructionsError(XmlLoadError):
+    MESSAGE = "Element '{tag}' contains processing instructions"
+
+
+class XmlChildElementsError(XmlLoadError):
+    MESSAGE = "Element '{tag}' has child elements (expected text only)"
+
+
+class XmlNoTextError(XmlLoadError):
+    MESSAGE = "Element '{tag}' has no text"
+
+
+class XmlTextError(XmlLoadError):
+    MESSAGE = "Element '{tag}' has text (expected child elements only)"
+
+
+class XmlRequiredChildError(XmlLoadError):
+    MESSAGE = "Required child element '{field}' not found in '{tag}'"
+
+
+class XmlMultipleChildrenError(XmlLoadError):
+    MESSAGE = "Multiple child elements '{field}' in '{tag}'"
+
+
+class XmlUndeclaredChildrenError(XmlLoadError):
+    MESSAGE = "Found undeclared child elements on '{tag}': {readable}"
+
+    def __str__(self) -> str:
+        readable = ", ".join(f"'{v}'" for v in self.values["names"])
+        return self.MESSAGE.format(tag=self.tag, readable=readable)
+
+
+class XmlUnionError(XmlLoadError):
+    MESSAGE = "Invalid child elements found for '{field}' in '{tag}':\n{causes}"
+
+    def __str__(self) -> str:
+        causes = "\n".join(str(e) for e in self.values["causes"])
+        return self.MESSAGE.format(tag=self.tag, field=self.field, causes=causes)
+
+
+class XmlLoadErrors(_LazyMessageError):
+    def __init__(self, errors: List[ValueError]) -> None:
+        super().__init__()
+        self.errors = errors
+
+    def __str__(self) -> str:
+        return f"Found {len(self.errors)} errors:\n" + "\n".join(
+            str(e) for e in self.errors
+        )
+
+
+class XmlSchemaError(XmlDataclassError, ValueError):
+    # a document isn't valid against the schema generated for a model
+    pass
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+from contextlib import ExitStack, contextmanager
+from typing import IO, Any, Callable, Dict, Iterator, Optional, Type
+
+from lxml import etree  # type: ignore[import]
+
+from .options import Options
+from .resolve_types import NsMap, XmlDataclass, XmlDataclassInstance
+from .serde import dump_to, load, load_any
+
+_COMPRESSION: Dict[str, Callable[..., Any]] = {
+    "gzip": gzip.open,
+    "bz2": bz2.open,
+    "xz": lzma.open,
+}
+_MAGIC = {
+    b"\x1f\x8b": "gzip",
+    b"BZh": "bz2",
+    b"\xfd7zXZ\x00": "xz",
+}
+_MAGIC_LEN = max(len(magic) for magic in _MAGIC)
+_SUFFIXES = {
+    ".gz": "gzip",
+    ".bz2": "bz2",
+    ".xz": "xz",
+}
+# only one chunk of the mapped file is copied at a time
+_FEED_SIZE = 2**20
+
+
+class _Prefixed(io.RawIOBase):
+    # re-attaches bytes already read from a stream that can't seek or peek
+    def __init__(self, prefix: bytes, f: IO[bytes]) -> None:
+        super().__init__()
+        self.prefix = prefix
+        self.f = f
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b: Any) -> int:
+        if self.prefix:
+            n = min(len(b), len(self.prefix))
+            b[:n] = self.prefix[:n]
+            self.prefix = self.prefix[n:]
+            return n
+        data = self.f.read(len(b))
+        n = len(data)
+        b[:n] = data
+        return n
+
+
+def _is_path(source: Any) -> bool:
+    return isinstance(source, (str, bytes, os.PathLike))
+
+
+def _peek(f: Any) -> Any:
+    try:
+        peek = f.peek
+    except AttributeError:
+        pass
+    else:
+        return f, peek(_MAGIC_LEN)[:_MAGIC_LEN]
+
+    magic = f.read(_MAGIC_LEN)
+    if f.seekable():
+        f.seek(-len(magic), io.SEEK_CUR)
+        return f, magic
+    return io.BufferedReader(_Prefixed(magic, f)), magic
+
+
+def detect_compression(magic: bytes) -> Optional[str]:
+    for prefix, compression in _MAGIC.items():
+        if magic.startswith(prefix):
+            return compression
+    return None
+
+
+@contextmanager
+def open_source(source: Any) -> Iterator[IO[bytes]]:
+    with ExitStack() as stack:
+        f: Any
+        if _is_path(source):
+            f = stack.enter_context(open(source, "rb"))
+        else:
+            f = source
+        f, magic = _peek(f)
+        compression = detect_compression(magic)
+        if compression:
+            # closing the decompressor doesn't close the underlying file
+            f = stack.enter_context(_COMPRESSION[compression](f, "rb"))
+        yield f
+
+
+@contextmanager
+def open_target(target: Any, compression: Optional[str] = None) -> Iterator[IO[bytes]]:
+    if compression and compression not in _COMPRESSION:
+        raise ValueError(f"Unknown compression '{compression}'")
+
+    with ExitStack() as stack:
+        f: Any
+        if _is_path(target):
+            if compression is None:
+                _, suffix = os.path.splitext(os.fsdecode(target))
+                compression = _SUFFIXES.get(suffix.lower())
+            f = stack.enter_context(open(target, "wb"))
+        else:
+            f = target
+        if compression:
+            f = stack.enter_context(_COMPRESSION[compression](f, "wb"))
+        yield f
+
+
+def _parse_mapped(source: Any, parser: Any) -> Any:
+    with ExitStack() as stack:
+        f: Any
+        if _is_path(source):
+            f = stack.enter_context(open(source, "rb"))
+        else:
+            f = source
+        mm = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        if detect_compression(mm[:_MAGIC_LEN]):
+            raise ValueError(f"File '{source}' is compressed, and can't be mapped")
+
+        if parser is None:
+            parser = etree.XMLParser()
+        for i in range(0, len(mm), _FEED_SIZE):
+            parser.feed(mm[i : i + _FEED_SIZE])
+        return parser.close()
+
+
+def _parse_file(source: Any, parser: Any, use_mmap: bool) -> Any:
+    if use_mmap:
+        return _parse_mapped(source, parser)
+    with open_source(source) as f:
+        return etree.parse(f, parser).getroot()
+
+
+def load_file(  # pylint: disable=too-many-arguments
+    cls: Type[XmlDataclassInstance],
+    source: Any,
+    name: Optional[str] = None,
+    options: Optional[Options] = None,
+    parser: Any = None,
+    use_mmap: bool = False,
+) -> XmlDataclassInstance:
+    return load(cls, _parse_file(source, parser, use_mmap), name, options)
+
+
+def load_file_any(
+    source: Any,
+    options: Optional[Options] = None,
+    parser: Any = None,
+    use_mmap: bool = False,
+) -> XmlDataclass:
+    return load_any(_parse_file(source, parser, use_mmap), options)
+
+
+def dump_file(  # pylint: disable=too-many-arguments
+    instance: XmlDataclassInstance,
+    target: Any,
+    name: str,
+    nsmap: NsMap,
+    compression: Optional[str] = None,
+    encoding: str = "utf-8",
+) -> None:
+    with open_target(target, compression) as f:
+        dump_to(instance, f, name, nsmap, encoding, xml_declaration=True)
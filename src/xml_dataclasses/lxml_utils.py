@@ -1,5 +1,8 @@
 from typing import Optional, Tuple
 
+# bound to the reserved `xml` prefix, and never declared
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
 
 def format_ns(name: str, namespace: Optional[str]) -> str:
     if namespace:
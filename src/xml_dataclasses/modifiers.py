@@ -52,3 +52,19 @@ def text(
 # see https://github.com/python/typeshed/blob/master/stdlib/3.7/dataclasses.pyi
 def ignored() -> _T:
     return field(init=False, compare=False)  # type: ignore[no-any-return]
+
+
+# NOTE: Actual return type is 'Field[_T]', but we want to help type checkers
+# to understand the magic that happens at runtime.
+# see https://github.com/python/typeshed/blob/master/stdlib/3.7/dataclasses.pyi
+def index_by(
+    key: str,
+    f: Optional[Field[_T]] = None,
+    default: Union[_T, _MISSING_TYPE] = MISSING,
+) -> _T:
+    if f is None:
+        f = make_field(default=default)
+    metadata = dict(f.metadata)
+    metadata["xml:index_by"] = key
+    f.metadata = metadata  # type: ignore[assignment]
+    return f  # type: ignore[return-value]
@@ -1,7 +1,27 @@
 from dataclasses import dataclass
+from typing import Any, Dict, Optional
 
 
 @dataclass
-class Options:
+class Options:  # pylint: disable=too-many-instance-attributes
     ignore_unknown_attributes: bool = False
     ignore_unknown_children: bool = False
+    # skip these nodes instead of raising an error
+    ignore_comments: bool = False
+    ignore_processing_instructions: bool = False
+    # share identical strings, and identical instances of frozen classes
+    intern_values: bool = False
+    # if not given, a new table is used for every call to `load`
+    intern_table: Optional[Dict[Any, Any]] = None
+    # report all errors in a document at once, instead of only the first one
+    collect_errors: bool = False
+    # limits for untrusted documents, exceeding them raises an
+    # `XmlResourceLimitError`
+    max_depth: Optional[int] = None
+    max_elements: Optional[int] = None
+    max_list_length: Optional[int] = None
+    max_value_size: Optional[int] = None
+    # skip the checks of the schema generated for the model, for documents
+    # already validated against it. ignored with limits, interning, or when
+    # collecting errors
+    trusted: bool = False
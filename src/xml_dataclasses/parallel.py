@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from io import BytesIO
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from lxml import etree  # type: ignore[import]
+
+from .lxml_utils import format_ns
+from .options import Options
+from .resolve_types import NsMap, XmlDataclassInstance, hoist_nsmap, is_xml_dataclass
+from .scanner import Root, find_root
+from .serde import iter_children, load, qualified_name, write_element, xmlfile_attrib
+
+Children = List[Tuple[str, Any]]
+# start and end offset of a range of records, the last range has no end
+Range = Tuple[int, Optional[int]]
+
+_SECTIONS = ((b"<!--", b"-->"), (b"<![CDATA[", b"]]>"), (b"<?", b"?>"))
+
+
+def _dump_chunk(
+    tag: str, nsmap: Dict[Optional[str], str], children: Children, encoding: str
+) -> bytes:
+    # the children are written inside an element with the same namespace
+    # declarations as the root, and then cut out
+    buf = BytesIO()
+    with etree.xmlfile(buf, encoding=encoding) as xf:
+        with xf.element(tag, nsmap=nsmap):
+            xf.flush()
+            start = buf.tell()
+            for child_name, value in children:
+                write_element(xf, value, child_name, nsmap, nsmap, None, True)
+            xf.flush()
+            end = buf.tell()
+    return buf.getvalue()[start:end]
+
+
+# tag, namespace map, children of the root element, and encoding
+DumpState = Tuple[str, Dict[Optional[str], str], Children, str]
+# the root instance of `dump_parallel`, set once in each worker process
+_DUMP_STATE: Dict[str, DumpState] = {}
+
+
+def _init_dump_worker(
+    instance: XmlDataclassInstance,
+    tag: str,
+    nsmap: Dict[Optional[str], str],
+    encoding: str,
+) -> None:
+    _DUMP_STATE["state"] = (tag, nsmap, list(iter_children(instance)), encoding)
+
+
+def _dump_range(start: int, end: int) -> bytes:
+    tag, nsmap, children, encoding = _DUMP_STATE["state"]
+    return _dump_chunk(tag, nsmap, children[start:end], encoding)
+
+
+def dump_parallel(  # pylint: disable=too-many-arguments,too-many-locals
+    instance: XmlDataclassInstance,
+    stream: Any,
+    name: str,
+    nsmap: NsMap,
+    chunk_size: int = 10_000,
+    executor: Optional[Executor] = None,
+    encoding: str = "utf-8",
+    xml_declaration: bool = False,
+) -> None:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    if chunk_size < 1:
+        raise ValueError(f"Chunk size must be at least 1 (got {chunk_size})")
+
+    # all chunks must be serialized with the same namespace declarations
+    resolved_nsmap = instance.__nsmap__ if instance.__nsmap__ else nsmap
+    hoisted = hoist_nsmap(cls, resolved_nsmap)
+
+    tag = qualified_name(instance, name)
+    children = [] if cls.__text_field__ else list(iter_children(instance))
+    with ExitStack() as stack:
+        xf = stack.enter_context(etree.xmlfile(stream, encoding=encoding))
+        if xml_declaration:
+            xf.write_declaration()
+        if not children:
+            write_element(xf, instance, name, hoisted, {}, None, True)
+            return
+
+        if executor is None:
+            # the instance is sent to each worker once (or inherited when the
+            # process is forked), so only index ranges of children are sent
+            pool = ProcessPoolExecutor(
+                initializer=_init_dump_worker,
+                initargs=(instance, tag, hoisted, encoding),
+            )
+            stack.enter_context(pool)
+
+            def submit(start: int) -> Future[bytes]:
+                return pool.submit(_dump_range, start, start + chunk_size)
+
+        else:
+            # workers of other executors can't be initialized, so chunks of
+            # children are sent instead
+            other = executor
+
+            def submit(start: int) -> Future[bytes]:
+                chunk = children[start : start + chunk_size]
+                return other.submit(_dump_chunk, tag, hoisted, chunk, encoding)
+
+        # limits the number of serialized chunks held in memory
+        max_pending = 2 * (os.cpu_count() or 1)
+        pending: Deque[Future[bytes]] = deque()
+
+        def write_next() -> None:
+            fragment = pending.popleft().result()
+            xf.flush()
+            stream.write(fragment)
+
+        with xf.element(tag, xmlfile_attrib(instance), nsmap=hoisted):
+            for start in range(0, len(children), chunk_size):
+                pending.append(submit(start))
+                if len(pending) >= max_pending:
+                    write_next()
+            while pending:
+                write_next()
+
+
+def _section_end(buf: Any, start: int, end: int) -> int:
+    # if a comment, CDATA section, or processing instruction that was opened
+    # since the start isn't closed at the end, returns the offset after it
+    for open_marker, close_marker in _SECTIONS:
+        i = buf.rfind(open_marker, start, end)
+        if i < 0 or buf.find(close_marker, i + len(open_marker), end) >= 0:
+            continue
+        j = buf.find(close_marker, end)
+        return len(buf) if j < 0 else j + len(close_marker)
+    return -1
+
+
+def _iter_ranges(buf: Any, root: Root, name: str, chunk_bytes: int) -> Iterator[Range]:
+    # candidates are end tags of records with any prefix. this is only a
+    # guess, unsound split points are detected when the ranges are parsed
+    end_tag = re.compile(
+        rb"</(?:[^\s/>:]+:)?" + re.escape(name.encode(root.encoding)) + rb"\s*>"
+    )
+    start = root.end
+    pos = start + chunk_bytes
+    while pos < len(buf):
+        m = end_tag.search(buf, pos)
+        if m is None:
+            break
+        split = m.end()
+        section_end = _section_end(buf, start, split)
+        if section_end >= 0:
+            pos = section_end
+            continue
+        yield start, split
+        start = split
+        pos = split + chunk_bytes
+    yield start, None
+
+
+def _load_range(  # pylint: disable=too-many-arguments
+    cls: Type[XmlDataclassInstance],
+    path: Any,
+    root: Root,
+    span: Range,
+    tag: str,
+    options: Optional[Options],
+) -> List[XmlDataclassInstance]:
+    start, end = span
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        fragment = mm[start:end]
+
+    # re-establish the namespace context of the records. the last range
+    # includes the end tag of the root element
+    if end is None:
+        doc = root.context + fragment
+    else:
+        doc = b"".join((root.context, fragment, b"</", root.qname, b">"))
+    el = etree.fromstring(doc)
+    return [load(cls, child, options=options) for child in el.iterchildren(tag)]
+
+
+def load_parallel(  # pylint: disable=too-many-arguments,too-many-locals
+    cls: Type[XmlDataclassInstance],
+    path: Any,
+    name: str,
+    options: Optional[Options] = None,
+    chunk_bytes: int = 2**26,
+    executor: Optional[Executor] = None,
+) -> Iterator[XmlDataclassInstance]:
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    if chunk_bytes < 1:
+        raise ValueError(f"Chunk size must be at least 1 (got {chunk_bytes})")
+
+    tag = format_ns(name, cls.__ns__)
+    with ExitStack() as stack:
+        f = stack.enter_context(open(path, "rb"))
+        mm = stack.enter_context(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        root = find_root(mm)
+        if root.is_empty:
+            return
+
+        if executor is None:
+            executor = stack.enter_context(ProcessPoolExecutor())
+        # limits the number of loaded ranges held in memory
+        max_pending = 2 * (os.cpu_count() or 1)
+        pending: Deque[Tuple[Range, Future[List[XmlDataclassInstance]]]] = deque()
+        ranges = _iter_ranges(mm, root, name, chunk_bytes)
+
+        carry: Optional[int] = None
+        while True:
+            for span in ranges:
+                future = executor.submit(
+                    _load_range, cls, path, root, span, tag, options
+                )
+                pending.append((span, future))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+
+            (start, end), future = pending.popleft()
+            try:
+                if carry is None:
+                    records = future.result()
+                else:
+                    # an unsound split point, parse both ranges as one
+                    future.cancel()
+                    start = carry
+                    records = _load_range(cls, path, root, (start, end), tag, options)
+            except etree.XMLSyntaxError:
+                # a split point inside of a record or section leaves the
+                # previous range unbalanced. the last range has no split point
+                if end is None:
+                    raise
+                carry = start
+                continue
+            carry = None
+            yield from records
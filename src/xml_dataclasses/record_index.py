@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+from lxml import etree  # type: ignore[import]
+
+from .options import Options
+from .resolve_types import XmlDataclassInstance
+from .scanner import END, START, find_root, iter_tokens, local_name, parse_attrs
+from .serde import load
+
+_MAGIC = b"XDCIDX1\n"
+_HEADER_LEN = struct.Struct("<Q")
+
+
+@dataclass
+class RecordIndex:
+    # see `scanner.Root`
+    context: bytes
+    root: bytes
+    # the size of the indexed file, to detect stale indices
+    size: int
+    # start and end offsets of every record, flattened
+    offsets: array[int] = field(default_factory=lambda: array("q"))
+    # the position of the first record for every key
+    keys: Dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.offsets) // 2
+
+    def span(self, position: int) -> Tuple[int, int]:
+        i = position * 2
+        return self.offsets[i], self.offsets[i + 1]
+
+    def write(self, path: Any) -> None:
+        header = json.dumps(
+            {
+                "context": self.context.decode("latin-1"),
+                "root": self.root.decode("latin-1"),
+                "size": self.size,
+                "keys": self.keys,
+            }
+        ).encode("utf-8")
+        offsets = array("q", self.offsets)
+        if sys.byteorder == "big":  # pragma: no cover
+            offsets.byteswap()
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER_LEN.pack(len(header)))
+            f.write(header)
+            offsets.tofile(f)
+
+    @classmethod
+    def read(cls: Type["RecordIndex"], path: Any) -> "RecordIndex":
+        with open(path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"File '{path}' is not a record index")
+            (header_len,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            offsets = array("q")
+            offsets.frombytes(f.read())
+        if sys.byteorder == "big":  # pragma: no cover
+            offsets.byteswap()
+        return cls(
+            header["context"].encode("latin-1"),
+            header["root"].encode("latin-1"),
+            header["size"],
+            offsets,
+            header["keys"],
+        )
+
+
+def _build_index(buf: Any, name: Optional[str], key: Optional[str]) -> RecordIndex:
+    root = find_root(buf)
+    index = RecordIndex(root.context, root.qname, len(buf))
+    if root.is_empty:
+        return index
+
+    name_filter = name.encode(root.encoding) if name else None
+    offsets = index.offsets
+    keys = index.keys
+    depth = 1
+    record: Any = None
+    for m in iter_tokens(buf, root.end):
+        kind = m.lastgroup
+        if kind == START:
+            if depth == 1:
+                qname = m.group("start")
+                record = (
+                    m if not name_filter or local_name(qname) == name_filter else None
+                )
+            if not m.group("empty"):
+                depth += 1
+                continue
+        elif kind == END:
+            depth -= 1
+            if depth == 0:
+                return index
+        else:
+            continue
+
+        # a record ends at depth 1, either with an end tag or an empty element
+        if depth == 1 and record is not None:
+            if key:
+                value = parse_attrs(record.group("attrs"), root.encoding).get(key)
+                if value is not None:
+                    keys.setdefault(value, len(offsets) // 2)
+            offsets.append(record.start())
+            offsets.append(m.end())
+            record = None
+
+    raise ValueError(f"Root element '{root.qname.decode(root.encoding)}' not closed")
+
+
+def build_index(
+    path: Any, name: Optional[str] = None, key: Optional[str] = None
+) -> RecordIndex:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return _build_index(mm, name, key)
+
+
+def load_at(
+    cls: Type[XmlDataclassInstance],
+    path: Any,
+    index: RecordIndex,
+    key: Union[int, str],
+    options: Optional[Options] = None,
+) -> XmlDataclassInstance:
+    position = index.keys[key] if isinstance(key, str) else key
+    start, end = index.span(position)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if len(mm) != index.size:
+            raise ValueError(f"Record index doesn't match file '{path}'")
+        fragment = mm[start:end]
+
+    # re-establish the namespace context of the record
+    doc = b"".join((index.context, fragment, b"</", index.root, b">"))
+    el = etree.fromstring(doc)[0]
+    return load(cls, el, options=options)
@@ -5,8 +5,10 @@ from dataclasses import MISSING, Field, dataclass, fields, is_dataclass
 from typing import _GenericAlias  # type: ignore[attr-defined]
 from typing import (
     Any,
+    Callable,
     Collection,
     Dict,
+    Iterable,
     List,
     Mapping,
     Optional,
@@ -21,12 +23,13 @@ from typing import (
 from .exceptions import (
     XmlDataclassContentsError,
     XmlDataclassDuplicateFieldError,
+    XmlDataclassDuplicateRootError,
     XmlDataclassInternalError,
     XmlDataclassModelError,
     XmlDataclassNoNamespaceError,
     XmlTypeError,
 )
-from .lxml_utils import format_ns
+from .lxml_utils import XML_NS, format_ns, strip_ns
 
 NoneType: Type[Any] = type(None)
 NsMap = Optional[Mapping[Optional[str], str]]
@@ -60,6 +63,33 @@ def is_xml_dataclass(tp: Type[Any]) -> bool:
     return True
 
 
+def is_frozen(tp: Type[Any]) -> bool:
+    return bool(tp.__dataclass_params__.frozen)
+
+
+# the hash is kept in the instance dictionary. it depends on the hashes of
+# strings, which differ between processes, so it is never pickled
+HASH_KEY = "__xml_hash__"
+
+
+def _make_cached_hash(original: Callable[[Any], int]) -> Callable[[Any], int]:
+    def __hash__(self: Any) -> int:
+        state = self.__dict__
+        try:
+            return cast(int, state[HASH_KEY])
+        except KeyError:
+            pass
+        value = original(self)
+        state[HASH_KEY] = value
+        return value
+
+    return __hash__
+
+
+def _getstate(self: Any) -> Dict[str, Any]:
+    return {k: v for k, v in self.__dict__.items() if k != HASH_KEY}
+
+
 @dataclass
 class FieldInfo:
     field: Field[Any]
@@ -90,6 +120,10 @@ class ChildInfo(FieldInfo):
     xml_name: str
     base_types: Tuple[Type[XmlDataclass], ...]
     is_list: bool
+    # the attribute field of the child types to index the list by
+    index_by: Optional[str] = None
+    # lists of children are stored as tuples, e.g. for frozen classes
+    is_tuple: bool = False
 
     # pylint: disable=too-many-arguments
     @classmethod
@@ -100,6 +134,7 @@ class ChildInfo(FieldInfo):
         types: Tuple[Type[XmlDataclass], ...],
         is_list: bool,
         namespace: str,
+        is_tuple: bool = False,
     ) -> "ChildInfo":
         if "xml:ns" in f.metadata:
             raise XmlDataclassModelError(
@@ -108,7 +143,20 @@ class ChildInfo(FieldInfo):
         rename = f.metadata.get("xml:name")
         xml_name = format_ns(rename if rename else f.name, namespace)
 
-        return cls(f, f.name, is_optional, xml_name, types, is_list)
+        index_by = f.metadata.get("xml:index_by")
+        if index_by:
+            if not is_list:
+                raise XmlDataclassModelError(
+                    f"Field '{f.name}' is indexed, but not a list of children"
+                )
+            for tp in types:
+                if not any(attr.dt_name == index_by for attr in tp.__attributes__):
+                    raise XmlDataclassModelError(
+                        f"Field '{f.name}' is indexed by '{index_by}', but "
+                        f"'{tp.__name__}' has no such attribute"
+                    )
+
+        return cls(f, f.name, is_optional, xml_name, types, is_list, index_by, is_tuple)
 
 
 @dataclass
@@ -163,7 +211,7 @@ def _resolve_optional_type(tp: Type[Any]) -> Tuple[Type[Any], bool]:
 
 def _resolve_child_type(
     tp: Type[Any],
-) -> Tuple[Tuple[Type[XmlDataclass], ...], bool, str]:
+) -> Tuple[Tuple[Type[XmlDataclass], ...], bool, bool, str]:
     # next, List/list is allowed, but only at this level (may contain Union)
     is_list = isinstance(tp, _GenericAlias) and tp.__origin__ is list
     if is_list:
@@ -171,6 +219,14 @@ def _resolve_child_type(
             msg = f"List type has invalid number of arguments ({tp.__args__})"
             raise XmlTypeError(msg)
         tp = tp.__args__[0]
+    # a variable-length Tuple is allowed instead, and stored as a tuple
+    is_tuple = not is_list and isinstance(tp, _GenericAlias) and tp.__origin__ is tuple
+    if is_tuple:
+        if len(tp.__args__) != 2 or tp.__args__[1] is not Ellipsis:
+            msg = f"Tuple type must be variable-length ({tp.__args__})"
+            raise XmlTypeError(msg)
+        tp = tp.__args__[0]
+        is_list = True
     is_union = isinstance(tp, _GenericAlias) and tp.__origin__ is Union
     if is_union:
         types = tp.__args__
@@ -197,7 +253,7 @@ def _resolve_child_type(
 
     namespace = next(iter(namespaces))
 
-    return tuple(types), is_list, namespace
+    return tuple(types), is_list, is_tuple, namespace
 
 
 def _resolve_field_type(f: Field[Any], tp: Any) -> FieldInfo:
@@ -210,13 +266,146 @@ def _resolve_field_type(f: Field[Any], tp: Any) -> FieldInfo:
                 return TextInfo.resolve(f, is_optional)
             return AttrInfo.resolve(f, is_optional)
         # should be a child
-        types, is_list, namespace = _resolve_child_type(tp)
-        return ChildInfo.resolve(f, is_optional, types, is_list, namespace)
+        types, is_list, is_tuple, namespace = _resolve_child_type(tp)
+        return ChildInfo.resolve(f, is_optional, types, is_list, namespace, is_tuple)
     except XmlTypeError as e:
         msg = f"Invalid type '{f.type}' on field '{f.name}'. {e!s}"
         raise XmlTypeError(msg) from e
 
 
+def _index_key(dt_name: str) -> str:
+    return f"__xml_index_{dt_name}__"
+
+
+def build_child_index(
+    child: ChildInfo, values: Iterable[Any]
+) -> Tuple[List[Any], Dict[str, int]]:
+    key_name = cast(str, child.index_by)
+    items: List[Any] = []
+    # the position of the child for every key
+    index: Dict[str, int] = {}
+    for value in values:
+        key = getattr(value, key_name)
+        # like XML IDs, the first element with a key wins
+        if key is not None and key not in index:
+            index[key] = len(items)
+        items.append(value)
+    return items, index
+
+
+def set_child_index(instance: Any, child: ChildInfo, index: Dict[str, int]) -> None:
+    # the index is only valid for the list it was built from
+    values = getattr(instance, child.dt_name) or ()
+    instance.__dict__[_index_key(child.dt_name)] = (values, len(values), index)
+
+
+def drop_child_index(instance: Any, dt_name: str) -> None:
+    instance.__dict__.pop(_index_key(dt_name), None)
+
+
+def _make_index_accessor(child: ChildInfo) -> Callable[[Any, str], Any]:
+    key = _index_key(child.dt_name)
+    key_name = cast(str, child.index_by)
+
+    def accessor(self: Any, value: str) -> Any:
+        values = getattr(self, child.dt_name) or ()
+        try:
+            indexed_values, length, index = self.__dict__[key]
+        except KeyError:
+            pass
+        else:
+            if indexed_values is values and length == len(values):
+                position = index.get(value)
+                if position is None:
+                    return None
+                # plain lists can be changed in place, so a found child is
+                # checked. other changes of the same length aren't detected
+                found = values[position]
+                if getattr(found, key_name) == value:
+                    return found
+
+        _, index = build_child_index(child, values)
+        set_child_index(self, child, index)
+        position = index.get(value)
+        return None if position is None else values[position]
+
+    return accessor
+
+
+def collect_namespaces(cls: Type[XmlDataclass]) -> Tuple[str, ...]:
+    # the model graph doesn't change, so this is cached on the class
+    try:
+        return cast(Tuple[str, ...], cls.__dict__["__xml_namespaces__"])
+    except KeyError:
+        pass
+
+    # ordered by first use, breadth-first
+    namespaces: Dict[str, None] = {}
+    seen = set()
+    pending: List[Type[XmlDataclass]] = [cls]
+    while pending:
+        tp = pending.pop(0)
+        if tp in seen:
+            continue
+        seen.add(tp)
+        if tp.__ns__:
+            namespaces[tp.__ns__] = None
+        for attr in tp.__attributes__:
+            _, namespace = strip_ns(attr.xml_name)
+            if namespace and namespace != XML_NS:
+                namespaces[namespace] = None
+        for child in tp.__children__:
+            pending.extend(child.base_types)
+
+    result = tuple(namespaces)
+    setattr(cls, "__xml_namespaces__", result)
+    return result
+
+
+def hoist_nsmap(cls: Type[XmlDataclass], nsmap: NsMap) -> Dict[Optional[str], str]:
+    # keeps the given prefixes, and generates prefixes for other namespaces
+    hoisted = {prefix: uri for prefix, uri in (nsmap or {}).items() if prefix != "xml"}
+    known = set(hoisted.values())
+    i = 0
+    for namespace in collect_namespaces(cls):
+        if namespace in known:
+            continue
+        while f"ns{i}" in hoisted:
+            i += 1
+        hoisted[f"ns{i}"] = namespace
+    return hoisted
+
+
+# root element tags in Clark notation, to classes registered via `__root__`
+_ROOTS: Dict[str, Type[Any]] = {}
+
+
+def _register_root(cls: Type[Any], name: str) -> None:
+    tag = format_ns(name, cls.__ns__)
+    previous = _ROOTS.get(tag)
+    # allow re-defining the same class, e.g. when a module is reloaded
+    if previous is not None and (previous.__module__, previous.__qualname__) != (
+        cls.__module__,
+        cls.__qualname__,
+    ):
+        raise XmlDataclassDuplicateRootError(
+            f"Duplicate root element '{tag}' on '{cls.__qualname__}', "
+            f"previously declared on '{previous.__qualname__}'"
+        )
+    _ROOTS[tag] = cls
+
+
+def root_tags() -> List[str]:
+    return list(_ROOTS)
+
+
+def get_root_class(tag: str) -> Type[XmlDataclass]:
+    try:
+        return cast(Type[XmlDataclass], _ROOTS[tag])
+    except KeyError:
+        raise ValueError(f"No XML dataclass registered for '{tag}'") from None
+
+
 class _XmlNameTracker:
     def __init__(self, field_type: str):
         self.field_type = field_type
@@ -235,7 +424,7 @@ class _XmlNameTracker:
             raise XmlDataclassDuplicateFieldError(msg)
 
 
-def xml_dataclass(  # pylint: disable=too-many-branches
+def xml_dataclass(  # pylint: disable=too-many-branches,too-many-statements
     cls: Type[Any],
 ) -> Type[XmlDataclassInstance]:
     # if a dataclass is doubly decorated, metadata seems to disappear...
@@ -300,4 +489,22 @@ def xml_dataclass(  # pylint: disable=too-many-branches
     new_cls.__children__ = children
     new_cls.__text_field__ = text_field
 
+    for child in children:
+        if child.index_by:
+            accessor_name = f"{child.dt_name}_by_{child.index_by}"
+            # don't overwrite user-defined methods
+            if not hasattr(new_cls, accessor_name):
+                setattr(new_cls, accessor_name, _make_index_accessor(child))
+
+    # frozen instances can't be modified, so the hash is only computed once
+    if is_frozen(new_cls) and new_cls.__dict__.get("__hash__") is not None:
+        setattr(new_cls, "__hash__", _make_cached_hash(new_cls.__hash__))
+        if "__getstate__" not in new_cls.__dict__:
+            setattr(new_cls, "__getstate__", _getstate)
+
+    # only registered if declared on this class, not a base class
+    root_name = new_cls.__dict__.get("__root__")
+    if root_name:
+        _register_root(new_cls, root_name)
+
     return new_cls
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterator, Match, NamedTuple, Optional, Tuple
+
+# A minimal tokenizer for XML markup. It only finds the boundaries of
+# elements, which is enough to split documents into byte ranges without
+# parsing them. Well-formedness is still checked by lxml when the ranges are
+# parsed.
+_TOKEN_RE = re.compile(
+    rb"<(?:"
+    rb"(?P<comment>!--.*?-->)"
+    rb"|(?P<cdata>!\[CDATA\[.*?\]\]>)"
+    rb"|(?P<pi>\?.*?\?>)"
+    rb"|(?P<doctype>!DOCTYPE[^\[>]*(?:\[.*?\])?\s*>)"
+    rb"|/(?P<end>[^\s>]+)\s*>"
+    rb"|(?P<start>[^\s/>!?]+)"
+    rb"(?P<attrs>(?:[^>\"']|\"[^\"]*\"|'[^']*')*?)(?P<empty>/?)>"
+    rb")",
+    re.DOTALL,
+)
+_ATTR_RE = re.compile(rb"([^\s=]+)\s*=\s*(?:\"([^\"]*)\"|'([^']*)')")
+_REF_RE = re.compile(r"&(#x[0-9a-fA-F]+|#[0-9]+|lt|gt|amp|quot|apos);")
+_ENTITIES = {"lt": "<", "gt": ">", "amp": "&", "quot": '"', "apos": "'"}
+_ENCODING_RE = re.compile(rb"encoding\s*=\s*[\"']([^\"']+)[\"']")
+# a simple document, with a prolog of comments and processing instructions,
+# found in one pass without tokenizing its contents
+_DOCUMENT_RE = re.compile(
+    rb"\s*("
+    rb"(?:<\?.*?\?>\s*|<!--.*?-->\s*)*"
+    rb"(<([^\s/>!?]+)(?:[^>\"']|\"[^\"]*\"|'[^']*')*?(?:/>|>.*?</\3\s*>))"
+    rb")",
+    re.DOTALL,
+)
+_HIDING_RE = re.compile(rb"<[!?]")
+
+# token kinds, as given by the last matched group
+COMMENT = "comment"
+CDATA = "cdata"
+PI = "pi"
+DOCTYPE = "doctype"
+END = "end"
+START = "empty"
+
+
+def iter_tokens(
+    buf: Any, pos: int = 0, endpos: Optional[int] = None
+) -> Iterator[Match[bytes]]:
+    # stops at the first incomplete (or invalid) token, callers can detect
+    # this by checking for further markup after the last token
+    if endpos is None:
+        endpos = len(buf)
+    find = buf.find
+    match = _TOKEN_RE.match
+    while True:
+        i = find(b"<", pos, endpos)
+        if i < 0:
+            return
+        m = match(buf, i, endpos)
+        if m is None:
+            return
+        yield m
+        pos = m.end()
+
+
+def find_document(buf: Any, pos: int = 0) -> Optional[Tuple[int, int]]:
+    # the first matching end tag closes the root element, unless the root
+    # contains elements of the same name, or markup that could hide the tag.
+    # other (and incomplete) documents aren't found, and must be tokenized
+    m = _DOCUMENT_RE.match(buf, pos)
+    if m is None:
+        return None
+    start, end = m.span(1)
+    root = m.start(2)
+    if (
+        buf.find(b"<" + m.group(3), root + 1, end) >= 0
+        or _HIDING_RE.search(buf, root, end) is not None
+    ):
+        return None
+    return start, end
+
+
+def iter_documents(buf: Any, pos: int = 0) -> Iterator[Tuple[int, int]]:
+    # consecutive documents found like `find_document`, stops at the first
+    # one that isn't. markup that could hide an end tag is searched once for
+    # all of them, instead of once per document
+    match = _DOCUMENT_RE.match
+    find = buf.find
+    hidden = -1
+    while True:
+        m = match(buf, pos)
+        if m is None:
+            return
+        start, end = m.span(1)
+        root = m.start(2)
+        if hidden < root:
+            found = _HIDING_RE.search(buf, root)
+            hidden = len(buf) if found is None else found.start()
+        if hidden < end or find(b"<" + m.group(3), root + 1, end) >= 0:
+            return
+        yield start, end
+        pos = end
+
+
+def _unescape_ref(m: Match[str]) -> str:
+    ref = m.group(1)
+    if ref.startswith("#x"):
+        return chr(int(ref[2:], 16))
+    if ref.startswith("#"):
+        return chr(int(ref[1:]))
+    return _ENTITIES[ref]
+
+
+# only handles predefined entities and character references
+def parse_attrs(attrs: bytes, encoding: str = "utf-8") -> Dict[str, str]:
+    values = {}
+    for m in _ATTR_RE.finditer(attrs):
+        name, dq_value, sq_value = m.groups()
+        value = (dq_value if dq_value is not None else sq_value).decode(encoding)
+        values[name.decode(encoding)] = _REF_RE.sub(_unescape_ref, value)
+    return values
+
+
+def local_name(qname: bytes) -> bytes:
+    return qname.rpartition(b":")[2]
+
+
+class Root(NamedTuple):
+    # the qualified name, as written in the document
+    qname: bytes
+    # the XML declaration (if any) and the start tag of the root element,
+    # which is everything needed to parse a part of the document in the
+    # same namespace context
+    context: bytes
+    # the offset after the start tag
+    end: int
+    encoding: str
+    is_empty: bool
+
+
+def find_root(buf: Any, pos: int = 0) -> Root:
+    declaration = b""
+    encoding = "utf-8"
+    for m in iter_tokens(buf, pos):
+        kind = m.lastgroup
+        if kind == START:
+            start_tag = m.group()
+            is_empty = bool(m.group("empty"))
+            if is_empty:
+                start_tag = start_tag[:-2] + b">"
+            return Root(
+                m.group("start"), declaration + start_tag, m.end(), encoding, is_empty
+            )
+        if kind == END:
+            break
+        is_first = not buf[pos : m.start()].strip()
+        if kind == PI and is_first and m.group().startswith(b"<?xml"):
+            declaration = m.group()
+            found = _ENCODING_RE.search(declaration)
+            if found:
+                encoding = found.group(1).decode("ascii")
+    raise ValueError(f"No root element found at offset {pos}")
@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Set, Tuple, Type, cast
+
+from lxml import etree  # type: ignore[import]
+from lxml.etree import Element, SubElement  # type: ignore[import]
+
+from .exceptions import XmlDataclassModelError, XmlSchemaError
+from .lxml_utils import XML_NS, format_ns, strip_ns
+from .resolve_types import XmlDataclass, hoist_nsmap, is_xml_dataclass
+
+_XS = "http://www.w3.org/2001/XMLSchema"
+_XS_ = f"{{{_XS}}}"
+# the schema for the namespace of the root element, which imports the others
+MAIN_SCHEMA = "schema.xsd"
+# text of text fields, and whitespace of elements without text or children.
+# restrictions of `xs:string`, declared in every schema using them
+_TEXT_TYPES = {
+    "optionalText": ("minLength", "0"),
+    "requiredText": ("minLength", "1"),
+    "noText": ("pattern", r"\s*"),
+}
+
+Types = Tuple[Type[XmlDataclass], ...]
+
+
+class _SchemaBuilder:  # pylint: disable=too-many-instance-attributes
+    # one schema per namespace, since a schema only declares elements and
+    # attributes in its target namespace
+    def __init__(self, cls: Type[XmlDataclass]) -> None:
+        self.nsmap = {"xs": _XS, **hoist_nsmap(cls, None)}
+        self.prefixes = {namespace: prefix for prefix, namespace in self.nsmap.items()}
+        self.prefixes[XML_NS] = "xml"
+        self.schemas: Dict[Optional[str], Any] = {}
+        self.locations: Dict[Optional[str], str] = {}
+        self.imports: Dict[Optional[str], Dict[str, None]] = {}
+        self.text_types: Set[Tuple[Optional[str], str]] = set()
+        # global declarations, by tag
+        self.elements: Dict[str, Types] = {}
+        self.attributes: Set[str] = set()
+
+    def schema(self, namespace: Optional[str]) -> Any:
+        try:
+            return self.schemas[namespace]
+        except KeyError:
+            pass
+
+        schema = Element(_XS_ + "schema", nsmap=self.nsmap)
+        if namespace:
+            schema.set("targetNamespace", namespace)
+        schema.set("elementFormDefault", "qualified")
+        i = len(self.schemas)
+        self.locations[namespace] = f"schema-{i}.xsd" if i else MAIN_SCHEMA
+        self.schemas[namespace] = schema
+        self.imports[namespace] = {}
+        return schema
+
+    def qname(self, namespace: Optional[str], name: str) -> str:
+        if namespace:
+            return f"{self.prefixes[namespace]}:{name}"
+        return name
+
+    def ref(self, namespace: Optional[str], ref_namespace: str, name: str) -> str:
+        if ref_namespace != namespace:
+            self.imports[namespace][ref_namespace] = None
+        return self.qname(ref_namespace, name)
+
+    def text_type(self, namespace: Optional[str], name: str) -> str:
+        if (namespace, name) not in self.text_types:
+            self.text_types.add((namespace, name))
+            simple_type = SubElement(
+                self.schema(namespace), _XS_ + "simpleType", name=name
+            )
+            restriction = SubElement(
+                simple_type, _XS_ + "restriction", base="xs:string"
+            )
+            facet, value = _TEXT_TYPES[name]
+            SubElement(restriction, _XS_ + facet, value=value)
+        return self.qname(namespace, name)
+
+    def add_global_element(
+        self, namespace: Optional[str], name: str, types: Types
+    ) -> None:
+        tag = format_ns(name, namespace)
+        try:
+            previous = self.elements[tag]
+        except KeyError:
+            pass
+        else:
+            if previous != types:
+                raise XmlDataclassModelError(
+                    f"Element '{tag}' is declared with different types, "
+                    "which a schema can't express"
+                )
+            return
+
+        self.elements[tag] = types
+        el = SubElement(self.schema(namespace), _XS_ + "element", name=name)
+        self.add_type(el, namespace, types)
+
+    def add_element(  # pylint: disable=too-many-arguments
+        self,
+        group: Any,
+        namespace: Optional[str],
+        name: str,
+        child_namespace: Optional[str],
+        types: Types,
+        occurs: Dict[str, str],
+    ) -> None:
+        # elements in the namespace of the schema (or none) are declared
+        # locally, others are global declarations of their schema
+        if child_namespace and child_namespace != namespace:
+            ref = self.ref(namespace, child_namespace, name)
+            SubElement(group, _XS_ + "element", ref=ref, **occurs)
+            self.add_global_element(child_namespace, name, types)
+            return
+
+        el = SubElement(group, _XS_ + "element", name=name, **occurs)
+        if child_namespace != namespace:
+            el.set("form", "unqualified")
+        self.add_type(el, namespace, types)
+
+    def add_attributes(
+        self, parent: Any, namespace: Optional[str], cls: Type[XmlDataclass]
+    ) -> None:
+        for attr in cls.__attributes__:
+            name, attr_namespace = strip_ns(attr.xml_name)
+            use = "required" if attr.is_required else "optional"
+            if not attr_namespace:
+                SubElement(parent, _XS_ + "attribute", name=name, use=use)
+                continue
+
+            ref = self.ref(namespace, attr_namespace, name)
+            SubElement(parent, _XS_ + "attribute", ref=ref, use=use)
+            if attr.xml_name not in self.attributes:
+                self.attributes.add(attr.xml_name)
+                schema = self.schema(attr_namespace)
+                SubElement(schema, _XS_ + "attribute", name=name, type="xs:string")
+
+    def add_type(self, el: Any, namespace: Optional[str], types: Types) -> None:
+        if len(types) > 1:
+            # the types of union children are tried when loading
+            el.set("type", "xs:anyType")
+            return
+
+        cls = types[0]
+        complex_type = SubElement(el, _XS_ + "complexType")
+        if cls.__text_field__ or not cls.__children__:
+            if not cls.__text_field__:
+                base = "noText"
+            elif cls.__text_field__.is_required:
+                base = "requiredText"
+            else:
+                base = "optionalText"
+            content = SubElement(complex_type, _XS_ + "simpleContent")
+            extension = SubElement(
+                content, _XS_ + "extension", base=self.text_type(namespace, base)
+            )
+            self.add_attributes(extension, namespace, cls)
+            return
+
+        # children can be in any order. `xs:all` only allows children to occur
+        # once, so with list children, an unbounded choice is used instead.
+        # how often those children occur is checked by the trusted loader
+        has_lists = any(child.is_list for child in cls.__children__)
+        if has_lists:
+            group = SubElement(
+                complex_type, _XS_ + "choice", minOccurs="0", maxOccurs="unbounded"
+            )
+        else:
+            group = SubElement(complex_type, _XS_ + "all")
+        for child in cls.__children__:
+            name, child_namespace = strip_ns(child.xml_name)
+            occurs: Dict[str, str] = {}
+            if not has_lists:
+                occurs["minOccurs"] = "1" if child.is_required else "0"
+            self.add_element(
+                group, namespace, name, child_namespace, child.base_types, occurs
+            )
+        self.add_attributes(complex_type, namespace, cls)
+
+    def build(self) -> Dict[str, bytes]:
+        documents = {}
+        for namespace, schema in self.schemas.items():
+            # imports must come first
+            for i, imported in enumerate(self.imports[namespace]):
+                el = Element(_XS_ + "import", namespace=imported)
+                el.set("schemaLocation", self.locations[imported])
+                schema.insert(i, el)
+            location = self.locations[namespace]
+            documents[location] = etree.tostring(schema, encoding="utf-8")
+        return documents
+
+
+def generate_schema(cls: Type[XmlDataclass], name: str) -> Dict[str, bytes]:
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    builder = _SchemaBuilder(cls)
+    builder.add_global_element(cls.__ns__, name, (cls,))
+    return builder.build()
+
+
+class _Resolver(etree.Resolver):  # type: ignore[misc]
+    # imports are resolved from the generated documents
+    def __init__(self, documents: Dict[str, bytes]) -> None:
+        super().__init__()
+        self.documents = documents
+
+    def resolve(self, url: str, _pubid: Any, context: Any) -> Any:
+        _, _, location = url.rpartition("/")
+        return self.resolve_string(self.documents[location], context)
+
+
+def get_schema(cls: Type[XmlDataclass], name: str) -> Any:
+    # compiling a schema is slow, so it is cached on the class
+    try:
+        schemas = cast(Dict[str, Any], cls.__dict__["__xml_schemas__"])
+    except KeyError:
+        schemas = {}
+        setattr(cls, "__xml_schemas__", schemas)
+    try:
+        return schemas[name]
+    except KeyError:
+        pass
+
+    documents = generate_schema(cls, name)
+    parser = etree.XMLParser()
+    parser.resolvers.add(_Resolver(documents))
+    doc = etree.fromstring(documents[MAIN_SCHEMA], parser, base_url=MAIN_SCHEMA)
+    schema = etree.XMLSchema(doc)
+    schemas[name] = schema
+    return schema
+
+
+def validate(cls: Type[XmlDataclass], el: Any, name: str) -> None:
+    schema = get_schema(cls, name)
+    if not schema.validate(el):
+        error = schema.error_log.last_error
+        raise XmlSchemaError(f"{error.message} (line {error.line})")
@@ -1,12 +1,49 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Any, Dict, List, Mapping, Optional, Type, TypeVar, Union
+from copy import deepcopy
+from dataclasses import replace
+from io import BytesIO
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
+from lxml import etree  # type: ignore[import]
 from lxml.builder import ElementMaker  # type: ignore[import]
+from lxml.etree import Element, SubElement  # type: ignore[import]
 from lxml.etree import _Comment as Comment  # type: ignore[import]
-
-from .lxml_utils import strip_ns
+from lxml.etree import _ProcessingInstruction as PI  # type: ignore[import]
+
+from .exceptions import (
+    XmlChildElementsError,
+    XmlCommentsError,
+    XmlLoadErrors,
+    XmlMultipleChildrenError,
+    XmlNameError,
+    XmlNamespaceError,
+    XmlNoTextError,
+    XmlProcessingInstructionsError,
+    XmlRequiredAttributeError,
+    XmlRequiredChildError,
+    XmlResourceLimitError,
+    XmlTextError,
+    XmlUndeclaredAttributesError,
+    XmlUndeclaredChildrenError,
+    XmlUnionError,
+)
+from .lxml_utils import XML_NS, format_ns, strip_ns
 from .options import Options
 from .resolve_types import (
     ChildInfo,
@@ -14,17 +51,50 @@ from .resolve_types import (
     TextInfo,
     XmlDataclass,
     XmlDataclassInstance,
+    build_child_index,
+    get_root_class,
+    hoist_nsmap,
+    is_frozen,
     is_xml_dataclass,
+    set_child_index,
 )
+from .tracking import get_fragment, is_tracked, store_fragment
 
 _T = TypeVar("_T")
+_XML_NS = f"{{{XML_NS}}}"
+# see `_write_leaf`
+_HTML_PARSER = etree.HTMLParser()
+
+
+Errors = Optional[List[ValueError]]
+
+
+def _fail(errors: Errors, error: ValueError) -> None:
+    # collects the error if all errors are collected, otherwise raises it
+    if errors is None:
+        raise error
+    errors.append(error)
+
+
+def attribute_size_error(el: Any, name: str, max_size: int) -> XmlResourceLimitError:
+    return XmlResourceLimitError(
+        f"Attribute '{name}' on '{el.tag}' exceeds the maximum size of {max_size}"
+    )
+
+
+def text_size_error(el: Any, max_size: int) -> XmlResourceLimitError:
+    return XmlResourceLimitError(
+        f"Text of '{el.tag}' exceeds the maximum size of {max_size}"
+    )
 
 
 def _load_attributes(
-    cls: Type[XmlDataclass], el: Any, options: Options
+    cls: Type[XmlDataclass], el: Any, options: Options, errors: Errors = None
 ) -> Mapping[str, str]:
     values = {}
     processed = set()
+    table = options.intern_table if options.intern_values else None
+    max_value_size = options.max_value_size
 
     # can't have multiple attributes with the same name, so this is easier
     for attr in cls.__attributes__:
@@ -33,70 +103,133 @@ def _load_attributes(
             attr_value = el.attrib[attr.xml_name]
         except KeyError:
             if attr.is_required:
-                raise ValueError(
-                    f"Required attribute '{attr.xml_name}' not found on '{el.tag}'"
-                ) from None
+                _fail(errors, XmlRequiredAttributeError(el, attr.xml_name))
+                continue
             attr_value = attr.get_default()
+        else:
+            if max_value_size is not None and len(attr_value) > max_value_size:
+                raise attribute_size_error(el, attr.xml_name, max_value_size)
+            if table is not None:
+                attr_value = table.setdefault(attr_value, attr_value)
         processed.add(attr.xml_name)
         values[attr.dt_name] = attr_value
 
     unprocessed = set(el.attrib.keys()) - processed
     if unprocessed and not options.ignore_unknown_attributes:
-        readable = ", ".join(f"'{v}'" for v in unprocessed)
-        raise ValueError(f"Found undeclared attributes on '{el.tag}': {readable}")
+        _fail(errors, XmlUndeclaredAttributesError(el, names=unprocessed))
 
     return values
 
 
-def _load_text(info: TextInfo, el: Any) -> Mapping[str, str]:
-    child = next(el.iterchildren(), None)
-    if child is not None:
-        if isinstance(child, Comment):
-            raise ValueError(f"Element '{el.tag}' contains comments")
-        raise ValueError(f"Element '{el.tag}' has child elements (expected text only)")
+def _is_ignored(el: Any, child: Any, options: Options, errors: Errors = None) -> bool:
+    if isinstance(child, Comment):
+        if not options.ignore_comments:
+            _fail(errors, XmlCommentsError(el))
+        return True
+    if isinstance(child, PI):
+        if not options.ignore_processing_instructions:
+            _fail(errors, XmlProcessingInstructionsError(el))
+        return True
+    return False
+
 
+def _load_text(
+    info: TextInfo, el: Any, options: Options, errors: Errors = None
+) -> Mapping[str, str]:
     text = el.text
+    for child in el.iterchildren():
+        if not _is_ignored(el, child, options, errors):
+            _fail(errors, XmlChildElementsError(el))
+            return {}
+        # the text continues after ignored nodes
+        if child.tail:
+            text = (text or "") + child.tail
+
     if text is None:
         if info.is_required:
-            raise ValueError(f"Element '{el.tag}' has no text")
+            _fail(errors, XmlNoTextError(el))
+            return {}
         text = info.get_default()
+    elif options.max_value_size is not None and len(text) > options.max_value_size:
+        raise text_size_error(el, options.max_value_size)
+    elif options.intern_values and options.intern_table is not None:
+        text = options.intern_table.setdefault(text, text)
 
     return {info.dt_name: text}
 
 
-def _load_children(
-    cls: Type[XmlDataclass], el: Any, options: Options
-) -> Mapping[str, XmlDataclass]:
-    if el.text and el.text.strip():
-        raise ValueError(f"Element '{el.tag}' has text (expected child elements only)")
+ChildIndexes = List[Tuple[ChildInfo, Dict[str, Any]]]
 
+
+def _group_children(
+    el: Any, options: Options, errors: Errors = None
+) -> Dict[str, List[Any]]:
     # child elements can be duplicated
     el_children: Dict[str, List[Any]] = defaultdict(list)
-    for e in el.iterchildren():
-        if isinstance(e, Comment):
-            raise ValueError(f"Element '{el.tag}' contains comments")
-        el_children[e.tag].append(e)
+    if options.ignore_comments and options.ignore_processing_instructions:
+        # let lxml skip other nodes
+        el_iter = el.iterchildren(Element)
+    else:
+        el_iter = el.iterchildren()
+    for e in el_iter:
+        if not _is_ignored(el, e, options, errors):
+            el_children[e.tag].append(e)
+    return el_children
+
 
+def _load_children(  # pylint: disable=too-many-arguments,too-many-locals
+    cls: Type[XmlDataclass],
+    el: Any,
+    options: Options,
+    indexes: ChildIndexes,
+    errors: Errors = None,
+    limits: Optional[Limits] = None,
+) -> Mapping[str, XmlDataclass]:
+    if el.text and el.text.strip():
+        _fail(errors, XmlTextError(el))
+
+    el_children = _group_children(el, options, errors)
     values = {}
     processed = set()
+    max_list_length = options.max_list_length
 
     def _unpack_union_child(
         child: ChildInfo, value: Any
-    ) -> Union[XmlDataclass, List[XmlDataclass]]:
-        exceptions = []
-        # try to find one matching type
+    ) -> Union[XmlDataclass, List[XmlDataclass], None]:
+        causes = []
+        # elements of types that don't match don't count towards the limit
+        elements = limits.elements if limits else 0
+        # try to find one matching type. errors of the other types are
+        # discarded, so these are never collected
         for base_type in child.base_types:
             try:
-                return load(base_type, value, options=options)
+                return _load(base_type, value, options, None, limits)
             except ValueError as e:
-                exceptions.append(e)
-
-        raise ValueError(
-            f"Invalid child elements found for '{child.dt_name}' in '{el.tag}':\n"
-            + "\n".join(str(e) for e in exceptions)
-        )
-
-    def _get_one_child_value(child: ChildInfo) -> Any:
+                causes.append(e)
+                if limits:
+                    limits.elements = elements
+
+        _fail(errors, XmlUnionError(el, child.dt_name, causes=causes))
+        return None
+
+    def _load_list(
+        child: ChildInfo, value: List[Any], load_one: Callable[[Any], Any]
+    ) -> Sequence[XmlDataclass]:
+        items = [load_one(v) for v in value]
+        # with errors, the instances aren't created
+        if not child.index_by or errors:
+            return tuple(items) if child.is_tuple else items
+        # index the children in the same pass
+        items, index = build_child_index(child, items)
+        indexes.append((child, index))
+        return tuple(items) if child.is_tuple else items
+
+    def _load_one(base_type: Type[XmlDataclass]) -> Callable[[Any], Any]:
+        return lambda v: _load(base_type, v, options, errors, limits)
+
+    def _get_one_child_value(  # pylint: disable=too-many-return-statements
+        child: ChildInfo,
+    ) -> Any:
         # defaultdict can't raise KeyError
         if child.xml_name in el_children:
             value = el_children[child.xml_name]
@@ -104,26 +237,29 @@ def _load_children(
             if not child.is_required:
                 return child.get_default()
 
-            raise ValueError(
-                f"Required child element '{child.xml_name}' not found in '{el.tag}'"
-            )
+            _fail(errors, XmlRequiredChildError(el, child.xml_name))
+            return None
 
         if not child.is_list:
             if len(value) != 1:
-                raise ValueError(
-                    f"Multiple child elements '{child.xml_name}' in '{el.tag}'"
-                )
+                _fail(errors, XmlMultipleChildrenError(el, child.xml_name))
+                return None
             value = value[0]
+        elif max_list_length is not None and len(value) > max_list_length:
+            raise XmlResourceLimitError(
+                f"Child elements '{child.xml_name}' in '{el.tag}' exceed the maximum "
+                f"list length of {max_list_length}"
+            )
 
         if len(child.base_types) == 1:
             # nice path for default use-case
             base_type = child.base_types[0]
             if child.is_list:
-                return [load(base_type, v, options=options) for v in value]
-            return load(base_type, value, options=options)
+                return _load_list(child, value, _load_one(base_type))
+            return _load(base_type, value, options, errors, limits)
 
         if child.is_list:
-            return [_unpack_union_child(child, v) for v in value]
+            return _load_list(child, value, lambda v: _unpack_union_child(child, v))
         return _unpack_union_child(child, value)
 
     for child in cls.__children__:
@@ -133,20 +269,258 @@ def _load_children(
 
     unprocessed = el_children.keys() - processed
     if unprocessed and not options.ignore_unknown_children:
-        readable = ", ".join(f"'{v}'" for v in unprocessed)
-        raise ValueError(f"Found undeclared child elements on '{el.tag}': {readable}")
+        _fail(errors, XmlUndeclaredChildrenError(el, names=unprocessed))
 
     return values
 
 
-def _validate_name(cls: Type[XmlDataclass], el: Any, name: str) -> None:
+def _intern_key(value: Any) -> Any:
+    # interned child instances are shared, so their identity is their key
+    if isinstance(value, (list, tuple)):
+        return tuple(id(v) for v in value)
+    if isinstance(value, str) or value is None:
+        return value
+    return id(value)
+
+
+def _intern_instance(
+    cls: Type[XmlDataclassInstance],
+    el: Any,
+    values: Mapping[str, Any],
+    table: Dict[Any, Any],
+) -> XmlDataclassInstance:
+    nsmap = el.nsmap
+    nsmap = table.setdefault((dict, tuple(nsmap.items())), nsmap)
+    key = (cls, id(nsmap), *(_intern_key(v) for v in values.values()))
+    try:
+        instance: XmlDataclassInstance = table[key]
+    except KeyError:
+        pass
+    else:
+        return instance
+
+    instance = create_instance(cls, values, nsmap)
+    table[key] = instance
+    return instance
+
+
+def create_instance(
+    cls: Type[XmlDataclassInstance], values: Mapping[str, Any], nsmap: NsMap
+) -> XmlDataclassInstance:
+    instance = cls(**values)
+    if is_frozen(cls):
+        object.__setattr__(instance, "__nsmap__", nsmap)
+    else:
+        instance.__nsmap__ = nsmap
+
+    try:
+        validate_fn = instance.xml_validate  # type: ignore[attr-defined]
+    except AttributeError:
+        pass
+    else:
+        validate_fn()
+
+    return instance
+
+
+def _validate_name(
+    cls: Type[XmlDataclass], el: Any, name: str, errors: Errors = None
+) -> None:
     el_name, el_ns = strip_ns(el.tag)
     if el_name != name:
-        raise ValueError(f"Found element '{el_name}', expected '{name}' ('{el.tag}')")
-    if el_ns != cls.__ns__:
-        raise ValueError(
-            f"Found namespace '{el_ns}', expected '{cls.__ns__}' ('{el.tag}')"
-        )
+        _fail(errors, XmlNameError(el, name, name=el_name))
+    elif el_ns != cls.__ns__:
+        _fail(errors, XmlNamespaceError(el, namespace=el_ns, expected=cls.__ns__))
+
+
+class Limits:
+    # counts the depth and elements of a single call to `load`, or of a
+    # single record when streaming
+    def __init__(self, options: Options) -> None:
+        self.max_depth = options.max_depth
+        self.max_elements = options.max_elements
+        self.depth = 0
+        self.elements = 0
+
+    def enter(self, el: Any) -> None:
+        self.depth += 1
+        self.elements += 1
+        if self.max_depth is not None and self.depth > self.max_depth:
+            raise XmlResourceLimitError(
+                f"Element '{el.tag}' exceeds the maximum depth of {self.max_depth}"
+            )
+        if self.max_elements is not None and self.elements > self.max_elements:
+            raise XmlResourceLimitError(
+                f"Element '{el.tag}' exceeds the maximum number of elements of "
+                f"{self.max_elements}"
+            )
+
+
+def _load(
+    cls: Type[XmlDataclassInstance],
+    el: Any,
+    options: Options,
+    errors: Errors = None,
+    limits: Optional[Limits] = None,
+) -> XmlDataclassInstance:
+    if limits is None:
+        return _load_element(cls, el, options, errors, None)
+    limits.enter(el)
+    try:
+        return _load_element(cls, el, options, errors, limits)
+    finally:
+        limits.depth -= 1
+
+
+def _load_element(
+    cls: Type[XmlDataclassInstance],
+    el: Any,
+    options: Options,
+    errors: Errors,
+    limits: Optional[Limits],
+) -> XmlDataclassInstance:
+    attr_values = _load_attributes(cls, el, options, errors)
+    indexes: ChildIndexes = []
+    # are we just looking for text content?
+    if cls.__text_field__:
+        text_values = _load_text(cls.__text_field__, el, options, errors)
+        child_values: Mapping[str, Any] = {}
+    else:
+        text_values = {}
+        child_values = _load_children(cls, el, options, indexes, errors, limits)
+
+    if errors:
+        # the document is rejected, so no instances are created
+        return cast(XmlDataclassInstance, None)
+
+    values = {**attr_values, **text_values, **child_values}
+    try:
+        # only frozen instances can be shared safely
+        table = options.intern_table if options.intern_values else None
+        if table is not None and is_frozen(cls):
+            instance = _intern_instance(cls, el, values, table)
+        else:
+            instance = create_instance(cls, values, el.nsmap)
+    except ValueError as e:
+        # e.g. raised by `xml_validate`
+        _fail(errors, e)
+        return cast(XmlDataclassInstance, None)
+
+    for child, index in indexes:
+        set_child_index(instance, child, index)
+    return instance
+
+
+TrustedLoader = Callable[[Any, Options], Any]
+
+
+def _load_union(child: ChildInfo, el: Any, value: Any, options: Options) -> Any:
+    # the schema can't check union children, so these are loaded as usual
+    causes = []
+    for base_type in child.base_types:
+        try:
+            return _load(base_type, value, options)
+        except ValueError as e:
+            causes.append(e)
+    raise XmlUnionError(el, child.dt_name, causes=causes)
+
+
+def _get_trusted_loader(  # pylint: disable=too-many-statements
+    cls: Type[XmlDataclass],
+) -> TrustedLoader:
+    try:
+        return cast(TrustedLoader, cls.__dict__["__xml_trusted_loader__"])
+    except KeyError:
+        pass
+
+    attrs = [(attr.xml_name, attr) for attr in cls.__attributes__]
+    text_field = cls.__text_field__
+    # like `create_instance`, but looked up once
+    frozen = is_frozen(cls)
+    has_validate = hasattr(cls, "xml_validate")
+    # filled in after the loader is cached. union children have no loader
+    children: List[Tuple[ChildInfo, Optional[TrustedLoader]]] = []
+
+    def load_children(
+        el: Any, options: Options, values: Dict[str, Any], indexes: ChildIndexes
+    ) -> None:
+        el_children: Dict[str, List[Any]] = defaultdict(list)
+        for e in el.iterchildren(Element):
+            el_children[e.tag].append(e)
+        for child, load_child in children:
+            found = el_children.get(child.xml_name)
+            # with list children, the schema doesn't check how often children
+            # occur (see `schema._SchemaBuilder.add_type`)
+            if not found:
+                if child.is_required:
+                    raise XmlRequiredChildError(el, child.xml_name)
+                values[child.dt_name] = child.get_default()
+                continue
+            if not child.is_list and len(found) > 1:
+                raise XmlMultipleChildrenError(el, child.xml_name)
+            if load_child is None:
+                items = [_load_union(child, el, e, options) for e in found]
+            else:
+                items = [load_child(e, options) for e in found]
+            if not child.is_list:
+                values[child.dt_name] = items[0]
+                continue
+            if child.index_by:
+                items, index = build_child_index(child, items)
+                indexes.append((child, index))
+            values[child.dt_name] = tuple(items) if child.is_tuple else items
+
+    def load_trusted(el: Any, options: Options) -> Any:
+        values: Dict[str, Any] = {}
+        get = el.get
+        for xml_name, attr in attrs:
+            value = get(xml_name)
+            values[attr.dt_name] = attr.get_default() if value is None else value
+
+        indexes: ChildIndexes = []
+        if text_field:
+            text = el.text
+            # the schema allows comments and processing instructions, which
+            # are skipped
+            for e in el:
+                if e.tail:
+                    text = (text or "") + e.tail
+            values[text_field.dt_name] = (
+                text_field.get_default() if text is None else text
+            )
+        elif children:
+            load_children(el, options, values, indexes)
+
+        instance = cls(**values)
+        if frozen:
+            object.__setattr__(instance, "__nsmap__", el.nsmap)
+        else:
+            instance.__nsmap__ = el.nsmap
+        if has_validate:
+            instance.xml_validate()  # type: ignore[attr-defined]
+        for child, index in indexes:
+            set_child_index(instance, child, index)
+        return instance
+
+    setattr(cls, "__xml_trusted_loader__", load_trusted)
+    for child in cls.__children__:
+        if len(child.base_types) == 1:
+            children.append((child, _get_trusted_loader(child.base_types[0])))
+        else:
+            children.append((child, None))
+    return load_trusted
+
+
+def _is_trusted(options: Options) -> bool:
+    return (
+        options.trusted
+        and not options.collect_errors
+        and not options.intern_values
+        and options.max_depth is None
+        and options.max_elements is None
+        and options.max_list_length is None
+        and options.max_value_size is None
+    )
 
 
 def load(
@@ -160,66 +534,416 @@ def load(
 
     if not options:
         options = Options()
+    elif options.intern_values and options.intern_table is None:
+        options = replace(options, intern_table={})
 
+    errors: Errors = [] if options.collect_errors else None
     if name:
-        _validate_name(cls, el, name)
+        _validate_name(cls, el, name, errors)
+    if _is_trusted(options):
+        return cast(XmlDataclassInstance, _get_trusted_loader(cls)(el, options))
+    limits = None
+    if options.max_depth is not None or options.max_elements is not None:
+        limits = Limits(options)
+    instance = _load(cls, el, options, errors, limits)
+    if errors:
+        raise XmlLoadErrors(errors)
+    return instance
 
-    attr_values = _load_attributes(cls, el, options)
-    # are we just looking for text content?
-    if cls.__text_field__:
-        text_values = _load_text(cls.__text_field__, el)
-    else:
-        child_values = _load_children(cls, el, options)
 
-    if cls.__text_field__:
-        child_values = {}
-    else:
-        text_values = {}
+def load_any(el: Any, options: Optional[Options] = None) -> XmlDataclass:
+    # the class is looked up by the tag, so the name is already validated
+    return load(get_root_class(el.tag), el, options=options)
+
+
+# returns an error message, or `None` if the element is valid
+Checker = Callable[[Any, Options], Optional[ValueError]]
 
-    instance = cls(**attr_values, **text_values, **child_values)
-    instance.__nsmap__ = el.nsmap
 
+def _get_checker(  # pylint: disable=too-many-locals
+    cls: Type[XmlDataclass],
+) -> Checker:
     try:
-        validate_fn = instance.xml_validate  # type: ignore[attr-defined]
-    except AttributeError:
+        return cast(Checker, cls.__dict__["__xml_checker__"])
+    except KeyError:
         pass
-    else:
-        validate_fn()
 
-    return instance
+    required_attrs = [attr.xml_name for attr in cls.__attributes__ if attr.is_required]
+    attr_names = frozenset(attr.xml_name for attr in cls.__attributes__)
+    text_field = cls.__text_field__
+    child_names = frozenset(child.xml_name for child in cls.__children__)
+    # filled in after the checker is cached, for recursive models
+    children: List[Tuple[ChildInfo, List[Checker]]] = []
+
+    def check_text(el: Any, options: Options) -> Optional[ValueError]:
+        has_text = el.text is not None
+        for child in el.iterchildren():
+            if not _is_ignored(el, child, options):
+                return XmlChildElementsError(el)
+            if child.tail:
+                has_text = True
+        if not has_text and cast(TextInfo, text_field).is_required:
+            return XmlNoTextError(el)
+        return None
+
+    def check_children(  # pylint: disable=too-many-return-statements
+        el: Any, options: Options
+    ) -> Optional[ValueError]:
+        if el.text and el.text.strip():
+            return XmlTextError(el)
+
+        el_children = _group_children(el, options)
+        for child, checkers in children:
+            if child.xml_name not in el_children:
+                if child.is_required:
+                    return XmlRequiredChildError(el, child.xml_name)
+                continue
 
+            values = el_children[child.xml_name]
+            if not child.is_list and len(values) != 1:
+                return XmlMultipleChildrenError(el, child.xml_name)
+            for value in values:
+                causes = []
+                for checker in checkers:
+                    error = checker(value, options)
+                    if error is None:
+                        break
+                    causes.append(error)
+                else:
+                    if len(causes) == 1:
+                        return causes[0]
+                    return XmlUnionError(el, child.dt_name, causes=causes)
+
+        unprocessed = el_children.keys() - child_names
+        if unprocessed and not options.ignore_unknown_children:
+            return XmlUndeclaredChildrenError(el, names=unprocessed)
+        return None
+
+    def check_el(el: Any, options: Options) -> Optional[ValueError]:
+        attrib = el.attrib
+        for attr_name in required_attrs:
+            if attr_name not in attrib:
+                return XmlRequiredAttributeError(el, attr_name)
+        if not options.ignore_unknown_attributes:
+            unprocessed = set(attrib.keys()) - attr_names
+            if unprocessed:
+                return XmlUndeclaredAttributesError(el, names=unprocessed)
 
-def dump(
-    instance: XmlDataclassInstance,
-    name: str,
-    nsmap: NsMap,
-) -> Any:
-    cls = type(instance)
+        try:
+            if text_field:
+                return check_text(el, options)
+            return check_children(el, options)
+        except ValueError as e:
+            # ignored nodes that aren't allowed
+            return e
+
+    setattr(cls, "__xml_checker__", check_el)
+    for child in cls.__children__:
+        children.append((child, [_get_checker(t) for t in child.base_types]))
+    return check_el
+
+
+def check(
+    cls: Type[XmlDataclass],
+    el: Any,
+    name: Optional[str] = None,
+    options: Optional[Options] = None,
+) -> None:
+    # applies the same rules as `load`, but doesn't create instances, so
+    # `xml_validate` isn't called
     if not is_xml_dataclass(cls):
         raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
 
-    resolved_nsmap = instance.__nsmap__ if instance.__nsmap__ else nsmap
-    maker = ElementMaker(namespace=instance.__ns__, nsmap=resolved_nsmap)
-    el = maker(name)
+    if name:
+        _validate_name(cls, el, name)
+    error = _get_checker(cls)(el, options or Options())
+    if error is not None:
+        raise error
 
+
+def _iter_attributes(instance: XmlDataclass) -> Iterator[Tuple[str, Any]]:
     for attr in instance.__attributes__:
         attr_value: Any = getattr(instance, attr.dt_name)
         if not (attr.is_optional and attr_value is None):
-            el.attrib[attr.xml_name] = attr_value
+            yield attr.xml_name, attr_value
+
+
+def iter_children(instance: XmlDataclass) -> Iterator[Tuple[str, Any]]:
+    for child in instance.__children__:
+        child_value: Any = getattr(instance, child.dt_name)
+        if child.is_optional and child_value is None:
+            continue
+        if child.is_list:
+            for value in child_value:
+                yield child.xml_name, value
+        else:
+            yield child.xml_name, child_value
+
+
+def qualified_name(instance: XmlDataclass, name: str) -> str:
+    # same as `ElementMaker`, the name of children is already qualified
+    return name if name[0] == "{" else format_ns(name, instance.__ns__)
+
+
+def _dump(instance: XmlDataclass, name: str, nsmap: NsMap) -> Any:
+    resolved_nsmap = instance.__nsmap__ if instance.__nsmap__ else nsmap
+    maker = ElementMaker(namespace=instance.__ns__, nsmap=resolved_nsmap)
+    el = maker(name)
+
+    for attr_name, attr_value in _iter_attributes(instance):
+        el.attrib[attr_name] = attr_value
 
     text = instance.__text_field__
     if text:
         text_value: Any = getattr(instance, text.dt_name)
         el.text = text_value
     else:
-        for child in instance.__children__:
-            child_value: Any = getattr(instance, child.dt_name)
-            if child.is_optional and child_value is None:
-                continue
-            if child.is_list:
-                for value in child_value:
-                    el.append(dump(value, child.xml_name, nsmap))
-            else:
-                el.append(dump(child_value, child.xml_name, nsmap))
+        # the element of a tracked instance is cached, so it can contain the
+        # cached elements of its children (which are also tracked)
+        dump_child = _dump_fragment if is_tracked(type(instance)) else dump
+        for child_name, value in iter_children(instance):
+            el.append(dump_child(value, child_name, nsmap))
+
+    return el
+
+
+def _dump_fragment(instance: XmlDataclass, name: str, nsmap: NsMap) -> Any:
+    if not is_tracked(type(instance)):
+        return dump(instance, name, nsmap)
+    el = get_fragment(instance, name, nsmap)
+    if el is None:
+        el = _dump(instance, name, nsmap)
+        store_fragment(instance, name, nsmap, el)
+    return el
+
+
+def _dump_hoisted_into(instance: XmlDataclass, el: Any) -> None:
+    for attr_name, attr_value in _iter_attributes(instance):
+        el.attrib[attr_name] = attr_value
+
+    text = instance.__text_field__
+    if text:
+        text_value: Any = getattr(instance, text.dt_name)
+        el.text = text_value
+        return
+
+    for child_name, value in iter_children(instance):
+        cls = type(value)
+        if not is_xml_dataclass(cls):
+            raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+        # all namespaces are in scope, so children don't need an nsmap
+        _dump_hoisted_into(value, SubElement(el, child_name))
 
+
+def _dump_hoisted(instance: XmlDataclass, name: str, nsmap: NsMap) -> Any:
+    resolved_nsmap = instance.__nsmap__ if instance.__nsmap__ else nsmap
+    hoisted = hoist_nsmap(type(instance), resolved_nsmap)
+    el = Element(qualified_name(instance, name), nsmap=hoisted)
+    _dump_hoisted_into(instance, el)
     return el
+
+
+def dump(
+    instance: XmlDataclassInstance,
+    name: str,
+    nsmap: NsMap,
+    hoist_namespaces: bool = False,
+) -> Any:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+
+    # the cached fragments of tracked instances have their own declarations
+    if hoist_namespaces:
+        return _dump_hoisted(instance, name, nsmap)
+
+    if not is_tracked(cls):
+        return _dump(instance, name, nsmap)
+
+    el = get_fragment(instance, name, nsmap)
+    if el is None:
+        el = _dump(instance, name, nsmap)
+        store_fragment(instance, name, nsmap, el)
+        # the cached element must not be changed by the caller
+        el = deepcopy(el)
+    return el
+
+
+def xmlfile_attrib(instance: XmlDataclass) -> Dict[str, Any]:
+    # `xmlfile` doesn't know about the reserved prefix
+    return {
+        attr_name.replace(_XML_NS, "xml:", 1): attr_value
+        for attr_name, attr_value in _iter_attributes(instance)
+    }
+
+
+def dump_into(
+    instance: XmlDataclassInstance,
+    parent: Any,
+    name: str,
+    nsmap: NsMap = None,
+) -> Any:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+
+    # namespaces in scope of the parent are re-used, only other namespaces
+    # are declared on the new element
+    scope = parent.nsmap
+    resolved_nsmap = instance.__nsmap__ if instance.__nsmap__ else nsmap
+    preferred = {
+        prefix: uri
+        for prefix, uri in (resolved_nsmap or {}).items()
+        if uri not in scope.values()
+    }
+    hoisted = hoist_nsmap(cls, {**scope, **preferred})
+    declare = {
+        prefix: uri for prefix, uri in hoisted.items() if scope.get(prefix) != uri
+    }
+
+    el = SubElement(parent, qualified_name(instance, name), nsmap=declare or None)
+    _dump_hoisted_into(instance, el)
+    return el
+
+
+def _prefixed(
+    name: str, scope: Mapping[Optional[str], str], is_attribute: bool
+) -> Optional[str]:
+    if name[0] != "{":
+        return name
+    local_name, namespace = strip_ns(name)
+    for prefix, uri in scope.items():
+        # unprefixed attributes are in no namespace
+        if uri == namespace and (prefix or not is_attribute):
+            return f"{prefix}:{local_name}" if prefix else local_name
+    return None
+
+
+def _write_leaf(
+    xf: Any,
+    tag: str,
+    attrib: Dict[str, Any],
+    declare: Dict[Optional[str], str],
+    scope: Mapping[Optional[str], str],
+) -> bool:
+    # `xmlfile` always writes an end tag, and written elements re-declare the
+    # namespaces in scope. the names of HTML elements aren't namespace aware,
+    # so leaves are written with the prefixes in scope instead
+    qname = _prefixed(tag, scope, False)
+    if qname is None:
+        return False
+    leaf_attrib = {
+        (f"xmlns:{prefix}" if prefix else "xmlns"): uri
+        for prefix, uri in declare.items()
+    }
+    for attr_name, attr_value in attrib.items():
+        attr_qname = _prefixed(attr_name, scope, True)
+        if attr_qname is None:
+            return False
+        leaf_attrib[attr_qname] = attr_value
+    xf.write(_HTML_PARSER.makeelement(qname, leaf_attrib), method="xml")
+    return True
+
+
+def write_element(  # pylint: disable=too-many-arguments,too-many-locals
+    xf: Any,
+    instance: XmlDataclassInstance,
+    name: str,
+    nsmap: NsMap,
+    scope: Mapping[Optional[str], str],
+    indent: Optional[str],
+    hoisted: bool,
+) -> None:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+
+    # when hoisted, the namespaces of loaded instances are ignored
+    if hoisted or not instance.__nsmap__:
+        resolved_nsmap = nsmap
+    else:
+        resolved_nsmap = instance.__nsmap__
+    # namespaces are only declared where they change, otherwise `xmlfile`
+    # repeats the declarations on every element
+    declare = {
+        prefix: uri
+        for prefix, uri in (resolved_nsmap or {}).items()
+        if prefix != "xml" and scope.get(prefix) != uri
+    }
+    if declare:
+        scope = {**scope, **declare}
+    tag = qualified_name(instance, name)
+    attrib = xmlfile_attrib(instance)
+    text = instance.__text_field__
+    text_value: Any = getattr(instance, text.dt_name) if text else None
+    if not text_value and (text or not any(iter_children(instance))):
+        if _write_leaf(xf, tag, attrib, declare, scope):
+            return
+    with xf.element(tag, attrib, nsmap=declare or None):
+        if text:
+            if text_value is not None:
+                xf.write(text_value)
+            return
+
+        child_indent = None if indent is None else indent + "  "
+        has_children = False
+        for child_name, value in iter_children(instance):
+            if child_indent is not None:
+                xf.write(child_indent)
+            write_element(xf, value, child_name, nsmap, scope, child_indent, hoisted)
+            has_children = True
+        if has_children and indent is not None:
+            xf.write(indent)
+
+
+def dump_to(  # pylint: disable=too-many-arguments
+    instance: XmlDataclassInstance,
+    stream: Any,
+    name: str,
+    nsmap: NsMap,
+    encoding: str = "utf-8",
+    pretty_print: bool = False,
+    xml_declaration: bool = False,
+    hoist_namespaces: bool = False,
+) -> None:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+
+    if hoist_namespaces:
+        resolved_nsmap = instance.__nsmap__ if instance.__nsmap__ else nsmap
+        nsmap = hoist_nsmap(cls, resolved_nsmap)
+
+    indent = "\n" if pretty_print else None
+    with etree.xmlfile(stream, encoding=encoding) as xf:
+        if xml_declaration:
+            xf.write_declaration()
+        write_element(xf, instance, name, nsmap, {}, indent, hoist_namespaces)
+
+
+def dumps(  # pylint: disable=too-many-arguments
+    instance: XmlDataclassInstance,
+    name: str,
+    nsmap: NsMap,
+    encoding: Union[str, Type[str]] = "utf-8",
+    pretty_print: bool = False,
+    xml_declaration: bool = False,
+    hoist_namespaces: bool = False,
+) -> Union[bytes, str]:
+    is_unicode = encoding in ("unicode", str)
+    if is_unicode and xml_declaration:
+        raise ValueError("Serialisation to unicode must not request an XML declaration")
+
+    buf = BytesIO()
+    dump_to(
+        instance,
+        buf,
+        name,
+        nsmap,
+        "utf-8" if is_unicode else cast(str, encoding),
+        pretty_print,
+        xml_declaration,
+        hoist_namespaces,
+    )
+    data = buf.getvalue()
+    return data.decode("utf-8") if is_unicode else data
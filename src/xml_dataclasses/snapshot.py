@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import struct
+import sys
+from array import array
+from itertools import accumulate
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, cast
+
+from .resolve_types import (
+    NsMap,
+    XmlDataclass,
+    XmlDataclassInstance,
+    is_xml_dataclass,
+)
+from .serde import create_instance
+
+# A snapshot is a string table and a flat array of tokens. The tokens are
+# ordinal: the fields of each instance are written in the order of the
+# model, so no field names need to be stored. Strings and `None` are
+# encoded as 0 for `None`, and string index + 1 otherwise.
+#
+#   magic | fingerprint | header | string lengths | strings | tokens
+#
+# The token array starts with the namespace maps, followed by the root:
+#
+#   instance: nsmap (0 for `None`, index + 1) | attributes | text or children
+#   child: 0 for `None`, otherwise type ordinal + 1 and an instance
+#   list of children: 0 for `None`, otherwise length + 1 and children
+_MAGIC = b"XDCSNP1\n"
+_HEADER = struct.Struct("<32sQQ")
+_TOKEN = "I"
+
+Decoder = Callable[[Callable[[], int]], Any]
+
+
+def _iter_model(cls: Type[XmlDataclass]) -> List[Type[XmlDataclass]]:
+    classes: List[Type[XmlDataclass]] = []
+    pending = [cls]
+    while pending:
+        tp = pending.pop(0)
+        if tp in classes:
+            continue
+        classes.append(tp)
+        for child in tp.__children__:
+            pending.extend(child.base_types)
+    return classes
+
+
+def model_fingerprint(cls: Type[XmlDataclass]) -> bytes:
+    # the model graph doesn't change, so this is cached on the class
+    try:
+        return cast(bytes, cls.__dict__["__xml_fingerprint__"])
+    except KeyError:
+        pass
+
+    h = hashlib.sha256()
+    for tp in _iter_model(cls):
+        h.update(repr((tp.__module__, tp.__qualname__, tp.__ns__)).encode())
+        for attr in tp.__attributes__:
+            h.update(repr(("a", attr.dt_name, attr.xml_name)).encode())
+        text = tp.__text_field__
+        if text:
+            h.update(repr(("t", text.dt_name)).encode())
+        for child in tp.__children__:
+            names = [(t.__module__, t.__qualname__) for t in child.base_types]
+            kind = "tuple" if child.is_tuple else "list" if child.is_list else "one"
+            h.update(repr(("c", child.dt_name, kind, names)).encode())
+
+    fingerprint = h.digest()
+    setattr(cls, "__xml_fingerprint__", fingerprint)
+    return fingerprint
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        self.nsmaps: Dict[Tuple[Tuple[Optional[str], str], ...], int] = {}
+        self.tokens = array(_TOKEN)
+
+    def string(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        if not isinstance(value, str):
+            raise ValueError(f"Value '{value!r}' is not a string")
+        try:
+            return self.strings[value] + 1
+        except KeyError:
+            i = self.strings[value] = len(self.strings)
+            return i + 1
+
+    def nsmap(self, nsmap: NsMap) -> int:
+        if nsmap is None:
+            return 0
+        key = tuple(nsmap.items())
+        try:
+            return self.nsmaps[key] + 1
+        except KeyError:
+            i = self.nsmaps[key] = len(self.nsmaps)
+            return i + 1
+
+    def child(self, types: Tuple[Type[XmlDataclass], ...], value: Any) -> None:
+        try:
+            ordinal = types.index(type(value))
+        except ValueError:
+            msg = f"Class '{type(value)!r}' is not a valid child type {types!r}"
+            raise ValueError(msg) from None
+        self.tokens.append(ordinal + 1)
+        self.instance(value)
+
+    def instance(self, instance: XmlDataclass) -> None:
+        append = self.tokens.append
+        append(self.nsmap(instance.__nsmap__))
+        for attr in instance.__attributes__:
+            append(self.string(getattr(instance, attr.dt_name)))
+        text = instance.__text_field__
+        if text:
+            append(self.string(getattr(instance, text.dt_name)))
+            return
+        for child in instance.__children__:
+            value = getattr(instance, child.dt_name)
+            if value is None:
+                append(0)
+            elif child.is_list:
+                append(len(value) + 1)
+                for item in value:
+                    self.child(child.base_types, item)
+            else:
+                self.child(child.base_types, value)
+
+
+def dump_snapshot(instance: XmlDataclassInstance) -> bytes:
+    cls = type(instance)
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+
+    encoder = _Encoder()
+    encoder.instance(instance)
+    # the namespace maps are only known after encoding all instances
+    nsmap_tokens = array(_TOKEN, [len(encoder.nsmaps)])
+    for nsmap in encoder.nsmaps:
+        nsmap_tokens.append(len(nsmap))
+        for prefix, uri in nsmap:
+            nsmap_tokens.append(encoder.string(prefix))
+            nsmap_tokens.append(encoder.string(uri))
+    tokens = nsmap_tokens + encoder.tokens
+
+    strings = list(encoder.strings)
+    lengths = array(_TOKEN, [len(s) for s in strings])
+    blob = "".join(strings).encode("utf-8", "surrogatepass")
+    if sys.byteorder == "big":  # pragma: no cover
+        lengths.byteswap()
+        tokens.byteswap()
+    header = _HEADER.pack(model_fingerprint(cls), len(strings), len(blob))
+    return b"".join((_MAGIC, header, lengths.tobytes(), blob, tokens.tobytes()))
+
+
+def _compile(
+    cls: Type[XmlDataclass], decoders: Dict[Any, Decoder], ctx: Any
+) -> Decoder:
+    # one decoder per class, which knows the order of the fields
+    try:
+        return decoders[cls]
+    except KeyError:
+        pass
+
+    strings, nsmaps = ctx
+    attrs = [attr.dt_name for attr in cls.__attributes__]
+    text = cls.__text_field__
+    text_name = text.dt_name if text else None
+    children: List[Tuple[str, bool, bool, List[Decoder]]] = []
+
+    def decode(next_token: Callable[[], int]) -> Any:
+        nsmap = nsmaps[next_token()]
+        values = {name: strings[next_token()] for name in attrs}
+        if text_name:
+            values[text_name] = strings[next_token()]
+        for name, is_list, is_tuple, types in children:
+            token = next_token()
+            if not token:
+                values[name] = None
+            elif is_list:
+                items = [types[next_token() - 1](next_token) for _ in range(token - 1)]
+                values[name] = tuple(items) if is_tuple else items
+            else:
+                values[name] = types[token - 1](next_token)
+        return create_instance(cls, values, nsmap)
+
+    decoders[cls] = decode
+    for child in cls.__children__:
+        types = [_compile(tp, decoders, ctx) for tp in child.base_types]
+        children.append((child.dt_name, child.is_list, child.is_tuple, types))
+    return decode
+
+
+def load_snapshot(  # pylint: disable=too-many-locals
+    cls: Type[XmlDataclassInstance], data: Any
+) -> XmlDataclassInstance:
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+
+    data = memoryview(data)
+    if bytes(data[: len(_MAGIC)]) != _MAGIC:
+        raise ValueError("Data is not a snapshot")
+    pos = len(_MAGIC)
+    fingerprint, string_count, blob_len = _HEADER.unpack_from(data, pos)
+    if fingerprint != model_fingerprint(cls):
+        raise ValueError(f"Snapshot doesn't match the model of '{cls!r}'")
+    pos += _HEADER.size
+
+    lengths = array(_TOKEN)
+    end = pos + string_count * lengths.itemsize
+    lengths.frombytes(data[pos:end])
+    blob = bytes(data[end : end + blob_len]).decode("utf-8", "surrogatepass")
+    tokens = array(_TOKEN)
+    tokens.frombytes(data[end + blob_len :])
+    if sys.byteorder == "big":  # pragma: no cover
+        lengths.byteswap()
+        tokens.byteswap()
+
+    # index 0 is `None`
+    offsets = [0, *accumulate(lengths)]
+    strings: List[Optional[str]] = [None]
+    strings.extend(blob[offsets[i] : offsets[i + 1]] for i in range(string_count))
+
+    next_token = iter(tokens).__next__
+    try:
+        nsmaps: List[NsMap] = [None]
+        for _ in range(next_token()):
+            pairs = [
+                (strings[next_token()], strings[next_token()])
+                for _ in range(next_token())
+            ]
+            nsmaps.append(dict(cast(List[Tuple[Optional[str], str]], pairs)))
+
+        decode = _compile(cls, {}, (strings, nsmaps))
+        instance = cast(XmlDataclassInstance, decode(next_token))
+    except (StopIteration, IndexError):
+        raise ValueError("Snapshot is truncated or corrupt") from None
+
+    try:
+        next_token()
+    except StopIteration:
+        return instance
+    raise ValueError("Snapshot has trailing data")
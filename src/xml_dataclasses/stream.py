@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import re
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Match,
+    Optional,
+    Tuple,
+    Type,
+    cast,
+)
+
+from lxml import etree  # type: ignore[import]
+
+from .files import open_source, open_target
+from .lxml_utils import format_ns
+from .options import Options
+from .resolve_types import (
+    NsMap,
+    XmlDataclass,
+    XmlDataclassInstance,
+    is_xml_dataclass,
+    root_tags,
+)
+from .scanner import COMMENT, END, PI, START, iter_documents, iter_tokens
+from .serde import (
+    Limits,
+    attribute_size_error,
+    dump_to,
+    load,
+    load_any,
+    text_size_error,
+)
+
+_READ_SIZE = 2**16
+_DECLARATION_RE = re.compile(rb"<\?xml[\s?]")
+_NOT_SPACE_RE = re.compile(rb"\S")
+
+
+def _free(el: Any) -> None:
+    el.clear()
+    # also remove previous siblings, which were processed already
+    parent = el.getparent()
+    while el.getprevious() is not None:
+        del parent[0]
+
+
+def _text_size(el: Any) -> int:
+    size = 0
+    for e in el.iter():
+        size += len(e.text or "") + len(e.tail or "")
+        size += sum(len(v) for v in e.attrib.values())
+    return size
+
+
+def _iter_limited(context: Any, tag: Any, options: Options) -> Iterator[Any]:
+    # enforces the limits while parsing, so records exceeding them are never
+    # fully parsed. like `load`, the limits apply to each record
+    tags = {tag} if isinstance(tag, str) else set(tag)
+    max_value_size = options.max_value_size
+    limits = Limits(options)
+    depth = 0
+    for event, el in context:
+        if event == "start":
+            depth += 1
+            if depth == 2:
+                limits = Limits(options)
+            if depth > 1:
+                limits.enter(el)
+            if max_value_size is not None:
+                for name, value in el.attrib.items():
+                    if len(value) > max_value_size:
+                        raise attribute_size_error(el, name, max_value_size)
+            continue
+
+        if depth > 1:
+            limits.depth -= 1
+        depth -= 1
+        if max_value_size is not None and len(el.text or "") > max_value_size:
+            raise text_size_error(el, max_value_size)
+        if el.tag in tags:
+            yield el
+
+
+def _iter_elements(
+    source: Any, tag: Any, options: Optional[Options] = None
+) -> Iterator[Any]:
+    elements: Iterator[Any]
+    # compressed sources are decompressed incrementally
+    with open_source(source) as f:
+        if options is None or (
+            options.max_depth is None
+            and options.max_elements is None
+            and options.max_value_size is None
+        ):
+            elements = (el for _, el in etree.iterparse(f, events=("end",), tag=tag))
+        else:
+            context = etree.iterparse(f, events=("start", "end"))
+            elements = _iter_limited(context, tag, options)
+        for el in elements:
+            parent = el.getparent()
+            # records are children of the root element, this skips nested
+            # elements with the same name (the root can't have a parent)
+            if parent is None or parent.getparent() is not None:
+                continue
+            yield el
+            # the record is no longer needed once the consumer asks for the next
+            _free(el)
+
+
+def _iter_records(
+    cls: Type[Any], source: Any, name: str, options: Optional[Options]
+) -> Iterator[Any]:
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    return _iter_elements(source, format_ns(name, cls.__ns__), options)
+
+
+def iterload(
+    cls: Type[XmlDataclassInstance],
+    source: Any,
+    name: str,
+    options: Optional[Options] = None,
+) -> Iterator[XmlDataclassInstance]:
+    for el in _iter_records(cls, source, name, options):
+        yield load(cls, el, options=options)
+
+
+def iterload_any(
+    source: Any, options: Optional[Options] = None
+) -> Iterator[XmlDataclass]:
+    # records without a registered class are skipped
+    for el in _iter_elements(source, root_tags(), options):
+        yield load_any(el, options)
+
+
+def iterload_windows(  # pylint: disable=too-many-arguments
+    cls: Type[XmlDataclassInstance],
+    source: Any,
+    name: str,
+    size: int,
+    max_text_size: Optional[int] = None,
+    options: Optional[Options] = None,
+) -> Iterator[List[XmlDataclassInstance]]:
+    if size < 1:
+        raise ValueError(f"Window size must be at least 1 (got {size})")
+
+    window: List[XmlDataclassInstance] = []
+    window_text_size = 0
+    for el in _iter_records(cls, source, name, options):
+        if max_text_size is not None:
+            text_size = _text_size(el)
+            # a record on its own may exceed the limit, but never a window
+            if window and window_text_size + text_size > max_text_size:
+                yield window
+                window = []
+                window_text_size = 0
+            window_text_size += text_size
+
+        window.append(load(cls, el, options=options))
+        if len(window) >= size:
+            yield window
+            window = []
+            window_text_size = 0
+
+    if window:
+        yield window
+
+
+def _is_epilog(buf: bytes) -> bool:
+    # only whitespace, comments and processing instructions may follow the
+    # last document, but not the declaration of another document
+    pos = 0
+    for m in iter_tokens(buf):
+        if (
+            m.lastgroup not in (COMMENT, PI)
+            or buf[pos : m.start()].strip()
+            or _DECLARATION_RE.match(m.group())
+        ):
+            return False
+        pos = m.end()
+    return not buf[pos:].strip()
+
+
+def _scan_document(
+    buf: bytes, pos: int, scanned: int, depth: int
+) -> Tuple[int, int, int, bool]:
+    # tokenizes a document until its root element is closed, or the buffer
+    # ends. an unbalanced end tag also closes the document, and fails to parse
+    for m in iter_tokens(buf, scanned):
+        kind = m.lastgroup
+        scanned = m.end()
+        if kind == END:
+            depth -= 1
+        elif kind == START:
+            if depth == 0:
+                # a declaration must be at the start of the document
+                space = _NOT_SPACE_RE.search(buf, pos)
+                pos = cast(Match[bytes], space).start()
+            if not m.group("empty"):
+                depth += 1
+        else:
+            continue
+        if depth <= 0:
+            return pos, scanned, 0, True
+    return pos, scanned, depth, False
+
+
+def _iter_documents(source: Any, parser: Any) -> Iterator[Any]:
+    # the boundaries of the documents are found with the scanner, and each
+    # document is fed to the same parser as it is read
+    if parser is None:
+        parser = etree.XMLParser()
+    feed = parser.feed
+    close = parser.close
+    with open_source(source) as f:
+        buf = b""
+        depth = 0
+        while True:
+            chunk = f.read(_READ_SIZE)
+            buf += chunk
+            # `pos` is the start of the data that wasn't fed yet, and
+            # `scanned` the end of the last complete token. the buffer is
+            # only sliced once the chunk is used up. `feed` doesn't take
+            # memoryviews, so each document is still copied
+            pos = scanned = 0
+            while True:
+                if depth == 0:
+                    for start, pos in iter_documents(buf, pos):
+                        feed(buf[start:pos])
+                        yield close()
+                    scanned = pos
+                pos, scanned, depth, closed = _scan_document(buf, pos, scanned, depth)
+                if not closed:
+                    break
+                feed(buf[pos:scanned])
+                yield close()
+                pos = scanned
+
+            if not chunk:
+                break
+            if depth:
+                feed(buf[pos:scanned])
+                pos = scanned
+            # the prolog of a document is kept until its root element starts
+            buf = buf[pos:]
+
+        if depth or not _is_epilog(buf):
+            # incomplete or invalid documents fail to parse
+            feed(buf)
+            close()
+
+
+def iterload_documents(
+    cls: Type[XmlDataclassInstance],
+    source: Any,
+    name: Optional[str] = None,
+    options: Optional[Options] = None,
+    parser: Any = None,
+) -> Iterator[XmlDataclassInstance]:
+    if not is_xml_dataclass(cls):
+        raise ValueError(f"Class '{cls!r}' is not an XML dataclass")
+    for el in _iter_documents(source, parser):
+        yield load(cls, el, name, options)
+
+
+def dump_documents(  # pylint: disable=too-many-arguments
+    instances: Iterable[XmlDataclassInstance],
+    target: Any,
+    name: str,
+    nsmap: NsMap,
+    compression: Optional[str] = None,
+    encoding: str = "utf-8",
+    xml_declaration: bool = False,
+) -> None:
+    # one document per line, unless text contains line breaks
+    with open_target(target, compression) as f:
+        for instance in instances:
+            dump_to(instance, f, name, nsmap, encoding, xml_declaration=xml_declaration)
+            f.write(b"\n")
@@ -0,0 +1,200 @@
+# pylint: disable=unsubscriptable-object
+from __future__ import annotations
+
+import weakref
+from copy import deepcopy
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from .exceptions import XmlDataclassModelError
+from .resolve_types import (
+    HASH_KEY,
+    NsMap,
+    XmlDataclass,
+    XmlDataclassInstance,
+    drop_child_index,
+    is_frozen,
+)
+
+# per-instance state is kept in the instance dictionary, so that it never
+# goes through the generated __setattr__ (and doesn't count as a change)
+_FRAGMENT = "__xml_fragment__"
+_PARENTS = "__xml_parents__"
+_STATE_KEYS = frozenset([_FRAGMENT, _PARENTS, HASH_KEY])
+
+FragmentKey = Tuple[str, Optional[Tuple[Tuple[Optional[str], str], ...]]]
+
+
+def is_tracked(tp: Type[Any]) -> bool:
+    return getattr(tp, "__xml_tracked__", False) is True
+
+
+def _link(child: Any, parent: Any) -> None:
+    if not is_tracked(type(child)):
+        return
+    parents: List[Any] = child.__dict__.setdefault(_PARENTS, [])
+    if not any(ref() is parent for ref in parents):
+        parents.append(weakref.ref(parent))
+
+
+# drop the cached fragment of an instance, and of all its ancestors
+def invalidate(instance: Any) -> None:
+    state = instance.__dict__
+    if state.pop(_FRAGMENT, None) is None:
+        # an instance without a fragment can't have cached ancestors, since
+        # fragments are only ever created top-down (see `store_fragment`)
+        return
+    for ref in state.get(_PARENTS, ()):
+        parent = ref()
+        if parent is not None:
+            invalidate(parent)
+
+
+# a list of child instances, which invalidates its owner (and the index of
+# the field, if any) when modified
+class TrackedList(List[Any]):
+    def __init__(self, owner: Any, name: str, iterable: Iterable[Any] = ()) -> None:
+        super().__init__(iterable)
+        self._owner = weakref.ref(owner)
+        self._name = name
+        for value in self:
+            _link(value, owner)
+
+    def _changed(self, values: Iterable[Any] = ()) -> None:
+        owner = self._owner()
+        if owner is None:
+            return
+        for value in values:
+            _link(value, owner)
+        drop_child_index(owner, self._name)
+        invalidate(owner)
+
+    # lists of tracked children are plain lists once copied or pickled, the
+    # owner wraps them again on assignment
+    def __reduce_ex__(self, protocol: Any) -> Any:
+        return (list, (list(self),))
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        values = list(value) if isinstance(index, slice) else [value]
+        super().__setitem__(index, values if isinstance(index, slice) else value)
+        self._changed(values)
+
+    def __delitem__(self, index: Any) -> None:
+        super().__delitem__(index)
+        self._changed()
+
+    def __iadd__(self, values: Iterable[Any]) -> TrackedList:  # type: ignore[misc]
+        values = list(values)
+        super().__iadd__(values)
+        self._changed(values)
+        return self
+
+    def __imul__(self, n: Any) -> TrackedList:  # type: ignore[misc]
+        super().__imul__(n)
+        self._changed()
+        return self
+
+    def append(self, value: Any) -> None:
+        super().append(value)
+        self._changed([value])
+
+    def extend(self, values: Iterable[Any]) -> None:
+        values = list(values)
+        super().extend(values)
+        self._changed(values)
+
+    def insert(self, index: Any, value: Any) -> None:
+        super().insert(index, value)
+        self._changed([value])
+
+    def pop(self, index: Any = -1) -> Any:
+        value = super().pop(index)
+        self._changed()
+        return value
+
+    def remove(self, value: Any) -> None:
+        super().remove(value)
+        self._changed()
+
+    def clear(self) -> None:
+        super().clear()
+        self._changed()
+
+    def sort(self, *args: Any, **kwargs: Any) -> None:
+        super().sort(*args, **kwargs)
+        self._changed()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self._changed()
+
+
+def _fragment_key(name: str, nsmap: NsMap) -> FragmentKey:
+    return (name, tuple(nsmap.items()) if nsmap else None)
+
+
+def get_fragment(instance: XmlDataclass, name: str, nsmap: NsMap) -> Any:
+    try:
+        key, el = instance.__dict__[_FRAGMENT]
+    except KeyError:
+        return None
+    if key != _fragment_key(name, nsmap):
+        return None
+    # the cached element can be part of the cached elements of parents
+    return deepcopy(el)
+
+
+def store_fragment(instance: XmlDataclass, name: str, nsmap: NsMap, el: Any) -> None:
+    instance.__dict__[_FRAGMENT] = (_fragment_key(name, nsmap), el)
+
+
+def _make_setattr(
+    original: Callable[[Any, str, Any], None], list_fields: Dict[str, bool]
+) -> Callable[[Any, str, Any], None]:
+    def __setattr__(self: Any, name: str, value: Any) -> None:
+        try:
+            is_list = list_fields[name]
+        except KeyError:
+            pass
+        else:
+            if is_list and value is not None:
+                value = TrackedList(self, name, value)
+            else:
+                _link(value, self)
+        original(self, name, value)
+        invalidate(self)
+
+    return __setattr__
+
+
+def _getstate(self: Any) -> Dict[str, Any]:
+    return {k: v for k, v in self.__dict__.items() if k not in _STATE_KEYS}
+
+
+def _setstate(self: Any, state: Dict[str, Any]) -> None:
+    for k, v in state.items():
+        setattr(self, k, v)
+
+
+def tracked(cls: Type[XmlDataclassInstance]) -> Type[XmlDataclassInstance]:
+    # a cached fragment is only valid if all children are tracked, too
+    for child in cls.__children__:
+        for base_type in child.base_types:
+            if not is_tracked(base_type):
+                raise XmlDataclassModelError(
+                    f"Child type '{base_type.__name__}' of field '{child.dt_name}' "
+                    f"on '{cls.__name__}' must also be tracked"
+                )
+
+    # frozen instances can't be modified, so the cached fragment stays valid
+    if not is_frozen(cls):
+        list_fields = {
+            child.dt_name: child.is_list and not child.is_tuple
+            for child in cls.__children__
+        }
+        setattr(cls, "__setattr__", _make_setattr(cls.__setattr__, list_fields))
+        setattr(cls, "__setstate__", _setstate)
+    # weak references to parents can't be pickled
+    setattr(cls, "__getstate__", _getstate)
+
+    setattr(cls, "__xml_tracked__", True)
+    return cls
@@ -0,0 +1,154 @@
+from dataclasses import dataclass
+from typing import List, Optional, Union
+
+import pytest
+from lxml import etree
+
+# test public exports
+from xml_dataclasses import Options, check, index_by, load, rename, text, xml_dataclass
+
+NS = "https://tobywf.com"
+
+
+@xml_dataclass
+class Text:
+    __ns__ = None
+    value: str = text()
+
+
+@xml_dataclass
+class OptionalText:
+    __ns__ = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Child1:
+    __ns__ = None
+    spam: str
+
+
+@xml_dataclass
+class Child2:
+    __ns__ = None
+    wibble: str
+
+
+@xml_dataclass
+class Foo:
+    __ns__ = None
+    id: str
+    lang: Optional[str] = rename(default=None, ns="urn:attr")
+    text: Optional[OptionalText] = None
+    child: Optional[List[Union[Child1, Child2]]] = None
+    one: Optional[Union[Child1, Child2]] = None
+    item: Optional[List[Child1]] = index_by("spam", default=None)
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [None, object, str, int, dataclass(type("Foo", (), {}))],
+)
+def test_check_not_xml_dataclass(cls):
+    with pytest.raises(ValueError) as exc_info:
+        check(cls, None, "foo")
+
+    assert repr(cls) in str(exc_info.value)
+
+
+def assert_same_as_load(cls, xml, name=None, options=None):
+    el = etree.fromstring(xml)
+    try:
+        load(cls, el, name, options)
+    except ValueError as e:
+        with pytest.raises(ValueError) as exc_info:
+            check(cls, el, name, options)
+        assert str(exc_info.value) == str(e)
+        assert type(exc_info.value) is type(e)
+    else:
+        assert check(cls, el, name, options) is None
+
+
+@pytest.mark.parametrize(
+    "xml",
+    [
+        '<foo id="1" />',
+        '<foo id="1" xmlns:a="urn:attr" a:lang="en"><text /></foo>',
+        '<foo id="1"><text>bar</text><one wibble="1" /></foo>',
+        '<foo id="1"><child spam="1" /><child wibble="2" /></foo>',
+        '<foo id="1"><item spam="1" /><item spam="1" /></foo>',
+        '<foo id="1">\n  <one spam="1" />\n</foo>',
+        # errors
+        "<foo />",
+        '<foo id="1" lang="en" />',
+        '<foo id="1">bar</foo>',
+        '<foo id="1"><bar /></foo>',
+        '<foo id="1"><one spam="1" /><one spam="2" /></foo>',
+        '<foo id="1"><one /></foo>',
+        '<foo id="1"><child spam="1" /><child /></foo>',
+        '<foo id="1"><item spam="1" /><item /></foo>',
+        '<foo id="1"><text><bar /></text></foo>',
+        '<foo id="1"><!-- comment --></foo>',
+        '<foo id="1"><?pi ?></foo>',
+        '<foo id="1"><text><!-- comment --></text></foo>',
+    ],
+)
+def test_check_same_as_load(xml):
+    assert_same_as_load(Foo, xml)
+
+
+@pytest.mark.parametrize(
+    "xml",
+    [
+        '<foo id="1" lang="en"><bar /><!-- comment --><?pi ?></foo>',
+        '<foo id="1"><text>a<!-- comment -->b</text></foo>',
+        '<foo id="1"><text><?pi ?></text></foo>',
+    ],
+)
+def test_check_same_as_load_options(xml):
+    options = Options(
+        ignore_unknown_attributes=True,
+        ignore_unknown_children=True,
+        ignore_comments=True,
+        ignore_processing_instructions=True,
+    )
+    assert_same_as_load(Foo, xml, options=options)
+
+
+@pytest.mark.parametrize(
+    "xml", ["<value>bar</value>", "<value />", "<value><!-- a -->b</value>"]
+)
+def test_check_text_same_as_load(xml):
+    assert_same_as_load(Text, xml, options=Options(ignore_comments=True))
+
+
+@pytest.mark.parametrize(
+    "xml", ['<foo id="1" />', '<bar id="1" />', f'<foo xmlns="{NS}" id="1" />']
+)
+def test_check_name_same_as_load(xml):
+    assert_same_as_load(Foo, xml, "foo")
+
+
+def test_check_required_child_same_as_load():
+    @xml_dataclass
+    class Bar:
+        __ns__ = None
+        one: Child1
+
+    assert_same_as_load(Bar, "<bar />")
+    assert_same_as_load(Bar, '<bar><one spam="1" /></bar>')
+
+
+def test_check_doesnt_validate():
+    @xml_dataclass
+    class Validated:
+        __ns__ = None
+        id: str
+
+        def xml_validate(self) -> None:
+            raise ValueError("invalid")
+
+    el = etree.fromstring('<validated id="1" />')
+    assert check(Validated, el, "validated") is None
+    with pytest.raises(ValueError):
+        load(Validated, el, "validated")
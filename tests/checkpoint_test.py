@@ -0,0 +1,132 @@
+import gzip
+from io import BytesIO
+from typing import Optional
+
+import pytest
+
+from xml_dataclasses import iterload_checkpoints, text, xml_dataclass
+from xml_dataclasses.checkpoint import Checkpoint
+
+NS = "https://tobywf.com"
+
+
+@xml_dataclass
+class Record:
+    __ns__ = NS
+    id: Optional[str] = None
+    value: Optional[str] = text(default=None)
+
+
+DOC = f"""<?xml version="1.0" encoding="utf-8"?>
+<!-- <r:record id="comment" /> -->
+<r:records xmlns:r="{NS}">
+  <r:header><r:record id="nested" /></r:header>
+  <r:record id="a" />
+  text
+  <!-- comment --><r:record id="b"><![CDATA[</r:record>]]></r:record>
+  <r:record id="c">&lt;c&gt;</r:record>
+  <r:record id="d">☃</r:record>
+</r:records>
+""".encode(
+    "utf-8"
+)
+EXPECTED = [
+    Record("a"),
+    Record("b", "</r:record>"),
+    Record("c", "<c>"),
+    Record("d", "☃"),
+]
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 2**20])
+def test_iterload_checkpoints(monkeypatch, read_size):
+    monkeypatch.setattr("xml_dataclasses.checkpoint._READ_SIZE", read_size)
+    loaded = list(iterload_checkpoints(Record, BytesIO(DOC), "record"))
+    assert [record for record, _ in loaded] == EXPECTED
+    for record, checkpoint in loaded:
+        assert checkpoint.root == b"r:records"
+        assert checkpoint.context.endswith(f'<r:records xmlns:r="{NS}">'.encode())
+        assert DOC[: checkpoint.offset].endswith(b"</r:record>") or record.id == "a"
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 2**20])
+def test_iterload_checkpoints_resume(monkeypatch, read_size):
+    monkeypatch.setattr("xml_dataclasses.checkpoint._READ_SIZE", read_size)
+    checkpoints = [cp for _, cp in iterload_checkpoints(Record, BytesIO(DOC), "record")]
+    for i, checkpoint in enumerate(checkpoints):
+        resumed = iterload_checkpoints(
+            Record, BytesIO(DOC), "record", checkpoint=checkpoint
+        )
+        assert [record for record, _ in resumed] == EXPECTED[i + 1 :]
+
+
+def test_iterload_checkpoints_gzip(tmp_path):
+    path = tmp_path / "records.xml.gz"
+    path.write_bytes(gzip.compress(DOC))
+    loaded = list(iterload_checkpoints(Record, path, "record"))
+    assert [record for record, _ in loaded] == EXPECTED
+    # the offsets are in the uncompressed document
+    checkpoint = loaded[1][1]
+    resumed = iterload_checkpoints(Record, path, "record", checkpoint=checkpoint)
+    assert [record for record, _ in resumed] == EXPECTED[2:]
+
+
+def test_iterload_checkpoints_other_names():
+    doc = (
+        b'<records xmlns="https://tobywf.com">'
+        b'<other id="1" /><record id="2" /><recordx id="3">x</recordx>'
+        b"</records>"
+    )
+    loaded = list(iterload_checkpoints(Record, BytesIO(doc), "record"))
+    assert [record for record, _ in loaded] == [Record("2")]
+    assert loaded[0][1].offset == doc.index(b"<recordx")
+
+
+def test_iterload_checkpoints_empty_root():
+    assert not list(iterload_checkpoints(Record, BytesIO(b"<records />"), "record"))
+    assert not list(iterload_checkpoints(Record, BytesIO(b"<records></records>"), "r"))
+
+
+@pytest.mark.parametrize(
+    "doc",
+    [
+        b'<records xmlns="https://tobywf.com"><record id="1" />',
+        b'<records xmlns="https://tobywf.com"><record id="1" /><record>',
+        b'<records xmlns="https://tobywf.com"><record id="1" /><rec',
+    ],
+)
+def test_iterload_checkpoints_not_closed(doc):
+    loaded = iterload_checkpoints(Record, BytesIO(doc), "record")
+    assert next(loaded)[0] == Record("1")
+    with pytest.raises(ValueError) as exc_info:
+        next(loaded)
+
+    assert str(exc_info.value) == "Root element 'records' not closed"
+
+
+@pytest.mark.parametrize("doc", [b"", b"<records"])
+def test_iterload_checkpoints_no_root(doc):
+    with pytest.raises(ValueError) as exc_info:
+        list(iterload_checkpoints(Record, BytesIO(doc), "record"))
+
+    assert "No root element found" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("cls", [None, object, dict])
+def test_iterload_checkpoints_not_xml_dataclass(cls):
+    with pytest.raises(ValueError) as exc_info:
+        list(iterload_checkpoints(cls, BytesIO(DOC), "record"))
+
+    assert repr(cls) in str(exc_info.value)
+
+
+def test_checkpoint_write_read(tmp_path):
+    path = tmp_path / "records.checkpoint"
+    _, checkpoint = next(iterload_checkpoints(Record, BytesIO(DOC), "record"))
+    checkpoint.write(path)
+    assert Checkpoint.read(path) == checkpoint
+    assert [p.name for p in tmp_path.iterdir()] == ["records.checkpoint"]
+    # a newer checkpoint replaces the old one
+    checkpoint = Checkpoint(b"<r>", b"r", 3)
+    checkpoint.write(path)
+    assert Checkpoint.read(path) == checkpoint
@@ -0,0 +1,239 @@
+from copy import deepcopy
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple, Union
+
+import pytest
+from lxml import etree
+
+# test public exports
+from xml_dataclasses import (
+    clone,
+    dump,
+    ignored,
+    index_by,
+    load,
+    rename,
+    text,
+    tracked,
+    xml_dataclass,
+)
+from xml_dataclasses.clone import is_immutable
+from xml_dataclasses.tracking import TrackedList
+
+NS = "https://tobywf.com"
+
+
+@xml_dataclass
+class Text:
+    __ns__ = NS
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Leaf:
+    __ns__ = NS
+    id: str
+    lang: Optional[str] = rename(default=None, name="lang", ns="urn:attr")
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class Frozen:
+    __ns__ = NS
+    id: str
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenBranch:
+    __ns__ = NS
+    frozen: Frozen
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenList:
+    __ns__ = NS
+    frozen: List[Frozen]
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenTuple:
+    __ns__ = NS
+    frozen: Tuple[Frozen, ...]
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenMutableChild:
+    __ns__ = NS
+    leaf: Leaf
+
+
+@xml_dataclass
+class Root:
+    __ns__ = NS
+    leaf: List[Union[Leaf, Text]]
+    text: Optional[Text] = None
+    branch: Optional[FrozenBranch] = None
+    frozen_list: Optional[FrozenList] = None
+    more: Optional[List[Leaf]] = index_by("id", default=None)
+
+
+def make_root():
+    root = Root(
+        leaf=[Leaf("1"), Text("☃"), Leaf("2", "en"), Text()],
+        text=Text("1"),
+        branch=FrozenBranch(Frozen("frozen")),
+        frozen_list=FrozenList([Frozen("a")]),
+        more=[Leaf("3")],
+    )
+    root.__nsmap__ = {None: NS}
+    root.leaf[0].__nsmap__ = {"t": NS}
+    return root
+
+
+@pytest.mark.parametrize(
+    "inst",
+    [None, object(), "", 0, dataclass(type("Foo", (), {}))()],
+)
+def test_clone_not_xml_dataclass(inst):
+    with pytest.raises(ValueError) as exc_info:
+        clone(inst)
+
+    assert repr(type(inst)) in str(exc_info.value)
+
+
+def test_clone():
+    root = make_root()
+    cloned = clone(root)
+    assert cloned == root == deepcopy(root)
+    assert cloned is not root
+    assert cloned.leaf is not root.leaf
+    assert all(c is not o for c, o in zip(cloned.leaf, root.leaf))
+    assert cloned.branch is not root.branch
+    assert cloned.branch.frozen is not root.branch.frozen
+    # strings and namespace maps are shared
+    assert cloned.leaf[1].value is root.leaf[1].value
+    assert cloned.__nsmap__ is root.__nsmap__
+    assert cloned.leaf[0].__nsmap__ == {"t": NS}
+    assert cloned.leaf[2].__nsmap__ is None
+    assert cloned.branch.__nsmap__ is None
+    assert clone(Root(leaf=[])) == Root(leaf=[])
+
+
+def test_clone_independent():
+    root = make_root()
+    cloned = clone(root)
+    cloned.leaf.append(Leaf("4"))
+    cloned.leaf[0].id = "changed"
+    cloned.text = None
+    assert root == make_root()
+
+
+def test_clone_share_frozen():
+    root = make_root()
+    cloned = clone(root, share_frozen=True)
+    assert cloned == root
+    assert cloned.branch is root.branch
+    # frozen instances with lists can still be changed
+    assert cloned.frozen_list is not root.frozen_list
+    assert cloned.frozen_list.frozen[0] is root.frozen_list.frozen[0]
+    assert cloned.leaf[0] is not root.leaf[0]
+
+
+def test_clone_frozen_root():
+    branch = FrozenBranch(Frozen("frozen"))
+    assert clone(branch) is not branch
+    assert clone(branch) == branch
+    assert clone(branch, share_frozen=True).frozen is branch.frozen
+
+
+def test_is_immutable():
+    assert is_immutable(Frozen)
+    assert is_immutable(FrozenBranch)
+    assert not is_immutable(FrozenList)
+    assert is_immutable(FrozenTuple)
+    assert not is_immutable(FrozenMutableChild)
+    assert not is_immutable(Leaf)
+    assert not is_immutable(Root)
+
+
+def test_clone_index():
+    root = make_root()
+    assert root.more_by_id("3") is root.more[0]
+    cloned = clone(root)
+    assert cloned.more_by_id("3") is cloned.more[0]
+
+
+def test_clone_ignored_fields():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        id: str
+        _parsed: List[int] = ignored()
+        _unset: List[int] = ignored()
+
+        def xml_validate(self) -> None:
+            self._parsed = [int(self.id)]
+
+    foo = load(Foo, etree.fromstring('<foo id="1" />'), "foo")
+    cloned = clone(foo)
+    assert cloned._parsed == [1]
+    assert cloned._parsed is not foo._parsed
+    assert not hasattr(cloned, "_unset")
+
+
+def test_clone_frozen_ignored_not_immutable():
+    @xml_dataclass
+    @dataclass(frozen=True)
+    class Foo:
+        __ns__ = None
+        id: str
+        _parsed: List[int] = field(init=False, compare=False, default_factory=list)
+
+    assert not is_immutable(Foo)
+
+
+def test_clone_invalid_child():
+    with pytest.raises(ValueError) as exc_info:
+        clone(Root(leaf=[Frozen("1")]))
+
+    assert repr(Frozen) in str(exc_info.value)
+
+
+@tracked
+@xml_dataclass
+class TrackedLeaf:
+    __ns__ = None
+    value: str
+
+
+@tracked
+@xml_dataclass
+class TrackedBranch:
+    __ns__ = None
+    leaf: List[TrackedLeaf]
+
+
+def test_clone_tracked():
+    branch = TrackedBranch(leaf=[TrackedLeaf("a")])
+    dump(branch, "branch", None)
+    cloned = clone(branch)
+    assert cloned == branch
+    assert "__xml_fragment__" not in cloned.__dict__
+    assert isinstance(cloned.leaf, TrackedList)
+    dump(cloned, "branch", None)
+    cloned.leaf[0].value = "b"
+    assert dump(cloned, "branch", None)[0].get("value") == "b"
+    assert dump(branch, "branch", None)[0].get("value") == "a"
+
+
+def test_clone_tuple():
+    frozen = FrozenTuple((Frozen("1"), Frozen("2")))
+    cloned = clone(frozen)
+    assert cloned == frozen
+    assert isinstance(cloned.frozen, tuple)
+    assert cloned.frozen[0] is not frozen.frozen[0]
+    assert clone(frozen, share_frozen=True).frozen[0] is frozen.frozen[0]
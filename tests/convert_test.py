@@ -0,0 +1,194 @@
+import json
+from dataclasses import asdict, dataclass
+from io import StringIO
+from typing import List, Optional, Tuple, Union
+
+import pytest
+
+# test public exports
+from xml_dataclasses import (
+    dump_json,
+    dumps_json,
+    from_dict,
+    index_by,
+    rename,
+    text,
+    to_dict,
+    xml_dataclass,
+)
+
+NS = "https://tobywf.com"
+
+
+@xml_dataclass
+class Text:
+    __ns__ = NS
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Leaf:
+    __ns__ = NS
+    id: str
+    lang: Optional[str] = rename(default=None, name="lang", ns="urn:attr")
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class Frozen:
+    __ns__ = NS
+    id: str
+
+
+@xml_dataclass
+class Empty:
+    __ns__ = NS
+
+
+@xml_dataclass
+class Root:
+    __ns__ = NS
+    leaf: List[Union[Leaf, Text]]
+    text: Optional[Text] = None
+    frozen: Optional[Frozen] = None
+    empty: Optional[Empty] = None
+    more: Optional[List[Leaf]] = index_by("id", default=None)
+
+
+def make_root():
+    return Root(
+        leaf=[Leaf("1"), Text('☃ "𝄞"\n'), Leaf("2", "en"), Text(""), Text()],
+        text=Text("1"),
+        frozen=Frozen("frozen"),
+        empty=Empty(),
+        more=[Leaf("3")],
+    )
+
+
+@pytest.mark.parametrize(
+    "inst",
+    [None, object(), "", 0, dataclass(type("Foo", (), {}))()],
+)
+@pytest.mark.parametrize("func", [to_dict, dumps_json])
+def test_to_dict_not_xml_dataclass(func, inst):
+    with pytest.raises(ValueError) as exc_info:
+        func(inst)
+
+    assert repr(type(inst)) in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [None, object, str, int, dataclass(type("Foo", (), {}))],
+)
+def test_from_dict_not_xml_dataclass(cls):
+    with pytest.raises(ValueError) as exc_info:
+        from_dict(cls, {})
+
+    assert repr(cls) in str(exc_info.value)
+
+
+def test_to_dict_same_as_asdict():
+    root = make_root()
+    data = to_dict(root)
+    assert data == asdict(root)
+    # strings are shared, not copied
+    assert data["frozen"]["id"] is root.frozen.id
+
+
+def test_from_dict_roundtrip():
+    root = make_root()
+    restored = from_dict(Root, to_dict(root))
+    assert restored == root
+    assert restored.__nsmap__ is None
+    assert restored.more_by_id("3") is restored.more[0]
+    assert isinstance(restored.leaf[3], Text)
+
+
+def test_from_dict_defaults():
+    assert from_dict(Root, {"leaf": []}) == Root(leaf=[])
+    assert from_dict(Root, {"leaf": [], "text": None}) == Root(leaf=[])
+    assert from_dict(Leaf, {"id": "1"}) == Leaf("1")
+    assert from_dict(Leaf, {"id": "1", "lang": None}) == Leaf("1")
+
+
+def test_from_dict_validates():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        id: str
+
+        def xml_validate(self) -> None:
+            if self.id == "invalid":
+                raise ValueError("invalid")
+
+    with pytest.raises(ValueError) as exc_info:
+        from_dict(Foo, {"id": "invalid"})
+
+    assert str(exc_info.value) == "invalid"
+
+
+@pytest.mark.parametrize(
+    "cls,data,msg",
+    [
+        (Leaf, [], "is not a dict"),
+        (Leaf, {}, "Required field 'id'"),
+        (Leaf, {"id": 1}, "'1' is not a string"),
+        (Leaf, {"id": "1", "foo": "bar"}, "undeclared fields for 'Leaf': 'foo'"),
+        (Root, {}, "Required field 'leaf'"),
+        (Root, {"leaf": {}}, "for 'leaf' is not a list"),
+        (Root, {"leaf": [], "frozen": {}}, "Required field 'id'"),
+        (Root, {"leaf": [{"foo": "bar"}]}, "Invalid value found for 'leaf'"),
+    ],
+)
+def test_from_dict_invalid(cls, data, msg):
+    with pytest.raises(ValueError) as exc_info:
+        from_dict(cls, data)
+
+    assert msg in str(exc_info.value)
+
+
+def test_to_dict_invalid_child():
+    with pytest.raises(ValueError) as exc_info:
+        to_dict(Root(leaf=[Frozen("1")]))
+
+    assert repr(Frozen) in str(exc_info.value)
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_dump_json_same_as_json_dumps(ensure_ascii):
+    root = make_root()
+    buf = StringIO()
+    dump_json(root, buf, ensure_ascii)
+    assert buf.getvalue() == json.dumps(to_dict(root), ensure_ascii=ensure_ascii)
+    assert dumps_json(root, ensure_ascii) == buf.getvalue()
+    assert dumps_json(Root(leaf=[])) == json.dumps(to_dict(Root(leaf=[])))
+
+
+def test_dump_json_invalid():
+    with pytest.raises(ValueError) as exc_info:
+        dumps_json(Root(leaf=[Frozen("1")]))
+
+    assert repr(Frozen) in str(exc_info.value)
+
+    with pytest.raises(ValueError) as exc_info:
+        dumps_json(Leaf(id=1))
+
+    assert "'1' is not a string" in str(exc_info.value)
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenTuple:
+    __ns__ = NS
+    frozen: Tuple[Frozen, ...]
+
+
+def test_convert_tuple():
+    frozen = FrozenTuple((Frozen("1"), Frozen("2")))
+    data = to_dict(frozen)
+    assert data == {"frozen": [{"id": "1"}, {"id": "2"}]}
+    assert dumps_json(frozen) == json.dumps(data)
+    restored = from_dict(FrozenTuple, data)
+    assert restored == frozen
+    assert isinstance(restored.frozen, tuple)
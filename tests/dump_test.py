@@ -5,7 +5,7 @@ import pytest
 from lxml import etree
 
 # test public exports
-from xml_dataclasses import dump, text, xml_dataclass
+from xml_dataclasses import dump, dump_into, rename, text, xml_dataclass
 
 NS = "https://tobywf.com"
 NSMAP = {None: NS}
@@ -343,3 +343,103 @@ def test_dump_children_union_multiple():
     el = dump(foo, "foo", None)
     xml = etree.tostring(el, encoding="unicode")
     assert xml == '<foo><bar spam="eggs"/><bar wibble="wobble"/></foo>'
+
+
+@xml_dataclass
+class NsChild:
+    __ns__ = "urn:child"
+    id: str
+    lang: Optional[str] = rename(default=None, ns="urn:attr")
+
+
+@xml_dataclass
+class NsText:
+    __ns__ = NS
+    value: str = text()
+
+
+@xml_dataclass
+class NsParent:
+    __ns__ = NS
+    child: List[NsChild]
+    text: Optional[NsText] = None
+
+
+def test_dump_hoist_namespaces():
+    first = NsChild(id="1", lang="en")
+    second = NsChild(id="2")
+    # e.g. loaded from different documents
+    first.__nsmap__ = {"c": "urn:child", "a": "urn:attr"}
+    second.__nsmap__ = {"child": "urn:child"}
+    parent = NsParent(child=[first, second], text=NsText("foo"))
+
+    el = dump(parent, "parent", {None: NS, "c": "urn:child"}, hoist_namespaces=True)
+    assert el.nsmap == {None: NS, "c": "urn:child", "ns0": "urn:attr"}
+    xml = etree.tostring(el, encoding="unicode")
+    assert xml == (
+        '<parent xmlns="https://tobywf.com" xmlns:c="urn:child" xmlns:ns0="urn:attr">'
+        '<c:child id="1" ns0:lang="en"/><c:child id="2"/><text>foo</text>'
+        "</parent>"
+    )
+
+
+def test_dump_hoist_namespaces_implicit():
+    parent = NsParent(child=[])
+    parent.__nsmap__ = {"p": NS}
+    el = dump(parent, "parent", None, hoist_namespaces=True)
+    assert el.nsmap == {"p": NS, "ns0": "urn:child", "ns1": "urn:attr"}
+
+
+def test_dump_hoist_namespaces_child_not_xml_dataclass():
+    with pytest.raises(ValueError) as exc_info:
+        dump(NsParent(child=[object()]), "parent", None, hoist_namespaces=True)
+
+    assert repr(object) in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "inst",
+    [None, object(), "", 0, dataclass(type("Foo", (), {}))],
+)
+def test_dump_into_not_xml_dataclass(inst):
+    parent = etree.Element("parent")
+    with pytest.raises(ValueError) as exc_info:
+        dump_into(inst, parent, "foo")
+
+    assert repr(type(inst)) in str(exc_info.value)
+    assert len(parent) == 0
+
+
+def test_dump_into_reuses_parent_namespaces():
+    root = etree.Element("{urn:root}root", nsmap={"r": "urn:root", "c": "urn:child"})
+    wrapper = etree.SubElement(root, "{https://tobywf.com}wrapper", nsmap={None: NS})
+    first = NsChild(id="1", lang="en")
+    # the namespace is in scope with a different prefix
+    first.__nsmap__ = {"child": "urn:child"}
+    parent = NsParent(child=[first, NsChild(id="2")], text=NsText("foo"))
+
+    el = dump_into(parent, wrapper, "parent")
+    assert el.getparent() is wrapper
+    assert el.nsmap == {"r": "urn:root", "c": "urn:child", None: NS, "ns0": "urn:attr"}
+    xml = etree.tostring(root, encoding="unicode")
+    assert xml == (
+        '<r:root xmlns:r="urn:root" xmlns:c="urn:child">'
+        '<wrapper xmlns="https://tobywf.com">'
+        '<parent xmlns:ns0="urn:attr">'
+        '<c:child id="1" ns0:lang="en"/><c:child id="2"/><text>foo</text>'
+        "</parent>"
+        "</wrapper>"
+        "</r:root>"
+    )
+
+
+def test_dump_into_nsmap():
+    root = etree.Element("root", nsmap={"ns0": "urn:other"})
+    el = dump_into(NsChild(id="1", lang="en"), root, "child", {"a": "urn:attr"})
+    xml = etree.tostring(root, encoding="unicode")
+    assert el.getparent() is root
+    assert xml == (
+        '<root xmlns:ns0="urn:other">'
+        '<ns1:child xmlns:a="urn:attr" xmlns:ns1="urn:child" id="1" a:lang="en"/>'
+        "</root>"
+    )
@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import List, Optional
+
+import pytest
+from lxml import etree
+
+# test public exports
+from xml_dataclasses import dump, dump_to, dumps, rename, text, xml_dataclass
+
+NS = "https://tobywf.com"
+NSMAP = {None: NS}
+XML_NS = "http://www.w3.org/XML/1998/namespace"
+
+
+@xml_dataclass
+class Leaf:
+    __ns__ = NS
+    id: Optional[str] = None
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Other:
+    __ns__ = "urn:other"
+    lang: Optional[str] = rename(default=None, ns=XML_NS)
+
+
+@xml_dataclass
+class Root:
+    __ns__ = NS
+    leaf: List[Leaf]
+    other: Optional[Other] = None
+    empty: Optional[Leaf] = None
+
+
+def c14n(el):
+    return etree.tostring(el, method="c14n")
+
+
+@pytest.mark.parametrize(
+    "inst",
+    [None, object(), "", 0, dataclass(type("Foo", (), {}))],
+)
+def test_dumps_not_xml_dataclass(inst):
+    with pytest.raises(ValueError) as exc_info:
+        dumps(inst, "foo", NSMAP)
+
+    assert repr(type(inst)) in str(exc_info.value)
+
+
+def test_dumps_child_not_xml_dataclass():
+    with pytest.raises(ValueError) as exc_info:
+        dumps(Root(leaf=[object()]), "root", NSMAP)
+
+    assert repr(object) in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "inst",
+    [
+        Root(leaf=[]),
+        Root(leaf=[Leaf(), Leaf("1"), Leaf(value="a & <b>")]),
+        Root(leaf=[Leaf("1", "☃")], other=Other("en")),
+        Root(leaf=[], other=Other(), empty=Leaf()),
+    ],
+)
+def test_dumps_same_as_dump(inst):
+    el = dump(inst, "root", NSMAP)
+    assert c14n(etree.fromstring(dumps(inst, "root", NSMAP))) == c14n(el)
+
+
+def test_dumps_declares_namespaces_once():
+    inst = Root(leaf=[Leaf("1"), Leaf("2")], other=Other("en"))
+    assert dumps(inst, "root", NSMAP) == (
+        b'<root xmlns="https://tobywf.com">'
+        b'<leaf id="1"/><leaf id="2"/>'
+        b'<ns0:other xmlns:ns0="urn:other" xml:lang="en"></ns0:other>'
+        b"</root>"
+    )
+
+
+def test_dumps_declares_changed_namespaces():
+    leaf = Leaf("1")
+    # e.g. loaded from a document with more namespaces
+    leaf.__nsmap__ = {None: NS, "o": "urn:other", "xml": XML_NS}
+    inst = Root(leaf=[leaf, Leaf("2")], other=Other())
+    assert dumps(inst, "root", {None: NS, "o": "urn:other"}) == (
+        b'<root xmlns="https://tobywf.com" xmlns:o="urn:other">'
+        b'<leaf id="1"/><leaf id="2"/><o:other/>'
+        b"</root>"
+    )
+
+    leaf.__nsmap__ = {None: NS, "o": "urn:o2"}
+    assert dumps(Root(leaf=[leaf]), "root", {None: NS, "o": "urn:other"}) == (
+        b'<root xmlns="https://tobywf.com" xmlns:o="urn:other">'
+        b'<leaf xmlns:o="urn:o2" id="1"/>'
+        b"</root>"
+    )
+
+
+def test_dumps_leaf_namespaces():
+    @xml_dataclass
+    class Qualified:
+        __ns__ = NS
+        id: Optional[str] = rename(default=None, ns="urn:attr")
+        value: Optional[str] = text(default=None)
+
+    # leaves are only self-closing if their namespaces are in scope
+    assert dumps(Qualified("1"), "q", NSMAP) == (
+        b'<q xmlns="https://tobywf.com" xmlns:ns0="urn:attr" ns0:id="1"></q>'
+    )
+    assert dumps(Qualified("1"), "q", {None: NS, "a": "urn:attr"}) == (
+        b'<q xmlns="https://tobywf.com" xmlns:a="urn:attr" a:id="1"/>'
+    )
+
+
+def test_dumps_pretty_print():
+    inst = Root(leaf=[Leaf("1", "a"), Leaf("2")], other=Other())
+    assert dumps(inst, "root", NSMAP, pretty_print=True) == (
+        b'<root xmlns="https://tobywf.com">\n'
+        b'  <leaf id="1">a</leaf>\n'
+        b'  <leaf id="2"/>\n'
+        b'  <ns0:other xmlns:ns0="urn:other"></ns0:other>\n'
+        b"</root>"
+    )
+    assert dumps(Root(leaf=[]), "root", NSMAP, pretty_print=True) == (
+        b'<root xmlns="https://tobywf.com"/>'
+    )
+
+
+def test_dumps_xml_declaration():
+    assert dumps(Leaf(), "leaf", NSMAP, "ascii", xml_declaration=True) == (
+        b"<?xml version='1.0' encoding='ascii'?>\n"
+        b'<leaf xmlns="https://tobywf.com"/>'
+    )
+
+
+def test_dumps_encoding():
+    assert dumps(Leaf(value="☃"), "leaf", NSMAP, "ascii") == (
+        b'<leaf xmlns="https://tobywf.com">&#9731;</leaf>'
+    )
+
+
+@pytest.mark.parametrize("encoding", ["unicode", str])
+def test_dumps_unicode(encoding):
+    assert dumps(Leaf(value="☃"), "leaf", NSMAP, encoding) == (
+        '<leaf xmlns="https://tobywf.com">☃</leaf>'
+    )
+
+    with pytest.raises(ValueError):
+        dumps(Leaf(), "leaf", NSMAP, encoding, xml_declaration=True)
+
+
+def test_dump_to_reused_buffer():
+    buf = BytesIO()
+    for i in range(2):
+        buf.seek(0)
+        buf.truncate()
+        dump_to(Leaf(str(i)), buf, "leaf", NSMAP)
+        assert buf.getvalue() == f'<leaf xmlns="{NS}" id="{i}"/>'.encode()
+
+
+def test_dumps_hoist_namespaces():
+    leaf = Leaf("1")
+    leaf.__nsmap__ = {None: NS, "o": "urn:o2"}
+    inst = Root(leaf=[leaf], other=Other("en"))
+    assert dumps(inst, "root", NSMAP, hoist_namespaces=True) == (
+        b'<root xmlns="https://tobywf.com" xmlns:ns0="urn:other">'
+        b'<leaf id="1"/><ns0:other xml:lang="en"/>'
+        b"</root>"
+    )
+    assert c14n(
+        etree.fromstring(dumps(inst, "root", NSMAP, hoist_namespaces=True))
+    ) == (c14n(dump(inst, "root", NSMAP, hoist_namespaces=True)))
@@ -0,0 +1,240 @@
+import bz2
+import gzip
+import lzma
+from io import BytesIO
+from typing import List, Optional
+
+import pytest
+from lxml import etree
+
+# test public exports
+from xml_dataclasses import (
+    dump_file,
+    iterload,
+    load_file,
+    load_file_any,
+    text,
+    xml_dataclass,
+)
+from xml_dataclasses.files import detect_compression, open_source, open_target
+
+NS = "https://tobywf.com"
+COMPRESS = {
+    None: lambda data: data,
+    "gzip": gzip.compress,
+    "bz2": bz2.compress,
+    "xz": lzma.compress,
+}
+
+
+@xml_dataclass
+class Record:
+    __ns__ = NS
+    id: str
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Records:
+    __ns__ = NS
+    record: List[Record]
+
+
+def make_doc(count):
+    records = "".join(f'<record id="{i}">{i}</record>' for i in range(count))
+    return f'<records xmlns="{NS}">{records}</records>'.encode("utf-8")
+
+
+class Unseekable:
+    def __init__(self, data):
+        self.f = BytesIO(data)
+
+    def read(self, size=-1):
+        return self.f.read(size)
+
+    def seekable(self):
+        return False
+
+
+@pytest.mark.parametrize("compression", list(COMPRESS))
+def test_detect_compression(compression):
+    assert detect_compression(COMPRESS[compression](b"<foo />")) == compression
+
+
+@pytest.mark.parametrize("compression", list(COMPRESS))
+def test_open_source_file_object(compression):
+    data = make_doc(3)
+    with open_source(BytesIO(COMPRESS[compression](data))) as f:
+        assert f.read() == data
+
+
+@pytest.mark.parametrize("compression", list(COMPRESS))
+def test_open_source_unseekable(compression):
+    data = make_doc(3)
+    with open_source(Unseekable(COMPRESS[compression](data))) as f:
+        assert f.read() == data
+
+
+def test_open_source_peek(tmp_path):
+    data = make_doc(3)
+    path = tmp_path / "records.xml"
+    path.write_bytes(gzip.compress(data))
+    with open(path, "rb") as raw, open_source(raw) as f:
+        assert f.read() == data
+        assert not raw.closed
+
+
+@pytest.mark.parametrize("compression", list(COMPRESS))
+def test_open_source_path(tmp_path, compression):
+    data = make_doc(3)
+    # detection doesn't depend on the file name
+    path = tmp_path / "records"
+    path.write_bytes(COMPRESS[compression](data))
+    with open_source(path) as f:
+        assert f.read() == data
+    with open_source(str(path)) as f:
+        assert f.read() == data
+
+
+@pytest.mark.parametrize(
+    "suffix,compression",
+    [(".xml", None), (".xml.gz", "gzip"), (".xml.bz2", "bz2"), (".XML.XZ", "xz")],
+)
+def test_open_target_suffix(tmp_path, suffix, compression):
+    path = tmp_path / f"records{suffix}"
+    with open_target(path) as f:
+        f.write(b"<foo />")
+    data = path.read_bytes()
+    assert detect_compression(data) == compression
+    with open_source(path) as f:
+        assert f.read() == b"<foo />"
+
+
+def test_open_target_explicit(tmp_path):
+    path = tmp_path / "records.xml.gz"
+    with open_target(path, "xz") as f:
+        f.write(b"<foo />")
+    assert detect_compression(path.read_bytes()) == "xz"
+
+
+def test_open_target_file_object():
+    buf = BytesIO()
+    with open_target(buf, "bz2") as f:
+        f.write(b"<foo />")
+    assert not buf.closed
+    assert bz2.decompress(buf.getvalue()) == b"<foo />"
+
+
+def test_open_target_unknown_compression(tmp_path):
+    with pytest.raises(ValueError) as exc_info:
+        with open_target(tmp_path / "records.xml", "zip"):
+            pass
+
+    assert "zip" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("compression", list(COMPRESS))
+def test_load_file(compression):
+    source = BytesIO(COMPRESS[compression](make_doc(2)))
+    records = load_file(Records, source, "records")
+    assert records == Records(record=[Record("0", "0"), Record("1", "1")])
+
+
+def test_load_file_parser(tmp_path):
+    path = tmp_path / "records.xml.gz"
+    path.write_bytes(gzip.compress(b"<!-- comment --><records>\n</records>"))
+
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+
+    parser = etree.XMLParser(remove_comments=True, remove_blank_text=True)
+    assert load_file(Foo, path, "records", parser=parser) == Foo()
+
+
+@pytest.mark.parametrize("compression", list(COMPRESS))
+def test_dump_file_roundtrip(tmp_path, compression):
+    records = Records(record=[Record("0", "a"), Record("1", None)])
+    path = tmp_path / "records.xml"
+    dump_file(records, path, "records", {None: NS}, compression)
+    data = path.read_bytes()
+    assert detect_compression(data) == compression
+    assert load_file(Records, path, "records") == records
+
+
+def test_dump_file_declaration():
+    buf = BytesIO()
+    dump_file(Record("0"), buf, "record", {None: NS}, encoding="ascii")
+    assert buf.getvalue() == (
+        b"<?xml version='1.0' encoding='ascii'?>\n"
+        b'<record xmlns="https://tobywf.com" id="0"/>'
+    )
+
+
+@pytest.mark.parametrize("compression", list(COMPRESS))
+def test_iterload_compressed(compression):
+    source = BytesIO(COMPRESS[compression](make_doc(3)))
+    records = [r.id for r in iterload(Record, source, "record")]
+    assert records == ["0", "1", "2"]
+
+
+def test_load_file_mmap(tmp_path, monkeypatch):
+    # force several chunks
+    monkeypatch.setattr("xml_dataclasses.files._FEED_SIZE", 7)
+    path = tmp_path / "records.xml"
+    path.write_bytes(make_doc(3))
+    expected = Records(record=[Record("0", "0"), Record("1", "1"), Record("2", "2")])
+    assert load_file(Records, path, "records", use_mmap=True) == expected
+    with open(path, "rb") as f:
+        assert load_file(Records, f, "records", use_mmap=True) == expected
+
+
+def test_load_file_mmap_parser(tmp_path):
+    path = tmp_path / "records.xml"
+    path.write_bytes(b"<!-- comment --><records>\n</records>")
+
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+
+    parser = etree.XMLParser(remove_comments=True, remove_blank_text=True)
+    assert load_file(Foo, path, "records", parser=parser, use_mmap=True) == Foo()
+
+
+def test_load_file_mmap_compressed(tmp_path):
+    path = tmp_path / "records.xml.gz"
+    path.write_bytes(gzip.compress(make_doc(1)))
+    with pytest.raises(ValueError) as exc_info:
+        load_file(Records, path, "records", use_mmap=True)
+
+    assert "compressed" in str(exc_info.value)
+
+
+@xml_dataclass
+class Document:
+    __ns__ = NS
+    __root__ = "document"
+    record: List[Record]
+
+
+@pytest.mark.parametrize("compression", list(COMPRESS))
+def test_load_file_any(compression):
+    doc = make_doc(2).replace(b"records", b"document")
+    source = BytesIO(COMPRESS[compression](doc))
+    expected = Document(record=[Record("0", "0"), Record("1", "1")])
+    assert load_file_any(source) == expected
+
+
+def test_load_file_any_mmap(tmp_path):
+    path = tmp_path / "document.xml"
+    path.write_bytes(make_doc(1).replace(b"records", b"document"))
+    parser = etree.XMLParser(remove_blank_text=True)
+    expected = Document(record=[Record("0", "0")])
+    assert load_file_any(path, parser=parser, use_mmap=True) == expected
+
+
+def test_load_file_any_not_registered():
+    with pytest.raises(ValueError) as exc_info:
+        load_file_any(BytesIO(make_doc(1)))
+
+    assert f"{{{NS}}}records" in str(exc_info.value)
@@ -1,11 +1,30 @@
+import pickle
 from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 import pytest
 from lxml import etree
 
 # test public exports
-from xml_dataclasses import Options, load, text, xml_dataclass
+from xml_dataclasses import Options, index_by, load, load_any, text, xml_dataclass
+from xml_dataclasses.exceptions import (
+    XmlChildElementsError,
+    XmlCommentsError,
+    XmlLoadError,
+    XmlLoadErrors,
+    XmlMultipleChildrenError,
+    XmlNameError,
+    XmlNamespaceError,
+    XmlNoTextError,
+    XmlProcessingInstructionsError,
+    XmlRequiredAttributeError,
+    XmlRequiredChildError,
+    XmlResourceLimitError,
+    XmlTextError,
+    XmlUndeclaredAttributesError,
+    XmlUndeclaredChildrenError,
+    XmlUnionError,
+)
 
 NS = "https://tobywf.com"
 
@@ -599,3 +618,588 @@ def test_load_with_text_comment_not_stripped():
 
     msg = str(exc_info.value)
     assert "Element 'foo' contains comments" in msg
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenMeta:
+    __ns__ = None
+    name: str
+    value: str = text()
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenRecord:
+    __ns__ = None
+    id: str
+    meta: List[FrozenMeta]
+
+
+@xml_dataclass
+class Records:
+    __ns__ = None
+    record: List[FrozenRecord]
+
+
+RECORDS = """<records>
+<record id="1"><meta name="lang">en</meta><meta name="type">book</meta></record>
+<record id="1"><meta name="lang">en</meta><meta name="type">book</meta></record>
+<record id="2"><meta name="lang">en</meta></record>
+</records>"""
+
+
+def test_load_frozen():
+    el = etree.fromstring('<meta name="lang">en</meta>')
+    meta = load(FrozenMeta, el, "meta")
+    assert meta == FrozenMeta(name="lang", value="en")
+    assert meta.__nsmap__ == {}
+
+
+def test_load_intern_not_enabled():
+    records = load(Records, etree.fromstring(RECORDS), "records")
+    first, second, third = records.record
+    assert first == second
+    assert first is not second
+    assert first.meta[0] is not third.meta[0]
+
+
+def test_load_intern_frozen_instances():
+    options = Options(intern_values=True)
+    records = load(Records, etree.fromstring(RECORDS), "records", options)
+    first, second, third = records.record
+    assert first is second
+    assert first.meta[0] is third.meta[0]
+    assert first.meta[0] is not first.meta[1]
+    assert first.__nsmap__ is third.__nsmap__
+    # interning doesn't change the loaded values
+    assert records == load(Records, etree.fromstring(RECORDS), "records")
+
+
+def test_load_intern_strings():
+    @xml_dataclass
+    class Meta:
+        __ns__ = None
+        name: str
+        value: str = text()
+
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        meta: List[Meta]
+
+    el = etree.fromstring(
+        '<foo><meta name="lang">en</meta><meta name="lang">en</meta></foo>'
+    )
+    foo = load(Foo, el, "foo", Options(intern_values=True))
+    first, second = foo.meta
+    # mutable instances are never shared, but their strings are
+    assert first is not second
+    assert first.name is second.name
+    assert first.value is second.value
+
+
+def test_load_intern_optional_values():
+    @xml_dataclass
+    @dataclass(frozen=True)
+    class Foo:
+        __ns__ = None
+        bar: Optional[str] = None
+        value: Optional[str] = text(default=None)
+
+    el = etree.fromstring("<foo />")
+    foo = load(Foo, el, "foo", Options(intern_values=True))
+    assert foo == Foo()
+
+
+def test_load_intern_table_shared():
+    table = {}
+    options = Options(intern_values=True, intern_table=table)
+    first = load(Records, etree.fromstring(RECORDS), "records", options)
+    second = load(Records, etree.fromstring(RECORDS), "records", options)
+    assert first is not second
+    assert first.record[0] is second.record[0]
+    assert options.intern_table is table
+    assert "en" in table
+
+
+def test_load_intern_table_ignored_if_not_enabled():
+    table = {}
+    load(Records, etree.fromstring(RECORDS), "records", Options(intern_table=table))
+    assert not table
+
+
+def test_load_intern_single_child():
+    @xml_dataclass
+    @dataclass(frozen=True)
+    class Foo:
+        __ns__ = None
+        meta: FrozenMeta
+
+    @xml_dataclass
+    class Bar:
+        __ns__ = None
+        foo: List[Foo]
+
+    el = etree.fromstring(
+        '<bar><foo><meta name="a">b</meta></foo><foo><meta name="a">b</meta></foo></bar>'
+    )
+    bar = load(Bar, el, "bar", Options(intern_values=True))
+    assert bar.foo[0] is bar.foo[1]
+
+
+@pytest.mark.parametrize("union", [False, True])
+def test_load_children_index_by(union):
+    @xml_dataclass
+    class Item:
+        __ns__ = None
+        id: str
+
+    @xml_dataclass
+    class Other:
+        __ns__ = None
+        id: str
+        value: str
+
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        item: List[Union[Other, Item] if union else Item] = index_by("id")
+
+    el = etree.fromstring('<foo><item id="a" /><item id="b" /><item id="a" /></foo>')
+    foo = load(Foo, el, "foo")
+    first, second, _ = foo.item
+    index = foo.__dict__["__xml_index_item__"][2]
+    assert index == {"a": 0, "b": 1}
+    assert foo.item_by_id("a") is first
+    assert foo.item_by_id("b") is second
+    # the index built during loading is used
+    assert foo.__dict__["__xml_index_item__"][2] is index
+
+
+def test_load_with_child_pi_not_stripped():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        bar: List[Child1]
+
+    el = etree.fromstring('<foo><?pi?><bar spam="eggs" /></foo>')
+
+    with pytest.raises(ValueError) as exc_info:
+        load(Foo, el, "foo")
+
+    msg = str(exc_info.value)
+    assert "Element 'foo' contains processing instructions" in msg
+
+
+def test_load_with_text_pi_not_stripped():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        value: str = text()
+
+    el = etree.fromstring("<foo>spam<?pi?>eggs</foo>")
+
+    with pytest.raises(ValueError) as exc_info:
+        load(Foo, el, "foo")
+
+    msg = str(exc_info.value)
+    assert "Element 'foo' contains processing instructions" in msg
+
+
+IGNORE_OPTIONS = [
+    Options(ignore_comments=True, ignore_processing_instructions=True),
+    Options(ignore_comments=True),
+    Options(ignore_processing_instructions=True),
+]
+
+
+@pytest.mark.parametrize("options", IGNORE_OPTIONS)
+def test_load_with_child_ignored(options):
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        bar: List[Child1]
+
+    comment = "<!-- comment -->" if options.ignore_comments else ""
+    pi = "<?pi?>" if options.ignore_processing_instructions else ""
+    el = etree.fromstring(
+        f"""<foo>
+    {comment}{pi}
+    <bar spam="eggs" />{comment}
+    <bar spam="ham" />{pi}
+</foo>"""
+    )
+
+    foo = load(Foo, el, "foo", options)
+    assert foo == Foo(bar=[Child1(spam="eggs"), Child1(spam="ham")])
+
+
+@pytest.mark.parametrize("options", IGNORE_OPTIONS)
+def test_load_with_text_ignored(options):
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        value: Optional[str] = text(default=None)
+
+    comment = "<!-- comment -->" if options.ignore_comments else ""
+    pi = "<?pi?>" if options.ignore_processing_instructions else ""
+    el = etree.fromstring(f"<foo>{comment}spam{pi}{comment}eggs{pi}</foo>")
+    foo = load(Foo, el, "foo", options)
+    assert foo.value == "spameggs"
+
+    el = etree.fromstring(f"<foo>{comment}{pi}</foo>")
+    foo = load(Foo, el, "foo", options)
+    assert foo.value is None
+
+
+def test_load_with_text_ignored_child_element():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        value: str = text()
+
+    el = etree.fromstring("<foo>spam<!-- comment --><bar /></foo>")
+    with pytest.raises(ValueError) as exc_info:
+        load(Foo, el, "foo", Options(ignore_comments=True))
+
+    msg = str(exc_info.value)
+    assert "Element 'foo' has child elements (expected text only)" in msg
+
+
+@xml_dataclass
+class Registered:
+    __ns__ = NS
+    __root__ = "registered"
+    id: str
+
+
+def test_load_any():
+    el = etree.fromstring(f'<registered xmlns="{NS}" id="1" />')
+    assert load_any(el) == Registered("1")
+
+
+def test_load_any_options():
+    el = etree.fromstring(f'<registered xmlns="{NS}" id="1" foo="bar" />')
+    with pytest.raises(ValueError):
+        load_any(el)
+    assert load_any(el, Options(ignore_unknown_attributes=True)) == Registered("1")
+
+
+def test_load_any_not_registered():
+    el = etree.fromstring('<registered id="1" />')
+    with pytest.raises(ValueError) as exc_info:
+        load_any(el)
+
+    assert "'registered'" in str(exc_info.value)
+
+
+@xml_dataclass
+class CollectText:
+    __ns__ = None
+    value: str = text()
+
+
+@xml_dataclass
+class CollectChild:
+    __ns__ = None
+    id: str
+
+
+@xml_dataclass
+class Collect:
+    __ns__ = None
+    id: str
+    text: CollectText
+    one: CollectChild
+    many: List[CollectChild] = index_by("id")
+    union: Optional[Union[Child1, Child2]] = None
+
+
+def test_load_error_structured():
+    el = etree.fromstring('<root><foo><bar foo="1" /></foo></root>')
+    with pytest.raises(XmlRequiredAttributeError) as exc_info:
+        load(CollectChild, el[0][0], options=Options(ignore_unknown_attributes=True))
+
+    error = exc_info.value
+    assert isinstance(error, ValueError)
+    assert isinstance(error, XmlLoadError)
+    assert error.el is el[0][0]
+    assert error.tag == "bar"
+    assert error.path == "foo/bar"
+    assert error.field == "id"
+    assert str(error) == "Required attribute 'id' not found on 'bar'"
+
+
+def test_load_error_pickle():
+    el = etree.fromstring("<collectchild />")
+    with pytest.raises(XmlLoadError) as exc_info:
+        load(CollectChild, el)
+
+    error = pickle.loads(pickle.dumps(exc_info.value))
+    assert type(error) is ValueError
+    assert str(error) == str(exc_info.value)
+
+    with pytest.raises(XmlLoadErrors) as exc_info:
+        load(CollectChild, el, options=Options(collect_errors=True))
+
+    errors = pickle.loads(pickle.dumps(exc_info.value))
+    assert type(errors) is ValueError
+    assert str(errors) == str(exc_info.value)
+
+
+def test_load_error_args():
+    el = etree.fromstring("<collectchild />")
+    with pytest.raises(XmlLoadError) as exc_info:
+        load(CollectChild, el)
+
+    error = exc_info.value
+    message = "Required attribute 'id' not found on 'collectchild'"
+    assert error.args == (message,)
+    assert repr(error) == f"XmlRequiredAttributeError({message!r})"
+    error.args = ("other",)
+    assert error.args == ("other",)
+
+    with pytest.raises(XmlLoadErrors) as exc_info:
+        load(CollectChild, el, options=Options(collect_errors=True))
+
+    errors = exc_info.value
+    assert errors.args == (str(errors),)
+    assert repr(errors) == f"XmlLoadErrors({str(errors)!r})"
+
+
+def test_load_error_union_causes():
+    el = etree.fromstring(
+        "<collect id='1'><text>a</text><one id='1' /><many id='2' /><union /></collect>"
+    )
+    with pytest.raises(XmlUnionError) as exc_info:
+        load(Collect, el)
+
+    error = exc_info.value
+    assert error.field == "union"
+    assert [type(e) for e in error.values["causes"]] == [
+        XmlRequiredAttributeError,
+        XmlRequiredAttributeError,
+    ]
+    assert str(error) == (
+        "Invalid child elements found for 'union' in 'collect':\n"
+        "Required attribute 'spam' not found on 'union'\n"
+        "Required attribute 'wibble' not found on 'union'"
+    )
+
+
+def test_load_collect_errors():
+    el = etree.fromstring(
+        "<collect foo='bar'>text<!-- comment -->"
+        "<text><b /></text>"
+        "<one id='1' /><one id='2' />"
+        "<many id='1' /><many /><many><x /></many>"
+        "<union />"
+        "<other />"
+        "</collect>"
+    )
+    with pytest.raises(XmlLoadErrors) as exc_info:
+        load(Collect, el, "collect", Options(collect_errors=True))
+
+    errors = exc_info.value.errors
+    assert [type(e) for e in errors] == [
+        XmlRequiredAttributeError,
+        XmlUndeclaredAttributesError,
+        XmlTextError,
+        XmlCommentsError,
+        XmlChildElementsError,
+        XmlMultipleChildrenError,
+        XmlRequiredAttributeError,
+        XmlRequiredAttributeError,
+        XmlUndeclaredChildrenError,
+        XmlUnionError,
+        XmlUndeclaredChildrenError,
+    ]
+    # the union error is reported on the parent element
+    assert [e.path for e in errors][-3:] == ["many[3]", ".", "."]
+    msg = str(exc_info.value)
+    assert msg.startswith("Found 11 errors:\n")
+    assert "Multiple child elements 'one' in 'collect'" in msg
+    assert isinstance(exc_info.value, ValueError)
+
+
+def test_load_collect_errors_missing():
+    el = etree.fromstring("<foo id='1'><text>a</text><one id='1' /></foo>")
+    with pytest.raises(XmlLoadErrors) as exc_info:
+        load(Collect, el, "collect", Options(collect_errors=True))
+
+    assert [type(e) for e in exc_info.value.errors] == [
+        XmlNameError,
+        XmlRequiredChildError,
+    ]
+
+    el = etree.fromstring("<collect id='1'><text /><?pi ?></collect>")
+    with pytest.raises(XmlLoadErrors) as exc_info:
+        load(Collect, el, "collect", Options(collect_errors=True))
+
+    assert [type(e) for e in exc_info.value.errors] == [
+        XmlProcessingInstructionsError,
+        XmlNoTextError,
+        XmlRequiredChildError,
+        XmlRequiredChildError,
+    ]
+
+
+def test_load_collect_errors_validate():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        id: str
+
+        def xml_validate(self) -> None:
+            if self.id == "invalid":
+                raise ValueError("invalid")
+
+    @xml_dataclass
+    class Bar:
+        __ns__ = None
+        foo: List[Foo]
+
+    el = etree.fromstring(
+        "<bar><foo id='invalid' /><foo id='1' /><foo id='invalid' /></bar>"
+    )
+    with pytest.raises(XmlLoadErrors) as exc_info:
+        load(Bar, el, options=Options(collect_errors=True))
+
+    # once the document is rejected, no more instances are created
+    assert [str(e) for e in exc_info.value.errors] == ["invalid"]
+
+
+def test_load_collect_errors_valid():
+    el = etree.fromstring(
+        "<collect id='1'><text>a</text><one id='1' /><many id='2' />"
+        "<union spam='3' /></collect>"
+    )
+    collect = load(Collect, el, "collect", Options(collect_errors=True))
+    assert collect == Collect(
+        "1", CollectText("a"), CollectChild("1"), [CollectChild("2")], Child1("3")
+    )
+    assert collect.many_by_id("2") is collect.many[0]
+
+
+def test_load_collect_errors_namespace():
+    el = etree.fromstring(f'<collect xmlns="{NS}" />')
+    with pytest.raises(XmlLoadErrors) as exc_info:
+        load(Collect, el, "collect", Options(collect_errors=True))
+
+    error = exc_info.value.errors[0]
+    assert isinstance(error, XmlNamespaceError)
+    assert error.values == {"namespace": NS, "expected": None}
+
+
+def make_level(inner):
+    @xml_dataclass
+    class Level:
+        __ns__ = None
+        id: Optional[str] = None
+        value: Optional[CollectText] = None
+        limited: Optional[List[Union[Child1, inner]]] = None
+
+    return Level
+
+
+# elements with the same name are nested up to 5 levels deep
+Limited = CollectChild
+for _ in range(4):
+    Limited = make_level(Limited)
+
+
+def make_limited(depth, width):
+    if depth == 1:
+        return "<limited />"
+    child = make_limited(depth - 1, width)
+    return "<limited>" + child * width + "</limited>"
+
+
+@pytest.mark.parametrize(
+    "options,xml",
+    [
+        (Options(max_depth=3), make_limited(3, 1)),
+        (Options(max_elements=7), make_limited(3, 2)),
+        (Options(max_list_length=2), make_limited(2, 2)),
+        (Options(max_value_size=3), "<limited id='abc'><value>abc</value></limited>"),
+    ],
+)
+def test_load_limits_not_exceeded(options, xml):
+    assert load(Limited, etree.fromstring(xml), "limited", options)
+
+
+@pytest.mark.parametrize(
+    "options,xml,msg",
+    [
+        (Options(max_depth=3), make_limited(4, 1), "maximum depth of 3"),
+        (Options(max_elements=6), make_limited(3, 2), "number of elements of 6"),
+        (Options(max_list_length=2), make_limited(2, 3), "list length of 2"),
+        (
+            Options(max_value_size=2),
+            "<limited id='abc' />",
+            "Attribute 'id' on 'limited' exceeds the maximum size of 2",
+        ),
+        (
+            Options(max_value_size=2),
+            "<limited><value>abc</value></limited>",
+            "Text of 'value' exceeds the maximum size of 2",
+        ),
+    ],
+)
+def test_load_limits_exceeded(options, xml, msg):
+    with pytest.raises(XmlResourceLimitError) as exc_info:
+        load(Limited, etree.fromstring(xml), "limited", options)
+
+    assert not isinstance(exc_info.value, ValueError)
+    assert msg in str(exc_info.value)
+
+
+def test_load_limits_not_collected():
+    # union types are tried depth-first, the limit isn't swallowed
+    xml = make_limited(4, 1)
+    options = Options(max_depth=3, collect_errors=True)
+    with pytest.raises(XmlResourceLimitError):
+        load(Limited, etree.fromstring(xml), "limited", options)
+
+
+def test_load_limits_depth_per_branch():
+    # the depth is restored after each child
+    xml = "<limited>" + make_limited(2, 1) * 3 + "</limited>"
+    assert load(Limited, etree.fromstring(xml), "limited", Options(max_depth=3))
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenTupleRecord:
+    __ns__ = None
+    id: str
+    meta: Tuple[FrozenMeta, ...] = index_by("name")
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenTupleRecords:
+    __ns__ = None
+    record: Optional[Tuple[Union[FrozenTupleRecord, FrozenMeta], ...]] = None
+
+
+def test_load_frozen_tuples():
+    xml = RECORDS.replace("records>", "tuples>")
+    records = load(FrozenTupleRecords, etree.fromstring(xml), "tuples")
+    first, second, third = records.record
+    assert isinstance(records.record, tuple)
+    assert isinstance(first.meta, tuple)
+    assert first.meta_by_name("type") is first.meta[1]
+    assert third.meta == (FrozenMeta(name="lang", value="en"),)
+    # frozen instances with tuples of children are hashable
+    assert len({first, second, third}) == 2
+    assert {records: "records"}[records] == "records"
+
+
+def test_load_frozen_tuples_intern():
+    xml = RECORDS.replace("records>", "tuples>")
+    options = Options(intern_values=True)
+    records = load(FrozenTupleRecords, etree.fromstring(xml), "tuples", options)
+    first, second, _ = records.record
+    assert first is second
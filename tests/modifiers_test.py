@@ -5,7 +5,7 @@ from itertools import combinations
 
 import pytest
 
-from xml_dataclasses.modifiers import ignored, rename, text
+from xml_dataclasses.modifiers import ignored, index_by, rename, text
 
 
 def dict_comb(items, r=2):
@@ -88,3 +88,29 @@ def test_ignored_field():
     actual_field = ignored()
     assert not actual_field.init
     assert not actual_field.compare
+
+
+def test_index_by_no_field_no_default():
+    f = index_by("id")
+    assert isinstance(f, Field)
+    assert f.default is MISSING
+    assert f.metadata == {"xml:index_by": "id"}
+
+
+@pytest.mark.parametrize("default", DEFAULTS)
+def test_index_by_no_field_default(default):
+    f = index_by("id", default=default)
+    assert isinstance(f, Field)
+    assert f.default is default
+    assert f.metadata == {"xml:index_by": "id"}
+
+
+@pytest.mark.parametrize("default", DEFAULTS)
+def test_index_by_has_field_default_ignored(default):
+    expected_field = rename(field(metadata={"foo": "bar"}), name="baz")
+    expected_md = {**expected_field.metadata, "xml:index_by": "id"}
+
+    actual_field = index_by("id", expected_field, default=default)
+    assert actual_field is expected_field
+    assert actual_field.default is MISSING
+    assert actual_field.metadata == expected_md
@@ -0,0 +1,266 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import List, Optional
+
+import pytest
+from lxml import etree
+
+# test public exports
+from xml_dataclasses import (
+    Options,
+    dump_parallel,
+    dumps,
+    load_parallel,
+    rename,
+    text,
+    xml_dataclass,
+)
+
+NS = "https://tobywf.com"
+NSMAP = {None: NS}
+
+
+@xml_dataclass
+class Item:
+    __ns__ = NS
+    id: str
+    lang: Optional[str] = rename(
+        default=None, ns="http://www.w3.org/XML/1998/namespace"
+    )
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Other:
+    __ns__ = "urn:other"
+    id: str
+
+
+@xml_dataclass
+class Items:
+    __ns__ = NS
+    item: List[Item]
+    other: Optional[Other] = None
+    id: Optional[str] = None
+
+
+def make_items(count):
+    return Items(
+        item=[Item(str(i), "en" if i % 2 else None, f"<{i}>") for i in range(count)],
+        other=Other("other"),
+        id="items",
+    )
+
+
+def dump_with(items, **kwargs):
+    buf = BytesIO()
+    dump_parallel(items, buf, "items", NSMAP, **kwargs)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize(
+    "inst",
+    [None, object(), "", 0, dataclass(type("Foo", (), {}))],
+)
+def test_dump_parallel_not_xml_dataclass(inst):
+    with pytest.raises(ValueError) as exc_info:
+        dump_parallel(inst, BytesIO(), "foo", NSMAP)
+
+    assert repr(type(inst)) in str(exc_info.value)
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1])
+def test_dump_parallel_invalid_chunk_size(chunk_size):
+    with pytest.raises(ValueError) as exc_info:
+        dump_parallel(make_items(1), BytesIO(), "items", NSMAP, chunk_size)
+
+    assert str(chunk_size) in str(exc_info.value)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 100])
+def test_dump_parallel_same_as_dumps(chunk_size):
+    items = make_items(10)
+    expected = dumps(items, "items", NSMAP, hoist_namespaces=True)
+    with ThreadPoolExecutor(2) as executor:
+        assert dump_with(items, chunk_size=chunk_size, executor=executor) == expected
+
+
+def test_dump_parallel_limits_pending(monkeypatch):
+    monkeypatch.setattr("xml_dataclasses.parallel.os.cpu_count", lambda: 1)
+    items = make_items(10)
+    expected = dumps(items, "items", NSMAP, hoist_namespaces=True)
+    with ThreadPoolExecutor(2) as executor:
+        assert dump_with(items, chunk_size=1, executor=executor) == expected
+
+
+def test_dump_parallel_process_pool():
+    items = make_items(10)
+    expected = dumps(items, "items", NSMAP, hoist_namespaces=True)
+    assert dump_with(items, chunk_size=4) == expected
+
+
+def test_dump_parallel_initialized_workers(monkeypatch):
+    # workers are initialized with the instance, and only get index ranges
+    monkeypatch.setattr(
+        "xml_dataclasses.parallel.ProcessPoolExecutor", ThreadPoolExecutor
+    )
+    items = make_items(10)
+    expected = dumps(items, "items", NSMAP, hoist_namespaces=True)
+    assert dump_with(items, chunk_size=3) == expected
+
+
+def test_dump_parallel_no_children():
+    items = Items(item=[])
+    with ThreadPoolExecutor(1) as executor:
+        data = dump_with(items, executor=executor, xml_declaration=True)
+    assert data == (
+        b"<?xml version='1.0' encoding='utf-8'?>\n"
+        b'<items xmlns="https://tobywf.com" xmlns:ns0="urn:other"/>'
+    )
+
+
+def test_dump_parallel_text():
+    buf = BytesIO()
+    dump_parallel(Item("1", value="foo"), buf, "item", NSMAP, encoding="ascii")
+    assert buf.getvalue() == b'<item xmlns="https://tobywf.com" id="1">foo</item>'
+
+
+@xml_dataclass
+class Record:
+    __ns__ = NS
+    id: str
+    value: Optional[str] = text(default=None)
+
+
+def write_doc(tmp_path, body, root=f'<records xmlns="{NS}">', end="</records>"):
+    path = tmp_path / "records.xml"
+    path.write_bytes(
+        f"<?xml version='1.0' encoding='utf-8'?>\n{root}{body}{end}".encode()
+    )
+    return path
+
+
+def load_with(path, name="record", **kwargs):
+    with ThreadPoolExecutor(2) as executor:
+        return [
+            r.id for r in load_parallel(Record, path, name, executor=executor, **kwargs)
+        ]
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [None, object, str, int, dataclass(type("Foo", (), {}))],
+)
+def test_load_parallel_not_xml_dataclass(tmp_path, cls):
+    path = write_doc(tmp_path, "")
+    with pytest.raises(ValueError) as exc_info:
+        list(load_parallel(cls, path, "record"))
+
+    assert repr(cls) in str(exc_info.value)
+
+
+@pytest.mark.parametrize("chunk_bytes", [0, -1])
+def test_load_parallel_invalid_chunk_bytes(tmp_path, chunk_bytes):
+    path = write_doc(tmp_path, "")
+    with pytest.raises(ValueError) as exc_info:
+        list(load_parallel(Record, path, "record", chunk_bytes=chunk_bytes))
+
+    assert str(chunk_bytes) in str(exc_info.value)
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 10, 30, 1000])
+def test_load_parallel(tmp_path, chunk_bytes):
+    body = "".join(f'<record id="{i}">{i}</record>\n' for i in range(10))
+    path = write_doc(tmp_path, f"<header />{body}", end="</records><!-- end -->")
+    assert load_with(path, chunk_bytes=chunk_bytes) == [str(i) for i in range(10)]
+
+
+def test_load_parallel_limits_pending(tmp_path, monkeypatch):
+    monkeypatch.setattr("xml_dataclasses.parallel.os.cpu_count", lambda: 1)
+    body = "".join(f'<record id="{i}" />' for i in range(10))
+    path = write_doc(tmp_path, body)
+    assert load_with(path, chunk_bytes=1) == [str(i) for i in range(10)]
+
+
+def test_load_parallel_prefix(tmp_path):
+    body = "".join(f'<r:record id="{i}"></r:record >' for i in range(3))
+    path = write_doc(tmp_path, body, f'<r:records xmlns:r="{NS}">', "</r:records>")
+    assert load_with(path, chunk_bytes=1) == ["0", "1", "2"]
+
+
+@pytest.mark.parametrize(
+    "section",
+    [
+        '<!-- <record id="x"></record> -->',
+        '<?pi <record id="x"></record> ?>',
+        "<record id='a'><![CDATA[</record>]]></record>",
+    ],
+)
+def test_load_parallel_sections(tmp_path, section):
+    body = '<record id="0"></record>' + section + '<record id="1"></record>'
+    path = write_doc(tmp_path, body)
+    ids = load_with(path, chunk_bytes=1)
+    assert ids == (["0", "a", "1"] if "CDATA" in section else ["0", "1"])
+
+
+def test_load_parallel_section_not_closed(tmp_path):
+    path = write_doc(tmp_path, '<record id="0"></record><!-- <record id="1"></record>')
+    with pytest.raises(etree.XMLSyntaxError):
+        load_with(path, chunk_bytes=1)
+
+
+def test_load_parallel_nested(tmp_path):
+    @xml_dataclass
+    class Inner:
+        __ns__ = None
+        id: str
+
+    @xml_dataclass
+    class Outer:
+        __ns__ = None
+        id: str
+        record: List[Inner] = field(default_factory=list)
+
+    # unsound split points are detected, and the ranges are merged
+    body = (
+        '<record id="0"><record id="1"/><record id="2"></record></record>'
+        '<record id="3"/>'
+    )
+    path = tmp_path / "records.xml"
+    path.write_bytes(f"<records>{body}</records>".encode())
+    with ThreadPoolExecutor(2) as executor:
+        records = list(
+            load_parallel(Outer, path, "record", chunk_bytes=1, executor=executor)
+        )
+    assert [r.id for r in records] == ["0", "3"]
+    assert [r.id for r in records[0].record] == ["1", "2"]
+
+
+def test_load_parallel_syntax_error(tmp_path):
+    path = write_doc(tmp_path, '<record id="0"></record><record id="1"></recrd>')
+    with pytest.raises(etree.XMLSyntaxError):
+        load_with(path, chunk_bytes=1)
+
+
+def test_load_parallel_options(tmp_path):
+    path = write_doc(tmp_path, '<record id="0" foo="bar" />')
+    with pytest.raises(ValueError):
+        load_with(path)
+    assert load_with(path, options=Options(ignore_unknown_attributes=True)) == ["0"]
+
+
+def test_load_parallel_empty(tmp_path):
+    path = write_doc(tmp_path, "", f'<records xmlns="{NS}" />', "")
+    assert load_with(path) == []
+
+
+def test_load_parallel_no_records(tmp_path):
+    assert load_with(write_doc(tmp_path, "<header />")) == []
+
+
+def test_load_parallel_process_pool(tmp_path):
+    body = "".join(f'<record id="{i}">{i}</record>' for i in range(10))
+    path = write_doc(tmp_path, body)
+    records = list(load_parallel(Record, path, "record", chunk_bytes=50))
+    assert records == [Record(str(i), str(i)) for i in range(10)]
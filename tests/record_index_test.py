@@ -0,0 +1,116 @@
+from typing import Optional
+
+import pytest
+
+from xml_dataclasses import Options, build_index, load_at, text, xml_dataclass
+from xml_dataclasses.record_index import RecordIndex
+
+NS = "https://tobywf.com"
+
+
+@xml_dataclass
+class Record:
+    __ns__ = NS
+    id: Optional[str] = None
+    value: Optional[str] = text(default=None)
+
+
+DOC = f"""<?xml version="1.0" encoding="utf-8"?>
+<!-- <r:record id="comment" /> -->
+<r:records xmlns:r="{NS}">
+  <r:header><r:record id="nested" /></r:header>
+  <r:record id="a" />
+  <r:record id="b"><![CDATA[</r:record>]]></r:record>
+  <r:record />
+  <r:record id="a" foo="bar"></r:record>
+</r:records>
+"""
+
+
+@pytest.fixture(name="path")
+def fixture_path(tmp_path):
+    path = tmp_path / "records.xml"
+    path.write_bytes(DOC.encode("utf-8"))
+    return path
+
+
+def test_build_index(path):
+    index = build_index(path)
+    assert len(index) == 5
+    assert index.keys == {}
+    assert index.root == b"r:records"
+    assert index.context.endswith(f'<r:records xmlns:r="{NS}">'.encode("utf-8"))
+    assert index.size == len(DOC.encode("utf-8"))
+    start, end = index.span(1)
+    assert DOC.encode("utf-8")[start:end] == b'<r:record id="a" />'
+
+
+def test_build_index_name(path):
+    index = build_index(path, "record")
+    assert len(index) == 4
+
+
+def test_build_index_key(path):
+    index = build_index(path, "record", "id")
+    # first record with the key wins, records without the key aren't keyed
+    assert index.keys == {"a": 0, "b": 1}
+
+
+def test_build_index_empty_root(tmp_path):
+    path = tmp_path / "records.xml"
+    path.write_bytes(b"<records />")
+    index = build_index(path)
+    assert len(index) == 0
+    assert index.context == b"<records >"
+
+
+def test_build_index_not_closed(tmp_path):
+    path = tmp_path / "records.xml"
+    path.write_bytes(b"<records><record></record>")
+    with pytest.raises(ValueError) as exc_info:
+        build_index(path)
+    assert "'records' not closed" in str(exc_info.value)
+
+
+def test_load_at(path):
+    index = build_index(path, "record", "id")
+    assert load_at(Record, path, index, 0) == Record(id="a")
+    assert load_at(Record, path, index, 1) == Record(id="b", value="</r:record>")
+    assert load_at(Record, path, index, -2) == Record()
+    assert load_at(Record, path, index, "b").id == "b"
+    assert load_at(Record, path, index, "b").__nsmap__ == {"r": NS}
+
+    with pytest.raises(IndexError):
+        load_at(Record, path, index, 4)
+    with pytest.raises(KeyError):
+        load_at(Record, path, index, "c")
+
+
+def test_load_at_options(path):
+    index = build_index(path, "record")
+    with pytest.raises(ValueError):
+        load_at(Record, path, index, 3)
+    options = Options(ignore_unknown_attributes=True)
+    assert load_at(Record, path, index, 3, options) == Record(id="a")
+
+
+def test_load_at_stale_index(path):
+    index = build_index(path)
+    path.write_bytes(DOC.encode("utf-8") + b"\n")
+    with pytest.raises(ValueError) as exc_info:
+        load_at(Record, path, index, 0)
+    assert "doesn't match" in str(exc_info.value)
+
+
+def test_record_index_write_read(path, tmp_path):
+    index = build_index(path, "record", "id")
+    index_path = tmp_path / "records.idx"
+    index.write(index_path)
+    assert RecordIndex.read(index_path) == index
+    assert load_at(Record, path, RecordIndex.read(index_path), "a") == Record(id="a")
+
+
+def test_record_index_read_invalid(path):
+    with pytest.raises(ValueError) as exc_info:
+        RecordIndex.read(path)
+    assert "is not a record index" in str(exc_info.value)
@@ -1,5 +1,7 @@
+import pickle
+from copy import deepcopy
 from dataclasses import dataclass, field, fields
-from typing import Optional
+from typing import List, Optional, Tuple, Union
 from unittest.mock import patch
 
 import pytest
@@ -7,12 +9,22 @@ import pytest
 from xml_dataclasses.exceptions import (
     XmlDataclassContentsError,
     XmlDataclassDuplicateFieldError,
+    XmlDataclassDuplicateRootError,
     XmlDataclassInternalError,
     XmlDataclassModelError,
     XmlDataclassNoNamespaceError,
 )
-from xml_dataclasses.modifiers import rename, text
-from xml_dataclasses.resolve_types import FieldInfo, is_xml_dataclass, xml_dataclass
+from xml_dataclasses.modifiers import index_by, rename, text
+from xml_dataclasses.resolve_types import (
+    HASH_KEY,
+    FieldInfo,
+    collect_namespaces,
+    get_root_class,
+    hoist_nsmap,
+    is_xml_dataclass,
+    root_tags,
+    xml_dataclass,
+)
 
 NS = "http://www.w3.org/XML/1998/namespace"
 
@@ -222,3 +234,293 @@ def test_xml_dataclass_already_a_dataclass_stays_a_dataclass():
     assert len(Bar.__attributes__) == 1
     attr_info = Bar.__attributes__[0]
     assert attr_info.xml_name == "baz"
+
+
+@xml_dataclass
+class Item1:
+    __ns__ = None
+    id: Optional[str] = None
+
+
+@xml_dataclass
+class Item2:
+    __ns__ = None
+    id: str
+    value: str = text()
+
+
+def test_xml_dataclass_index_by_not_list():
+    class Foo:
+        __ns__ = None
+        item: Item1 = index_by("id")
+
+    with pytest.raises(XmlDataclassModelError) as exc_info:
+        xml_dataclass(Foo)
+    assert "'item' is indexed, but not a list" in str(exc_info.value)
+
+
+def test_xml_dataclass_index_by_unknown_attribute():
+    class Foo:
+        __ns__ = None
+        item: List[Union[Item1, XmlDt2]] = index_by("id")
+
+    with pytest.raises(XmlDataclassModelError) as exc_info:
+        xml_dataclass(Foo)
+    assert "'XmlDt2' has no such attribute" in str(exc_info.value)
+
+
+def test_xml_dataclass_index_by_accessor():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        item: List[Union[Item1, Item2]] = index_by("id")
+
+    assert Foo.__children__[0].index_by == "id"
+    first = Item1(id="a")
+    foo = Foo(item=[first, Item1(), Item2(id="b", value=""), Item1(id="a")])
+    assert foo.item_by_id("a") is first
+    assert foo.item_by_id("b") is foo.item[2]
+    assert foo.item_by_id("c") is None
+    assert foo.item_by_id(None) is None
+
+
+def test_xml_dataclass_index_by_accessor_new_list():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        item: Optional[List[Item1]] = index_by("id", default=None)
+
+    foo = Foo()
+    assert foo.item_by_id("a") is None
+    foo.item = [Item1(id="a")]
+    assert foo.item_by_id("a") is foo.item[0]
+    # changing the length of the list rebuilds the index
+    foo.item.append(Item1(id="b"))
+    assert foo.item_by_id("b") is foo.item[1]
+    # as does looking up a child whose key changed
+    foo.item[0] = Item1(id="z")
+    assert foo.item_by_id("a") is None
+    assert foo.item_by_id("z") is foo.item[0]
+    foo.item[1].id = "y"
+    assert foo.item_by_id("b") is None
+    assert foo.item_by_id("y") is foo.item[1]
+    foo.item = None
+    assert foo.item_by_id("y") is None
+
+
+def test_xml_dataclass_index_by_accessor_miss():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        item: List[Item1] = index_by("id")
+
+    foo = Foo(item=[Item1(id="a"), Item1(id="b")])
+    assert foo.item_by_id("a") is foo.item[0]
+    cached = foo.__dict__["__xml_index_item__"]
+    # a missing key doesn't rebuild the index of an unchanged list
+    assert foo.item_by_id("c") is None
+    assert foo.__dict__["__xml_index_item__"] is cached
+    # so a new key of a replaced child isn't found, until the index is rebuilt
+    foo.item[1] = Item1(id="c")
+    assert foo.item_by_id("c") is None
+    assert foo.item_by_id("b") is None
+    assert foo.item_by_id("c") is foo.item[1]
+
+
+def test_xml_dataclass_index_by_accessor_not_overwritten():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        item: List[Item1] = index_by("id")
+
+        def item_by_id(self, value):
+            return value
+
+    assert Foo(item=[]).item_by_id("a") == "a"
+
+
+@xml_dataclass
+class NsLeaf:
+    __ns__ = "urn:c"
+    lang: Optional[str] = rename(default=None, ns=NS)
+    other: Optional[str] = rename(default=None, ns="urn:d")
+
+
+@xml_dataclass
+class NsMiddle:
+    __ns__ = "urn:b"
+    leaf: List[NsLeaf]
+
+
+@xml_dataclass
+class NsRoot:
+    __ns__ = "urn:a"
+    middle: NsMiddle
+    leaf: Optional[NsLeaf] = None
+    plain: Optional[XmlDt2] = None
+
+
+def test_collect_namespaces():
+    # ignores the XML namespace, and types without a namespace
+    assert collect_namespaces(NsRoot) == ("urn:a", "urn:b", "urn:c", "urn:d")
+    assert collect_namespaces(NsMiddle) == ("urn:b", "urn:c", "urn:d")
+    assert NsRoot.__dict__["__xml_namespaces__"] == ("urn:a", "urn:b", "urn:c", "urn:d")
+    # cached
+    assert collect_namespaces(NsRoot) is collect_namespaces(NsRoot)
+
+
+def test_hoist_nsmap():
+    nsmap = {None: "urn:a", "ns0": "urn:x", "c": "urn:c", "xml": NS}
+    assert hoist_nsmap(NsRoot, nsmap) == {
+        None: "urn:a",
+        "ns0": "urn:x",
+        "c": "urn:c",
+        "ns1": "urn:b",
+        "ns2": "urn:d",
+    }
+    assert hoist_nsmap(NsMiddle, None) == {
+        "ns0": "urn:b",
+        "ns1": "urn:c",
+        "ns2": "urn:d",
+    }
+
+
+def test_xml_dataclass_registers_root():
+    @xml_dataclass
+    class Registered:
+        __ns__ = "urn:registry"
+        __root__ = "registered"
+
+    assert get_root_class("{urn:registry}registered") is Registered
+    assert "{urn:registry}registered" in root_tags()
+
+
+def test_xml_dataclass_root_not_inherited():
+    @xml_dataclass
+    class Base:
+        __ns__ = "urn:registry"
+        __root__ = "base"
+
+    @xml_dataclass
+    class Derived(Base):
+        pass
+
+    assert get_root_class("{urn:registry}base") is Base
+
+
+def test_xml_dataclass_root_redefined():
+    def make():
+        @xml_dataclass
+        class Redefined:
+            __ns__ = None
+            __root__ = "redefined"
+
+        return Redefined
+
+    make()
+    redefined = make()
+    assert get_root_class("redefined") is redefined
+
+
+def test_xml_dataclass_duplicate_root():
+    @xml_dataclass
+    class First:
+        __ns__ = "urn:registry"
+        __root__ = "duplicate"
+
+    with pytest.raises(XmlDataclassDuplicateRootError) as exc_info:
+
+        @xml_dataclass
+        class Second:
+            __ns__ = "urn:registry"
+            __root__ = "duplicate"
+
+    msg = str(exc_info.value)
+    assert "{urn:registry}duplicate" in msg
+    assert "First" in msg
+    assert "Second" in msg
+    assert get_root_class("{urn:registry}duplicate") is First
+
+
+def test_get_root_class_not_registered():
+    with pytest.raises(ValueError) as exc_info:
+        get_root_class("{urn:registry}unknown")
+
+    assert "{urn:registry}unknown" in str(exc_info.value)
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenLeaf:
+    __ns__ = None
+    id: str
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenTree:
+    __ns__ = None
+    id: str
+    leaf: Tuple[FrozenLeaf, ...]
+
+
+def test_xml_dataclass_frozen_hash_cached():
+    tree = FrozenTree("1", (FrozenLeaf("a"), FrozenLeaf("b")))
+    assert hash(tree) == hash(("1", (FrozenLeaf("a"), FrozenLeaf("b"))))
+    assert tree.__dict__[HASH_KEY] == hash(tree)
+    assert tree.leaf[0].__dict__[HASH_KEY] == hash(FrozenLeaf("a"))
+    assert {tree: 1}[FrozenTree("1", (FrozenLeaf("a"), FrozenLeaf("b")))] == 1
+    assert tree != FrozenTree("1", ())
+
+
+def test_xml_dataclass_frozen_hash_computed_once():
+    calls = []
+
+    @xml_dataclass
+    @dataclass(frozen=True)
+    class Foo:
+        __ns__ = None
+        id: str
+
+        def __hash__(self) -> int:
+            calls.append(self)
+            return hash(self.id)
+
+    foo = Foo("1")
+    assert hash(foo) == hash(foo) == hash("1")
+    assert len(calls) == 1
+
+
+@pytest.mark.parametrize("copier", [deepcopy, lambda v: pickle.loads(pickle.dumps(v))])
+def test_xml_dataclass_frozen_hash_not_copied(copier):
+    # string hashes differ between processes, so the hash is never pickled
+    tree = FrozenTree("1", (FrozenLeaf("a"),))
+    hash(tree)
+    copied = copier(tree)
+    assert copied == tree
+    assert HASH_KEY not in copied.__dict__
+    assert HASH_KEY not in copied.leaf[0].__dict__
+    assert hash(copied) == hash(tree)
+
+
+def test_xml_dataclass_frozen_getstate_not_overwritten():
+    @xml_dataclass
+    @dataclass(frozen=True)
+    class Foo:
+        __ns__ = None
+        id: str
+
+        def __getstate__(self):
+            return {"id": "restored"}
+
+    assert deepcopy(Foo("1")).id == "restored"
+
+
+def test_xml_dataclass_not_frozen_not_hashable():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        id: str
+
+    assert Foo.__hash__ is None
+    assert "__getstate__" not in Foo.__dict__
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field, fields
 from itertools import product
-from typing import List, Optional, Union, _GenericAlias
+from typing import List, Optional, Tuple, Union, _GenericAlias
 
 import pytest
 
@@ -67,6 +67,10 @@ def test_invalid_field_types_1(fn, tp):
         (List[Optional[XmlDt1]], "Nested type cannot be optional"),
         (Optional[List[Optional[XmlDt1]]], "Nested type cannot be optional"),
         (Union[XmlDt1, XmlDt2], "different namespaces"),
+        (Tuple[XmlDt1], "Tuple type must be variable-length"),
+        (Tuple[XmlDt1, XmlDt1], "Tuple type must be variable-length"),
+        (Tuple[Optional[XmlDt1], ...], "Nested type cannot be optional"),
+        (List[Tuple[XmlDt1, ...]], "Child type must be XML dataclass"),
     ],
 )
 def test_invalid_field_types_2(tp, err):
@@ -120,6 +124,28 @@ def test_valid_field_types_child(tp, types, is_list, is_optional):
     # resolve_types_resolve_test.XmlDt1]], NoneType]
     assert set(bar.base_types) == types
     assert bar.is_list is is_list
+    assert bar.is_tuple is False
+
+
+@pytest.mark.parametrize(
+    "tp, types, is_optional",
+    [
+        (Tuple[XmlDt1, ...], {XmlDt1}, False),
+        (Optional[Tuple[XmlDt1, ...]], {XmlDt1}, True),
+        (Tuple[Union[XmlDt1, XmlDt3], ...], {XmlDt1, XmlDt3}, False),
+    ],
+)
+def test_valid_field_types_child_tuple(tp, types, is_optional):
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        bar: tp
+
+    (bar,) = Foo.__children__
+    assert bar.is_optional is is_optional
+    assert set(bar.base_types) == types
+    assert bar.is_list is True
+    assert bar.is_tuple is True
 
 
 def test_non_ctor_field_is_ignored():
@@ -0,0 +1,157 @@
+import pytest
+
+from xml_dataclasses.scanner import (
+    CDATA,
+    COMMENT,
+    DOCTYPE,
+    END,
+    PI,
+    START,
+    find_document,
+    find_root,
+    iter_documents,
+    iter_tokens,
+    local_name,
+    parse_attrs,
+)
+
+DOC = (
+    b'<?xml version="1.0"?>\n'
+    b'<!DOCTYPE foo [<!ENTITY bar "baz">]>\n'
+    b"<!-- <foo> -->\n"
+    b'<foo xmlns="urn:foo" a="1>2">'
+    b"<bar b='/>'/>"
+    b"<![CDATA[</foo>]]>"
+    b"<?pi </foo> ?>"
+    b"</foo >"
+)
+
+
+def test_iter_tokens():
+    tokens = [(m.lastgroup, m.group()) for m in iter_tokens(DOC)]
+    assert tokens == [
+        (PI, b'<?xml version="1.0"?>'),
+        (DOCTYPE, b'<!DOCTYPE foo [<!ENTITY bar "baz">]>'),
+        (COMMENT, b"<!-- <foo> -->"),
+        (START, b'<foo xmlns="urn:foo" a="1>2">'),
+        (START, b"<bar b='/>'/>"),
+        (CDATA, b"<![CDATA[</foo>]]>"),
+        (PI, b"<?pi </foo> ?>"),
+        (END, b"</foo >"),
+    ]
+
+
+def test_iter_tokens_groups():
+    start, empty, end = iter_tokens(b"<a:b c='d'><e/></a:b>")
+    assert start.group("start") == b"a:b"
+    assert start.group("attrs") == b" c='d'"
+    assert not start.group("empty")
+    assert empty.group("empty") == b"/"
+    assert end.group("end") == b"a:b"
+
+
+@pytest.mark.parametrize("doc", [b"<foo><!-- bar", b"<foo><bar", b"<foo>< bar>"])
+def test_iter_tokens_incomplete(doc):
+    tokens = list(iter_tokens(doc))
+    assert len(tokens) == 1
+    assert doc.find(b"<", tokens[-1].end()) > 0
+
+
+def test_iter_tokens_range():
+    tokens = list(iter_tokens(b"<a><b></b></a>", 3, 10))
+    assert [m.group() for m in tokens] == [b"<b>", b"</b>"]
+
+
+def test_parse_attrs():
+    attrs = parse_attrs(
+        b""" a="1" b = 'it''s' c="&lt;&gt;&amp;&quot;&apos;&#65;&#x42;" """
+    )
+    assert attrs == {"a": "1", "b": "it", "c": "<>&\"'AB"}
+
+
+def test_parse_attrs_encoding():
+    assert parse_attrs(' a="\xe9"'.encode("latin-1"), "latin-1") == {"a": "\xe9"}
+
+
+@pytest.mark.parametrize(
+    "qname,expected", [(b"foo", b"foo"), (b"bar:foo", b"foo"), (b"", b"")]
+)
+def test_local_name(qname, expected):
+    assert local_name(qname) == expected
+
+
+def test_find_root():
+    root = find_root(DOC)
+    assert root.qname == b"foo"
+    assert root.context == b'<?xml version="1.0"?><foo xmlns="urn:foo" a="1>2">'
+    assert DOC[root.end :].startswith(b"<bar")
+    assert root.encoding == "utf-8"
+    assert not root.is_empty
+
+
+def test_find_root_encoding():
+    doc = b"<?xml version='1.0' encoding='latin-1'?><foo/>"
+    root = find_root(doc)
+    assert root.encoding == "latin-1"
+    assert root.context == b"<?xml version='1.0' encoding='latin-1'?><foo>"
+    assert root.is_empty
+
+
+def test_find_root_position():
+    doc = b"<foo/>\n<?xml version='1.0'?><bar />"
+    root = find_root(doc, 6)
+    assert root.qname == b"bar"
+    assert root.context == b"<?xml version='1.0'?><bar >"
+
+
+def test_find_root_pi_not_declaration():
+    root = find_root(b"<!-- foo --><?xml version='1.0'?><?bar?><foo/>")
+    assert root.context == b"<foo>"
+
+
+@pytest.mark.parametrize("doc", [b"", b"<!-- foo -->", b"</foo>"])
+def test_find_root_no_root(doc):
+    with pytest.raises(ValueError) as exc_info:
+        find_root(doc)
+    assert "No root element found" in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "doc,expected",
+    [
+        (b"<foo />", (0, 7)),
+        (b" \n<foo>a</foo >\n<foo />", (2, 15)),
+        (b'<?xml version="1.0"?>\n<!-- a --><foo a=">"><bar /></foo>', (0, 56)),
+        (b"<foo><foo-bar /></foo><foo />", None),
+        (b"<foo><foo /></foo>", None),
+        (b"<foo><!-- </foo> --></foo>", None),
+        (b"<foo><![CDATA[</foo>]]></foo>", None),
+        (b"<foo><?pi </foo> ?></foo>", None),
+        (b"<!DOCTYPE foo><foo />", None),
+        (b"text<foo />", None),
+        (b"<foo>", None),
+        (b"<foo></foo", None),
+    ],
+)
+def test_find_document(doc, expected):
+    assert find_document(doc) == expected
+
+
+def test_find_document_position():
+    doc = b"<foo /><bar></bar>"
+    assert find_document(doc, 7) == (7, 18)
+
+
+@pytest.mark.parametrize(
+    "doc,expected",
+    [
+        (b"<foo />\n<bar>a</bar>\n", [(0, 7), (8, 20)]),
+        (b"<foo /><?pi?><bar /><!-- a --><baz />", [(0, 7), (7, 20), (20, 37)]),
+        (b"<foo /><bar><!-- a --></bar><baz />", [(0, 7)]),
+        (b"<foo /><bar><bar /></bar><baz />", [(0, 7)]),
+        (b"<foo /><bar>", [(0, 7)]),
+        (b"text<foo />", []),
+    ],
+)
+def test_iter_documents(doc, expected):
+    assert list(iter_documents(doc)) == expected
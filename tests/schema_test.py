@@ -0,0 +1,321 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+import pytest
+from lxml import etree
+
+# test public exports
+from xml_dataclasses import (
+    Options,
+    dumps,
+    generate_schema,
+    get_schema,
+    index_by,
+    load,
+    rename,
+    text,
+    validate,
+    xml_dataclass,
+)
+from xml_dataclasses.exceptions import (
+    XmlDataclassModelError,
+    XmlMultipleChildrenError,
+    XmlRequiredChildError,
+    XmlSchemaError,
+    XmlUnionError,
+)
+from xml_dataclasses.lxml_utils import XML_NS
+from xml_dataclasses.schema import MAIN_SCHEMA
+
+NS = "https://tobywf.com"
+OTHER_NS = "urn:other"
+ATTR_NS = "urn:attr"
+TRUSTED = Options(trusted=True)
+
+
+@xml_dataclass
+class Text:
+    __ns__ = NS
+    value: str = text()
+
+
+@xml_dataclass
+class OptionalText:
+    __ns__ = NS
+    value: str = text(default="default")
+
+
+@xml_dataclass
+class Other:
+    __ns__ = OTHER_NS
+    id: str
+    lang: Optional[str] = rename(default=None, name="lang", ns=XML_NS)
+
+
+@xml_dataclass
+class NoNamespace:
+    __ns__ = None
+    id: Optional[str] = None
+    qualified: Optional[str] = rename(default=None, name="q", ns=ATTR_NS)
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class Frozen:
+    __ns__ = NS
+    id: str
+    lang: Optional[str] = rename(default=None, name="lang", ns=XML_NS)
+
+
+@xml_dataclass
+class Branch:
+    __ns__ = NS
+    required: Text
+    other: Optional[Other] = None
+    unqualified: Optional[NoNamespace] = rename(default=None, name="unqualified")
+
+
+@xml_dataclass
+class Root:
+    __ns__ = NS
+    id: str
+    branch: Branch
+    text: List[Union[Text, OptionalText]]
+    other: Optional[List[Other]] = index_by("id", default=None)
+    frozen: Tuple[Frozen, ...] = ()
+    optional: Optional[OptionalText] = None
+    qualified: Optional[str] = rename(default=None, name="q", ns=NS)
+
+    def xml_validate(self) -> None:
+        if self.id == "invalid":
+            raise ValueError("Invalid id")
+
+
+NSMAP = {"t": NS, "o": OTHER_NS, "a": ATTR_NS}
+DOC = f"""<t:root xmlns:t="{NS}" xmlns:o="{OTHER_NS}" xmlns:a="{ATTR_NS}"
+    id="1" t:q="q">
+  <t:branch>
+    <t:required>req<!-- comment -->uired</t:required>
+    <o:other id="a" xml:lang="en" />
+    <unqualified id="b" a:q="q"> </unqualified>
+  </t:branch>
+  <t:text>text</t:text>
+  <t:text />
+  <o:other id="c" />
+  <o:other id="d" />
+  <t:frozen id="e" xml:lang="en" />
+  <t:optional><!-- empty --></t:optional>
+</t:root>"""
+
+
+def parse(doc):
+    return etree.fromstring(doc.encode("utf-8"))
+
+
+def test_generate_schema():
+    documents = generate_schema(Root, "root")
+    assert list(documents) == [
+        MAIN_SCHEMA,
+        "schema-1.xsd",
+        "schema-2.xsd",
+        "schema-3.xsd",
+    ]
+    main = etree.fromstring(documents[MAIN_SCHEMA])
+    assert main.get("targetNamespace") == NS
+    imports = [el.get("namespace") for el in main.iterchildren("{*}import")]
+    assert imports == [OTHER_NS, ATTR_NS, XML_NS]
+    assert [el.get("schemaLocation") for el in main.iterchildren("{*}import")] == [
+        "schema-1.xsd",
+        "schema-3.xsd",
+        "schema-2.xsd",
+    ]
+    other = etree.fromstring(documents["schema-1.xsd"])
+    assert other.get("targetNamespace") == OTHER_NS
+    assert [el.get("name") for el in other.iterchildren("{*}element")] == ["other"]
+
+
+def test_generate_schema_no_namespace():
+    documents = generate_schema(NoNamespace, "root")
+    main = etree.fromstring(documents[MAIN_SCHEMA])
+    assert main.get("targetNamespace") is None
+    schema = get_schema(NoNamespace, "root")
+    assert schema.validate(etree.fromstring(b'<root id="1" />'))
+    assert not schema.validate(etree.fromstring(b'<root xmlns="urn:a" id="1" />'))
+
+
+@pytest.mark.parametrize("cls", [None, object, dict])
+def test_generate_schema_not_xml_dataclass(cls):
+    with pytest.raises(ValueError) as exc_info:
+        generate_schema(cls, "root")
+
+    assert repr(cls) in str(exc_info.value)
+
+
+def test_generate_schema_different_types():
+    @xml_dataclass
+    class OtherText:
+        __ns__ = OTHER_NS
+        value: str = text()
+
+    @xml_dataclass
+    class Wrapper:
+        __ns__ = NS
+        other: OtherText
+
+    @xml_dataclass
+    class Conflicting:
+        __ns__ = NS
+        other: Other
+        wrapper: Wrapper
+
+    with pytest.raises(XmlDataclassModelError) as exc_info:
+        generate_schema(Conflicting, "root")
+
+    assert str(exc_info.value) == (
+        f"Element '{{{OTHER_NS}}}other' is declared with different types, "
+        "which a schema can't express"
+    )
+
+
+def test_get_schema_cached():
+    schema = get_schema(Root, "root")
+    assert get_schema(Root, "root") is schema
+    assert get_schema(Root, "other") is not schema
+
+
+def test_validate():
+    validate(Root, parse(DOC), "root")
+    instance = load(Root, parse(DOC), "root", Options(ignore_comments=True))
+    validate(Root, etree.fromstring(dumps(instance, "root", NSMAP)), "root")
+
+
+@pytest.mark.parametrize(
+    "old,new,message",
+    [
+        ('id="1"', "", "The attribute 'id' is required but missing"),
+        ('id="1"', 'id="1" foo="bar"', "The attribute 'foo' is not allowed"),
+        ('id="b"', 'id="b" q="q"', "The attribute 'q' is not allowed"),
+        ("<t:required>req<!-- comment -->uired</t:required>", "", "Missing child"),
+        ("req<!-- comment -->uired", "", "underruns the allowed minimum"),
+        ("</t:branch>", "<t:foo /></t:branch>", "This element is not expected"),
+        ("<t:branch>", "<t:branch>text", "Character content other than whitespace"),
+        ("> </unqualified>", ">text</unqualified>", "pattern"),
+        ("<!-- empty -->", "<t:foo />", "Element content is not allowed"),
+        (
+            '<unqualified id="b" a:q="q"> </unqualified>',
+            "<t:unqualified />",
+            "not expected",
+        ),
+        ("<o:other id", "<t:other id", "This element is not expected"),
+    ],
+)
+def test_validate_invalid(old, new, message):
+    with pytest.raises(XmlSchemaError) as exc_info:
+        validate(Root, parse(DOC.replace(old, new, 1)), "root")
+
+    assert message in str(exc_info.value)
+    assert isinstance(exc_info.value, ValueError)
+
+
+def test_validate_name():
+    with pytest.raises(XmlSchemaError):
+        validate(Root, parse(DOC), "other")
+
+
+def test_load_trusted():
+    el = parse(DOC)
+    validate(Root, el, "root")
+    loaded = load(Root, el, "root", TRUSTED)
+    assert loaded == load(Root, el, "root", Options(ignore_comments=True))
+    assert loaded.branch.required == Text("required")
+    assert loaded.text == [Text("text"), OptionalText("default")]
+    assert loaded.optional == OptionalText("default")
+    assert loaded.branch.unqualified.qualified == "q"
+    assert loaded.branch.other.lang == "en"
+    assert loaded.qualified == "q"
+    assert loaded.other_by_id("d") is loaded.other[1]
+    assert isinstance(loaded.frozen, tuple)
+    assert loaded.__nsmap__ == NSMAP
+    assert loaded.frozen[0].__nsmap__ == NSMAP
+
+
+def test_load_trusted_defaults():
+    el = parse(
+        f"""<root xmlns="{NS}" id="1">
+  <branch><required>required</required></branch>
+  <text>text</text>
+</root>"""
+    )
+    validate(Root, el, "root")
+    loaded = load(Root, el, "root", TRUSTED)
+    assert loaded == load(Root, el, "root")
+    assert loaded.other is None
+    assert loaded.frozen == ()
+
+
+def test_load_trusted_validate():
+    el = parse(DOC.replace('id="1"', 'id="invalid"'))
+    with pytest.raises(ValueError) as exc_info:
+        load(Root, el, "root", TRUSTED)
+
+    assert str(exc_info.value) == "Invalid id"
+
+
+def test_load_trusted_order():
+    # the children of classes with list children can be in any order
+    doc = DOC.replace("<t:text>text</t:text>", "")
+    el = parse(doc.replace("</t:root>", "<t:text>text</t:text></t:root>"))
+    validate(Root, el, "root")
+    loaded = load(Root, el, "root", TRUSTED)
+    assert loaded == load(Root, el, "root", Options(ignore_comments=True))
+    assert loaded.text == [OptionalText("default"), Text("text")]
+
+
+@pytest.mark.parametrize(
+    "old,new,exc_type",
+    [
+        ("</t:root>", "<t:optional /></t:root>", XmlMultipleChildrenError),
+        (
+            "</t:root>",
+            "<t:branch><t:required>r</t:required></t:branch></t:root>",
+            XmlMultipleChildrenError,
+        ),
+        ("<t:text>text</t:text>\n  <t:text />", "", XmlRequiredChildError),
+    ],
+)
+def test_load_trusted_occurs(old, new, exc_type):
+    # how often children occur isn't checked by the schema with list children
+    el = parse(DOC.replace(old, new, 1))
+    validate(Root, el, "root")
+    with pytest.raises(exc_type):
+        load(Root, el, "root", TRUSTED)
+
+
+def test_load_trusted_union():
+    # union children aren't checked by the schema
+    el = parse(DOC.replace("<t:text />", "<t:text><t:foo /></t:text>"))
+    validate(Root, el, "root")
+    with pytest.raises(XmlUnionError):
+        load(Root, el, "root", TRUSTED)
+
+
+def test_load_trusted_name():
+    with pytest.raises(ValueError):
+        load(Root, parse(DOC), "other", TRUSTED)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        Options(trusted=True, collect_errors=True),
+        Options(trusted=True, intern_values=True),
+        Options(trusted=True, max_depth=10),
+        Options(trusted=True, max_elements=100),
+        Options(trusted=True, max_list_length=10),
+        Options(trusted=True, max_value_size=100),
+    ],
+)
+def test_load_trusted_ignored(options):
+    # the comment is only allowed when trusted
+    with pytest.raises(ValueError):
+        load(Root, parse(DOC), "root", options)
@@ -0,0 +1,207 @@
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
+
+import pytest
+
+# test public exports
+from xml_dataclasses import dump_snapshot, load_snapshot, rename, text, xml_dataclass
+from xml_dataclasses.snapshot import model_fingerprint
+
+NS = "https://tobywf.com"
+
+
+@xml_dataclass
+class Text:
+    __ns__ = NS
+    value: Optional[str] = text(default=None)
+
+
+@xml_dataclass
+class Leaf:
+    __ns__ = NS
+    id: str
+    lang: Optional[str] = rename(default=None, name="lang", ns="urn:attr")
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class Frozen:
+    __ns__ = NS
+    id: str
+
+
+@xml_dataclass
+class Root:
+    __ns__ = NS
+    leaf: List[Union[Leaf, Text]]
+    text: Optional[Text] = None
+    frozen: Optional[Frozen] = None
+    more: Optional[List[Leaf]] = None
+
+
+def make_root():
+    root = Root(
+        leaf=[Leaf("1"), Text("☃ 𝄞"), Leaf("2", "en"), Text(""), Text()],
+        text=Text("1"),
+        frozen=Frozen("frozen"),
+    )
+    root.__nsmap__ = {None: NS, "a": "urn:attr"}
+    root.leaf[0].__nsmap__ = {None: NS, "a": "urn:attr"}
+    root.leaf[1].__nsmap__ = {"t": NS}
+    return root
+
+
+@pytest.mark.parametrize(
+    "inst",
+    [None, object(), "", 0, dataclass(type("Foo", (), {}))()],
+)
+def test_dump_snapshot_not_xml_dataclass(inst):
+    with pytest.raises(ValueError) as exc_info:
+        dump_snapshot(inst)
+
+    assert repr(type(inst)) in str(exc_info.value)
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [None, object, str, int, dataclass(type("Foo", (), {}))],
+)
+def test_load_snapshot_not_xml_dataclass(cls):
+    with pytest.raises(ValueError) as exc_info:
+        load_snapshot(cls, dump_snapshot(make_root()))
+
+    assert repr(cls) in str(exc_info.value)
+
+
+def test_snapshot_roundtrip():
+    root = make_root()
+    restored = load_snapshot(Root, dump_snapshot(root))
+    assert restored == root
+    assert restored.more is None
+    assert restored.leaf[3].value == ""
+    assert restored.leaf[4].value is None
+    assert restored.__nsmap__ == {None: NS, "a": "urn:attr"}
+    assert restored.leaf[0].__nsmap__ == {None: NS, "a": "urn:attr"}
+    assert restored.leaf[1].__nsmap__ == {"t": NS}
+    assert restored.leaf[2].__nsmap__ is None
+    assert restored.frozen.__nsmap__ is None
+
+
+def test_snapshot_roundtrip_buffer():
+    root = Root(leaf=[], more=[Leaf("1"), Leaf("1")])
+    data = bytearray(dump_snapshot(root))
+    assert load_snapshot(Root, memoryview(data)) == root
+
+
+def test_snapshot_strings_shared():
+    root = Root(leaf=[Leaf("same") for _ in range(100)])
+    assert dump_snapshot(root).count(b"same") == 1
+
+
+def test_load_snapshot_validates():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        id: str
+
+        def xml_validate(self) -> None:
+            if self.id == "invalid":
+                raise ValueError("invalid")
+
+    data = dump_snapshot(Foo("invalid"))
+    with pytest.raises(ValueError) as exc_info:
+        load_snapshot(Foo, data)
+
+    assert str(exc_info.value) == "invalid"
+
+
+def make_class(field_name):
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        __annotations__ = {field_name: str}
+
+    return Foo
+
+
+def test_model_fingerprint():
+    assert model_fingerprint(Root) == Root.__dict__["__xml_fingerprint__"]
+    assert model_fingerprint(Root) is model_fingerprint(Root)
+    assert model_fingerprint(Root) != model_fingerprint(Leaf)
+    assert model_fingerprint(make_class("a")) == model_fingerprint(make_class("a"))
+    assert model_fingerprint(make_class("a")) != model_fingerprint(make_class("b"))
+
+
+def test_load_snapshot_stale():
+    old, new = make_class("a"), make_class("b")
+    data = dump_snapshot(old(a="1"))
+    with pytest.raises(ValueError) as exc_info:
+        load_snapshot(new, data)
+
+    assert "doesn't match" in str(exc_info.value)
+
+
+def test_load_snapshot_not_snapshot():
+    with pytest.raises(ValueError) as exc_info:
+        load_snapshot(Root, b"<root />")
+
+    assert "not a snapshot" in str(exc_info.value)
+
+
+@pytest.mark.parametrize("size", [4, 8, 20])
+def test_load_snapshot_truncated(size):
+    data = dump_snapshot(make_root())
+    with pytest.raises(ValueError) as exc_info:
+        load_snapshot(Root, data[:-size])
+
+    assert "truncated" in str(exc_info.value)
+
+
+def test_load_snapshot_trailing_data():
+    data = dump_snapshot(make_root())
+    with pytest.raises(ValueError) as exc_info:
+        load_snapshot(Root, data + b"\0\0\0\0")
+
+    assert "trailing data" in str(exc_info.value)
+
+
+def test_dump_snapshot_invalid_child():
+    with pytest.raises(ValueError) as exc_info:
+        dump_snapshot(Root(leaf=[Frozen("1")]))
+
+    assert repr(Frozen) in str(exc_info.value)
+
+
+def test_dump_snapshot_invalid_value():
+    with pytest.raises(ValueError) as exc_info:
+        dump_snapshot(Leaf(id=1))
+
+    assert "1" in str(exc_info.value)
+
+
+@xml_dataclass
+@dataclass(frozen=True)
+class FrozenTuple:
+    __ns__ = NS
+    frozen: Tuple[Frozen, ...]
+
+
+def test_snapshot_roundtrip_tuple():
+    frozen = FrozenTuple((Frozen("1"), Frozen("2")))
+    restored = load_snapshot(FrozenTuple, dump_snapshot(frozen))
+    assert restored == frozen
+    assert isinstance(restored.frozen, tuple)
+
+
+def test_model_fingerprint_tuple():
+    def make(tp):
+        @xml_dataclass
+        class Foo:
+            __ns__ = None
+            __annotations__ = {"frozen": tp}
+
+        return Foo
+
+    tuple_fingerprint = model_fingerprint(make(Tuple[Frozen, ...]))
+    assert tuple_fingerprint == model_fingerprint(make(Tuple[Frozen, ...]))
+    assert tuple_fingerprint != model_fingerprint(make(List[Frozen]))
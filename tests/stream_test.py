@@ -0,0 +1,332 @@
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Optional
+
+import pytest
+from lxml import etree
+
+# test public exports
+from xml_dataclasses import (
+    Options,
+    dump_documents,
+    iterload,
+    iterload_any,
+    iterload_documents,
+    iterload_windows,
+    text,
+    xml_dataclass,
+)
+from xml_dataclasses.exceptions import XmlResourceLimitError
+from xml_dataclasses.stream import _free
+
+NS = "https://tobywf.com"
+
+
+@xml_dataclass
+class Record:
+    __ns__ = NS
+    id: str
+    value: Optional[str] = text(default=None)
+
+
+def make_doc(count, value=""):
+    records = "".join(
+        f'<record id="{i}">{value}</record><!-- {i} -->' for i in range(count)
+    )
+    return f'<records xmlns="{NS}"><header />{records}</records>'.encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [None, object, str, int, dataclass(type("Foo", (), {}))],
+)
+def test_iterload_not_xml_dataclass(cls):
+    with pytest.raises(ValueError) as exc_info:
+        list(iterload(cls, BytesIO(make_doc(1)), "record"))
+
+    assert repr(cls) in str(exc_info.value)
+
+
+def test_iterload():
+    records = list(iterload(Record, BytesIO(make_doc(3)), "record"))
+    assert records == [Record(id="0"), Record(id="1"), Record(id="2")]
+    assert records[0].__nsmap__ == {None: NS}
+
+
+def test_iterload_options():
+    doc = f'<records xmlns="{NS}"><record id="0" foo="bar" /></records>'
+    with pytest.raises(ValueError):
+        list(iterload(Record, BytesIO(doc.encode("utf-8")), "record"))
+
+    options = Options(ignore_unknown_attributes=True)
+    records = list(iterload(Record, BytesIO(doc.encode("utf-8")), "record", options))
+    assert records == [Record(id="0")]
+
+
+def test_iterload_nested_records_skipped():
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+
+    doc = b"<foo><foo><bar><foo /></bar></foo><foo /></foo>"
+    options = Options(ignore_unknown_children=True)
+    records = list(iterload(Foo, BytesIO(doc), "foo", options))
+    assert records == [Foo(), Foo()]
+
+
+def test_free():
+    root = etree.fromstring("<root><a>a</a><b><c /></b><d /></root>")
+    b = root[1]
+    _free(b)
+    assert [e.tag for e in root] == ["b", "d"]
+    assert len(b) == 0
+    assert b.text is None
+
+
+def test_iterload_windows():
+    windows = list(iterload_windows(Record, BytesIO(make_doc(5)), "record", 2))
+    assert [[r.id for r in w] for w in windows] == [["0", "1"], ["2", "3"], ["4"]]
+
+
+def test_iterload_windows_empty():
+    doc = f'<records xmlns="{NS}" />'.encode("utf-8")
+    assert not list(iterload_windows(Record, BytesIO(doc), "record", 2))
+
+
+@pytest.mark.parametrize("size", [0, -1])
+def test_iterload_windows_invalid_size(size):
+    with pytest.raises(ValueError) as exc_info:
+        list(iterload_windows(Record, BytesIO(make_doc(1)), "record", size))
+
+    assert str(size) in str(exc_info.value)
+
+
+def test_iterload_windows_max_text_size():
+    doc = BytesIO(make_doc(5, "abc"))
+    # each record has 4 characters of text (attribute value and text)
+    windows = list(iterload_windows(Record, doc, "record", 10, max_text_size=9))
+    assert [[r.id for r in w] for w in windows] == [["0", "1"], ["2", "3"], ["4"]]
+
+
+def test_iterload_windows_max_text_size_exceeded_by_record():
+    doc = BytesIO(make_doc(2, "abcdef"))
+    windows = list(iterload_windows(Record, doc, "record", 10, max_text_size=3))
+    assert [[r.id for r in w] for w in windows] == [["0"], ["1"]]
+
+
+def test_iterload_windows_lazy():
+    windows = iterload_windows(Record, BytesIO(make_doc(4)), "record", 2)
+    first = next(windows)
+    second = next(windows)
+    assert [r.id for r in first] == ["0", "1"]
+    assert [r.id for r in second] == ["2", "3"]
+
+
+@xml_dataclass
+class Event:
+    __ns__ = NS
+    __root__ = "event"
+    id: str
+
+
+@xml_dataclass
+class Message:
+    __ns__ = NS
+    __root__ = "message"
+    value: str = text()
+
+
+def test_iterload_any():
+    doc = (
+        f'<records xmlns="{NS}"><header /><event id="1" /><message>a</message>'
+        f'<event id="2"><event id="3" /></event><!-- c --></records>'
+    ).encode("utf-8")
+    with pytest.raises(ValueError):
+        list(iterload_any(BytesIO(doc)))
+
+    doc = doc.replace(b'<event id="3" />', b"")
+    records = list(iterload_any(BytesIO(doc)))
+    assert records == [Event("1"), Message("a"), Event("2")]
+
+
+def test_iterload_any_options():
+    doc = f'<records xmlns="{NS}"><event id="1" foo="bar" /></records>'.encode()
+    options = Options(ignore_unknown_attributes=True)
+    assert list(iterload_any(BytesIO(doc), options)) == [Event("1")]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        Options(max_depth=1),
+        Options(max_elements=1),
+        Options(max_value_size=3),
+        Options(max_depth=1, max_elements=1, max_value_size=3),
+    ],
+)
+def test_iterload_limits_not_exceeded(options):
+    doc = BytesIO(make_doc(3, "abc"))
+    records = list(iterload(Record, doc, "record", options))
+    assert [r.id for r in records] == ["0", "1", "2"]
+
+
+@pytest.mark.parametrize(
+    "options,replace,msg",
+    [
+        (Options(max_depth=1), b"<b />", "maximum depth of 1"),
+        (Options(max_elements=1), b"<b />", "number of elements of 1"),
+        (Options(max_value_size=2), b"<b>abc</b>", "Text of '{https://tobywf.com}b'"),
+        (Options(max_value_size=2), b'<b c="abc" />', "Attribute 'c' on"),
+    ],
+)
+def test_iterload_limits_exceeded(options, replace, msg):
+    records = '<record id="0">ab</record><record id="1"><a><b /></a></record>'
+    doc = f'<records xmlns="{NS}">{records}</records>'.encode()
+    records = iterload(
+        Record, BytesIO(doc.replace(b"<b />", replace)), "record", options
+    )
+    assert next(records).id == "0"
+    # the limit is enforced while parsing, before the record is loaded
+    with pytest.raises(XmlResourceLimitError) as exc_info:
+        next(records)
+
+    assert msg in str(exc_info.value)
+
+
+def test_iterload_windows_limits():
+    doc = BytesIO(make_doc(1, "abcd"))
+    with pytest.raises(XmlResourceLimitError):
+        list(
+            iterload_windows(
+                Record, doc, "record", 2, options=Options(max_value_size=3)
+            )
+        )
+
+
+def test_iterload_any_limits():
+    doc = f'<records xmlns="{NS}"><event id="1"><a /></event></records>'.encode()
+    with pytest.raises(XmlResourceLimitError):
+        list(iterload_any(BytesIO(doc), Options(max_depth=1)))
+
+
+def make_documents(count, declaration=""):
+    return "".join(
+        f'{declaration}<record xmlns="{NS}" id="{i}">{i}</record>\n'
+        for i in range(count)
+    ).encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [None, object, str, int, dataclass(type("Foo", (), {}))],
+)
+def test_iterload_documents_not_xml_dataclass(cls):
+    with pytest.raises(ValueError) as exc_info:
+        list(iterload_documents(cls, BytesIO(make_documents(1))))
+
+    assert repr(cls) in str(exc_info.value)
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 2**16])
+@pytest.mark.parametrize(
+    "declaration", ["", "<?xml version='1.0' encoding='utf-8'?>\n<!-- a -->"]
+)
+def test_iterload_documents(monkeypatch, read_size, declaration):
+    monkeypatch.setattr("xml_dataclasses.stream._READ_SIZE", read_size)
+    data = make_documents(3, declaration)
+    records = list(iterload_documents(Record, BytesIO(data), "record"))
+    assert records == [Record(str(i), str(i)) for i in range(3)]
+    assert records[0].__nsmap__ == {None: NS}
+
+
+@pytest.mark.parametrize("read_size", [1, 2**16])
+def test_iterload_documents_concatenated(monkeypatch, read_size):
+    monkeypatch.setattr("xml_dataclasses.stream._READ_SIZE", read_size)
+    data = (
+        f'<record xmlns="{NS}" id="0"><![CDATA[</record>]]></record>'
+        f'<record xmlns="{NS}" id="1"/>'
+        f'<?pi <record> ?><record xmlns="{NS}" id="2">a<!-- </record> -->b</record>'
+        f'<!DOCTYPE record><record xmlns="{NS}" id="3"/>'
+        "\n<!-- end --><?pi end ?>\n"
+    ).encode("utf-8")
+    options = Options(ignore_comments=True)
+    records = list(iterload_documents(Record, BytesIO(data), "record", options))
+    assert records == [
+        Record("0", "</record>"),
+        Record("1"),
+        Record("2", "ab"),
+        Record("3"),
+    ]
+
+
+def test_iterload_documents_nested():
+    @xml_dataclass
+    class Inner:
+        __ns__ = None
+
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        foo: Optional[Inner] = None
+
+    data = b"<foo><foo></foo></foo><foo />"
+    records = list(iterload_documents(Foo, BytesIO(data), "foo"))
+    assert records == [Foo(Inner()), Foo()]
+
+
+def test_iterload_documents_empty():
+    assert list(iterload_documents(Record, BytesIO(b""))) == []
+    assert list(iterload_documents(Record, BytesIO(b" \n"))) == []
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        make_documents(1) + b"<record",
+        make_documents(1) + f'<record xmlns="{NS}" id="1">'.encode("utf-8"),
+        make_documents(1) + b"</record>",
+        make_documents(1) + b"text",
+        make_documents(1) + b"<!-- a -->text",
+        make_documents(1) + b"<!-- a --><![CDATA[a]]>",
+        make_documents(1) + b"<?xml version='1.0'?>",
+    ],
+)
+def test_iterload_documents_invalid(data):
+    records = iterload_documents(Record, BytesIO(data), "record")
+    assert next(records) == Record("0", "0")
+    with pytest.raises(etree.XMLSyntaxError):
+        next(records)
+
+
+def test_iterload_documents_parser_reused():
+    parser = etree.XMLParser(remove_comments=True)
+    data = f'<record xmlns="{NS}" id="0">a<!-- b -->c</record>'.encode("utf-8") * 2
+    records = list(iterload_documents(Record, BytesIO(data), parser=parser))
+    assert records == [Record("0", "ac")] * 2
+
+
+def test_iterload_documents_options():
+    data = f'<record xmlns="{NS}" id="0" foo="bar" />'.encode("utf-8")
+    with pytest.raises(ValueError):
+        list(iterload_documents(Record, BytesIO(data)))
+
+    options = Options(ignore_unknown_attributes=True)
+    records = list(iterload_documents(Record, BytesIO(data), options=options))
+    assert records == [Record("0")]
+
+
+@pytest.mark.parametrize("xml_declaration", [False, True])
+def test_dump_documents_roundtrip(tmp_path, xml_declaration):
+    path = tmp_path / "records.xml.gz"
+    records = [Record(str(i), f"<{i}>") for i in range(3)]
+    nsmap = {None: NS}
+    dump_documents(records, path, "record", nsmap, xml_declaration=xml_declaration)
+    assert list(iterload_documents(Record, path, "record")) == records
+
+
+def test_dump_documents():
+    buf = BytesIO()
+    dump_documents([Record("0"), Record("1", "a")], buf, "record", {None: NS})
+    assert buf.getvalue() == (
+        f'<record xmlns="{NS}" id="0"/>\n' f'<record xmlns="{NS}" id="1">a</record>\n'
+    ).encode("utf-8")
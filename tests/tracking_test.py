@@ -0,0 +1,290 @@
+import pickle
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import pytest
+from lxml import etree
+
+from xml_dataclasses import dump, index_by, load, tracked, xml_dataclass
+from xml_dataclasses.exceptions import XmlDataclassModelError
+from xml_dataclasses.tracking import TrackedList, invalidate
+
+NS = "https://tobywf.com"
+NSMAP = {None: NS}
+
+
+@tracked
+@xml_dataclass
+class Leaf:
+    __ns__ = NS
+    value: str
+
+
+@tracked
+@xml_dataclass
+class Branch:
+    __ns__ = NS
+    leaf: List[Leaf]
+    single: Optional[Leaf] = None
+
+
+@tracked
+@xml_dataclass
+class Root:
+    __ns__ = NS
+    branch: Branch
+
+
+@tracked
+@xml_dataclass
+@dataclass(frozen=True)
+class Frozen:
+    __ns__ = None
+    bar: str
+
+
+@tracked
+@xml_dataclass
+class FrozenParent:
+    __ns__ = None
+    frozen: Frozen
+
+
+def make_root():
+    return Root(branch=Branch(leaf=[Leaf(value="a"), Leaf(value="b")]))
+
+
+def to_str(el):
+    return etree.tostring(el, encoding="unicode")
+
+
+def test_tracked_untracked_child():
+    @xml_dataclass
+    class Child:
+        __ns__ = None
+
+    class Foo:
+        __ns__ = None
+        bar: Child
+
+    with pytest.raises(XmlDataclassModelError) as exc_info:
+        tracked(xml_dataclass(Foo))
+
+    msg = str(exc_info.value)
+    assert "'Child'" in msg
+    assert "'bar'" in msg
+
+
+def test_tracked_list_wrapped():
+    root = make_root()
+    assert isinstance(root.branch.leaf, TrackedList)
+    assert root.branch.leaf == [Leaf(value="a"), Leaf(value="b")]
+
+
+def test_tracked_dump_reuses_fragment():
+    root = make_root()
+    first = dump(root, "root", NSMAP)
+    second = dump(root, "root", NSMAP)
+    assert second is not first
+    assert to_str(second) == to_str(first)
+    # the fragment is a copy, so the dumped trees are independent
+    assert second[0] is not first[0]
+
+
+def test_tracked_dump_different_name():
+    root = make_root()
+    dump(root, "root", NSMAP)
+    el = dump(root, "other", NSMAP)
+    assert el.tag == f"{{{NS}}}other"
+
+
+def test_tracked_dump_different_nsmap():
+    root = make_root()
+    dump(root, "root", NSMAP)
+    el = dump(root, "root", {"foo": NS})
+    assert el.nsmap == {"foo": NS}
+
+
+def test_tracked_setattr_invalidates_ancestors():
+    root = make_root()
+    dump(root, "root", NSMAP)
+    root.branch.leaf[1].value = "c"
+    xml = to_str(dump(root, "root", NSMAP))
+    assert 'value="c"' in xml
+    assert 'value="b"' not in xml
+
+
+def test_tracked_setattr_child_links_parent():
+    root = make_root()
+    dump(root, "root", NSMAP)
+    leaf = Leaf(value="c")
+    root.branch.single = leaf
+    dump(root, "root", NSMAP)
+    leaf.value = "d"
+    xml = to_str(dump(root, "root", NSMAP))
+    assert xml.count('value="d"') == 1
+
+
+def test_tracked_reassign_same_child_links_once():
+    root = make_root()
+    branch = root.branch
+    root.branch = branch
+    assert len(branch.__dict__["__xml_parents__"]) == 1
+
+
+def test_tracked_parent_collected():
+    leaf = Leaf(value="a")
+    root = Root(branch=Branch(leaf=[leaf]))
+    dump(root, "root", NSMAP)
+    del root
+    # the weak reference to the branch is dead, this must not fail
+    leaf.value = "b"
+    assert to_str(dump(leaf, "leaf", NSMAP)) == f'<leaf xmlns="{NS}" value="b"/>'
+
+
+@pytest.mark.parametrize(
+    "mutate,expected",
+    [
+        (lambda l: l.append(Leaf(value="c")), "abc"),
+        (lambda l: l.extend([Leaf(value="c")]), "abc"),
+        (lambda l: l.insert(0, Leaf(value="c")), "cab"),
+        (lambda l: l.__iadd__([Leaf(value="c")]), "abc"),
+        (lambda l: l.__imul__(2), "abab"),
+        (lambda l: l.__setitem__(0, Leaf(value="c")), "cb"),
+        (lambda l: l.__setitem__(slice(0, 1), iter([Leaf(value="c")])), "cb"),
+        (lambda l: l.__delitem__(0), "b"),
+        (lambda l: l.pop(), "a"),
+        (lambda l: l.remove(Leaf(value="a")), "b"),
+        (lambda l: l.clear(), ""),
+        (lambda l: l.sort(key=lambda v: v.value, reverse=True), "ba"),
+        (lambda l: l.reverse(), "ba"),
+    ],
+)
+def test_tracked_list_mutation_invalidates(mutate, expected):
+    root = make_root()
+    dump(root, "root", NSMAP)
+    mutate(root.branch.leaf)
+    el = dump(root, "root", NSMAP)
+    assert "".join(leaf.get("value") for leaf in el[0]) == expected
+
+
+def test_tracked_list_added_child_links_parent():
+    root = make_root()
+    leaf = Leaf(value="c")
+    root.branch.leaf.append(leaf)
+    dump(root, "root", NSMAP)
+    leaf.value = "d"
+    el = dump(root, "root", NSMAP)
+    assert el[0][2].get("value") == "d"
+
+
+def test_tracked_list_mutation_drops_index():
+    @tracked
+    @xml_dataclass
+    class Indexed:
+        __ns__ = NS
+        leaf: List[Leaf] = index_by("value")
+
+    indexed = Indexed(leaf=[Leaf(value="a"), Leaf(value="b")])
+    assert indexed.leaf_by_value("a") is indexed.leaf[0]
+    assert "__xml_index_leaf__" in indexed.__dict__
+    indexed.leaf[0] = Leaf(value="c")
+    assert "__xml_index_leaf__" not in indexed.__dict__
+    assert indexed.leaf_by_value("c") is indexed.leaf[0]
+
+
+def test_tracked_list_owner_collected():
+    branch = Branch(leaf=[])
+    leaf = branch.leaf
+    del branch
+    leaf.append(Leaf(value="a"))
+    assert leaf == [Leaf(value="a")]
+
+
+def test_tracked_dump_modified_tree():
+    root = make_root()
+    expected = to_str(dump(make_root(), "root", NSMAP))
+    for _ in range(2):
+        # the dumped trees are owned by the caller, not the cache
+        el = dump(root, "root", NSMAP)
+        el[0][0].set("value", "z")
+        el[0].append(etree.Element("foo"))
+        assert to_str(dump(root, "root", NSMAP)) == expected
+
+    root.branch.single = Leaf(value="c")
+    el = dump(root, "root", NSMAP)
+    assert [leaf.get("value") for leaf in el[0]] == ["a", "b", "c"]
+    el[0][1].set("value", "z")
+    root.branch.leaf[0].value = "d"
+    el = dump(root, "root", NSMAP)
+    assert [leaf.get("value") for leaf in el[0]] == ["d", "b", "c"]
+
+
+def test_tracked_dump_child_not_xml_dataclass():
+    with pytest.raises(ValueError) as exc_info:
+        dump(Branch(leaf=[object()]), "branch", NSMAP)
+
+    assert repr(object) in str(exc_info.value)
+
+
+def test_tracked_invalidate():
+    root = make_root()
+    dump(root, "root", NSMAP)
+    assert "__xml_fragment__" in root.__dict__
+    invalidate(root.branch.leaf[0])
+    assert "__xml_fragment__" not in root.__dict__
+    assert "__xml_fragment__" not in root.branch.__dict__
+    assert "__xml_fragment__" in root.branch.leaf[1].__dict__
+
+
+def test_tracked_load():
+    el = etree.fromstring(
+        f'<root xmlns="{NS}"><branch><leaf value="a"/><leaf value="b"/></branch></root>'
+    )
+    root = load(Root, el, "root")
+    assert root == make_root()
+    first = dump(root, "root", None)
+    root.branch.leaf.pop()
+    second = dump(root, "root", None)
+    assert to_str(first) != to_str(second)
+
+
+@pytest.mark.parametrize("copier", [deepcopy, lambda v: pickle.loads(pickle.dumps(v))])
+def test_tracked_copy(copier):
+    root = make_root()
+    dump(root, "root", NSMAP)
+    copied = copier(root)
+    assert copied == root
+    assert "__xml_fragment__" not in copied.__dict__
+    assert isinstance(copied.branch.leaf, TrackedList)
+    dump(copied, "root", NSMAP)
+    copied.branch.leaf[0].value = "c"
+    assert dump(copied, "root", NSMAP)[0][0].get("value") == "c"
+
+
+def test_tracked_frozen():
+    parent = FrozenParent(frozen=Frozen(bar="baz"))
+    first = dump(parent.frozen, "foo", None)
+    second = dump(parent.frozen, "foo", None)
+    assert second is not first
+    assert to_str(second) == '<foo bar="baz"/>'
+    # weak references to the parent aren't pickled, but linked again
+    copied = pickle.loads(pickle.dumps(parent))
+    assert copied == parent
+    (ref,) = copied.frozen.__dict__["__xml_parents__"]
+    assert ref() is copied
+
+
+def test_tracked_tuple_not_wrapped():
+    @tracked
+    @xml_dataclass
+    class Foo:
+        __ns__ = None
+        frozen: Tuple[Frozen, ...]
+
+    foo = Foo(frozen=(Frozen(bar="a"),))
+    dump(foo, "foo", None)
+    foo.frozen = (Frozen(bar="b"),)
+    assert isinstance(foo.frozen, tuple)
+    assert dump(foo, "foo", None)[0].get("bar") == "b"